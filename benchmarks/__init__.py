@@ -0,0 +1,4 @@
+"""
+Benchmarks. Most modules are standalone scripts; ``python -m benchmarks.suite``
+runs the scaling suite on diagrams from ``benchmarks.generator``.
+"""
@@ -0,0 +1,52 @@
+"""
+Output size benchmark: pretty, compact and compressed (--compress) diagrams.
+
+    python benchmarks/bench_compress.py [--nodes 100,2000,20000]
+
+Also times decompressing the compressed output again.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.generator import DiagramSpec, generate
+from mermaid_to_drawio.compression import read_pages
+from mermaid_to_drawio.converter import MermaidToDrawIOConverter
+
+MODES = (("pretty", {}), ("compact", {"compact": True}), ("compressed", {"compress": True}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", default="100,2000,20000", help="Comma-separated node counts")
+    args = parser.parse_args()
+
+    print(f"{'nodes':>7}{'mode':>12}{'size':>12}{'ratio':>8}{'save':>10}{'read':>10}")
+    for size in map(int, args.nodes.split(",")):
+        source = "\n".join(generate(DiagramSpec(size)))
+        baseline = None
+        for name, kwargs in MODES:
+            converter = MermaidToDrawIOConverter(layout="layered")
+            converter.parse_text(source)
+            converter.layout_manager.layout()
+            out = io.StringIO()
+            start = time.perf_counter()
+            converter.write(out, **kwargs)
+            saved = time.perf_counter() - start
+
+            text = out.getvalue()
+            start = time.perf_counter()
+            read_pages(io.StringIO(text))
+            read = time.perf_counter() - start
+
+            baseline = baseline or len(text)
+            print(f"{size:>7}{name:>12}{len(text) / 1024:>10.0f}KB{baseline / len(text):>7.1f}x"
+                  f"{saved * 1000:>8.0f}ms{read * 1000:>8.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
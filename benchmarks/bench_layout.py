@@ -0,0 +1,51 @@
+"""
+Layout-time benchmark for the grid and layered engines.
+
+    python benchmarks/bench_layout.py [--sizes 1000,10000,50000] [--density 1.5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.generator import DiagramSpec, generate
+from mermaid_to_drawio.converter import MermaidToDrawIOConverter
+from mermaid_to_drawio.layout_manager import LayoutManager
+
+
+def flat_graph(nodes, density):
+    """Node ids and edges of a generated diagram without subgraphs."""
+    converter = MermaidToDrawIOConverter()
+    converter.parse_stream(generate(DiagramSpec(nodes, edge_density=density, depth=0, style_density=0,
+                                                link_density=0)))
+    graph = converter.graph
+    return list(graph.nodes), [(edge.source, edge.target) for edge in graph.edges]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,5000,10000,50000")
+    parser.add_argument("--density", type=float, default=1.5, help="Edges per node")
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8}{'edges':>9}{'grid':>10}{'layered':>11}{'us/elem':>10}")
+    for size in map(int, args.sizes.split(",")):
+        ids, edges = flat_graph(size, args.density)
+        timings = []
+        for engine in ("grid", "layered"):
+            start = time.perf_counter()
+            layout = LayoutManager(engine=engine)
+            for node_id in ids:
+                layout.add_node(node_id)
+            for src, tgt in edges:
+                layout.add_edge(src, tgt)
+            layout.layout()
+            timings.append(time.perf_counter() - start)
+        per_element = timings[1] / (size + len(edges)) * 1e6
+        print(f"{size:>8}{len(edges):>9}{timings[0] * 1000:>8.0f}ms{timings[1] * 1000:>9.0f}ms{per_element:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
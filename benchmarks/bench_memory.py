@@ -0,0 +1,132 @@
+"""
+Memory held by the parsed graph: the shared Graph model against the parallel
+dicts the converter and layout manager used to keep.
+
+    python benchmarks/bench_memory.py [--sizes 4000,40000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.generator import DiagramSpec, generate
+from mermaid_to_drawio.converter import MermaidToDrawIOConverter, SHAPE_MAP
+from mermaid_to_drawio.layout_manager import GRID_ROWS
+from mermaid_to_drawio.parser import tokenize, CHAIN, SUBGRAPH, END, STYLE, LINK_STYLE
+from mermaid_to_drawio.style_parser import StyleParser
+
+
+class LegacyTables:
+    """The per-field tables of the converter and layout manager before the graph model."""
+
+    def __init__(self):
+        # converter
+        self.nodes = {}
+        self.edges = []
+        self.styles = {}
+        self.shape_styles = {}
+        self.groups = {}
+        self.node_to_group = {}
+        self.edge_styles = {}
+        # layout manager
+        self.positions = {}
+        self.layout_edges = []
+        self.node_group = {}
+        self.group_parent = {}
+        self.group_children = {None: []}
+        self.group_stack = []
+        self.link_count = 0
+
+    def apply(self, token):
+        kind, value = token
+        if kind == CHAIN:
+            node_refs, links = value
+            for node_id, label, shape, _ in node_refs:
+                if shape is not None:
+                    self.nodes[node_id] = label
+                    self.shape_styles[node_id] = SHAPE_MAP[shape]
+                elif node_id in self.nodes:
+                    continue
+                else:
+                    self.nodes[node_id] = node_id
+                if self.group_stack:
+                    self.node_to_group[node_id] = self.node_group[node_id] = self.group_stack[-1]
+                if node_id not in self.positions:
+                    count = len(self.positions)
+                    self.positions[node_id] = (60 + count // GRID_ROWS * 220, 60 + count % GRID_ROWS * 80)
+            for i, link in enumerate(links):
+                src, tgt = node_refs[i].id, node_refs[i + 1].id
+                self.edges.append((src, tgt, link.label, self.link_count))
+                self.layout_edges.append((src, tgt))
+                if link.bidirectional:
+                    self.edges.append((tgt, src, "", self.link_count))
+                    self.layout_edges.append((tgt, src))
+                self.link_count += 1
+        elif kind == SUBGRAPH:
+            parent_id = self.group_stack[-1] if self.group_stack else None
+            group_id = f"group-{len(self.groups) + 1}"
+            self.groups[group_id] = (value, parent_id)
+            self.group_parent[group_id] = parent_id
+            self.group_children[parent_id].append(group_id)
+            self.group_children[group_id] = []
+            self.group_stack.append(group_id)
+        elif kind == END and self.group_stack:
+            self.group_stack.pop()
+        elif kind == STYLE:
+            self.styles[value[0]] = StyleParser.parse(value[1])
+        elif kind == LINK_STYLE:
+            for idx in value[0] or ():
+                self.edge_styles[idx] = StyleParser.parse(value[1])
+
+
+def load_legacy(tokens):
+    tables = LegacyTables()
+    for token in tokens:
+        tables.apply(token)
+    return tables
+
+
+def load_graph(tokens):
+    converter = MermaidToDrawIOConverter(layout="grid")
+    for token in tokens:
+        converter._apply_token(token)
+    return converter
+
+
+def measure(load, tokens):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = load(tokens)
+    seconds = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="4000,40000", help="Comma-separated node counts")
+    args = parser.parse_args()
+
+    print(f"{'lines':>8}{'nodes':>9}{'edges':>9}{'legacy':>11}{'graph':>11}{'saved':>8}{'legacy':>10}{'graph':>9}")
+    for size in map(int, args.sizes.split(",")):
+        lines = list(generate(DiagramSpec(size)))
+        tokens = [token for token in map(tokenize, lines) if token is not None]
+        # Warm the style cache so both sides only hold references to the same strings
+        load_legacy(tokens)
+        graph = load_graph(tokens).graph
+        nodes, edges = len(graph.nodes), len(graph.edges)
+        del graph
+
+        legacy_bytes, legacy_seconds = measure(load_legacy, tokens)
+        graph_bytes, graph_seconds = measure(load_graph, tokens)
+        print(f"{len(lines):>8}{nodes:>9}{edges:>9}{legacy_bytes / 2**20:>9.1f}MB{graph_bytes / 2**20:>9.1f}MB"
+              f"{1 - graph_bytes / legacy_bytes:>7.0%}{legacy_seconds * 1000:>8.0f}ms{graph_seconds * 1000:>7.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
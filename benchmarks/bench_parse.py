@@ -0,0 +1,44 @@
+"""
+Parse-throughput benchmark.
+
+    python benchmarks/bench_parse.py [--nodes 20000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.generator import DiagramSpec, generate
+from mermaid_to_drawio.converter import MermaidToDrawIOConverter
+from mermaid_to_drawio.parser import tokenize
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=20000, help="Nodes in the generated diagram")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    lines = list(generate(DiagramSpec(args.nodes)))
+
+    best = min(_time(lambda: [tokenize(line) for line in lines]) for _ in range(args.repeat))
+    print(f"tokenize:      {len(lines) / best:12,.0f} lines/s  ({best * 1000:.1f} ms)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.mmd")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+        best = min(_time(lambda: MermaidToDrawIOConverter(path).parse_mermaid()) for _ in range(args.repeat))
+    print(f"parse_mermaid: {len(lines) / best:12,.0f} lines/s  ({best * 1000:.1f} ms)")
+
+
+def _time(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Round-trip benchmark: Mermaid -> draw.io -> Mermaid -> draw.io.
+
+    python benchmarks/bench_reverse.py [--sizes 1000,10000,100000] [--compress]
+
+Times the reverse conversion against the forward one, reports its peak
+traced memory next to the size of the file it read, and checks that the
+second forward conversion yields the same nodes, edges, styles and
+subgraphs as the first.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.generator import DiagramSpec, generate
+from mermaid_to_drawio.converter import MermaidToDrawIOConverter
+from mermaid_to_drawio.reverse import DrawioToMermaidConverter
+
+
+def forward(text, compress):
+    converter = MermaidToDrawIOConverter(layout="layered")
+    converter.parse_text(text)
+    out = io.StringIO()
+    converter.write(out, compact=True, compress=compress)
+    return converter, out.getvalue()
+
+
+def summary(converter):
+    graph = converter.graph
+    groups = {gid: (group.name, group.parent) for gid, group in graph.groups.items()}
+    nodes = {node.id: (node.label, node.shape or "rectangle", node.style, groups.get(node.group))
+             for node in graph.nodes.values()}
+    edges = [(edge.source, edge.target, edge.label, graph.link_styles.get(edge.index)) for edge in graph.edges]
+    return nodes, edges
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated node counts")
+    parser.add_argument("--compress", action="store_true", help="Round-trip through compressed pages")
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8}{'drawio':>10}{'forward':>10}{'reverse':>10}{'nodes/s':>10}{'peak':>9}  same")
+    for size in map(int, args.sizes.split(",")):
+        # No bidirectional links or linkStyle gaps: those renumber on the way back
+        text = "\n".join(line for line in generate(DiagramSpec(size, depth=2)) if "<-->" not in line)
+        start = time.perf_counter()
+        original, drawio = forward(text, args.compress)
+        forward_seconds = time.perf_counter() - start
+
+        data = drawio.encode("utf-8")
+        start = time.perf_counter()
+        reverse = DrawioToMermaidConverter()
+        reverse.parse_stream(io.BytesIO(data))
+        mermaid = reverse.to_mermaid()
+        reverse_seconds = time.perf_counter() - start
+
+        # Traced separately, as tracing slows the conversion down
+        tracemalloc.start()
+        DrawioToMermaidConverter().parse_stream(io.BytesIO(data))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        again, _ = forward(mermaid, args.compress)
+        same = summary(again) == summary(original)
+        print(f"{size:>8}{len(drawio) / 2**20:>8.1f}MB{forward_seconds:>9.2f}s{reverse_seconds:>9.2f}s"
+              f"{size / reverse_seconds:>10.0f}{peak / 2**20:>7.0f}MB  {'yes' if same else 'NO'}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
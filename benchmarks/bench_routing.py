@@ -0,0 +1,113 @@
+"""
+Edge-routing benchmark: time per edge, serial and in a process pool, and how
+many edges still cross a node or group they do not belong to.
+
+    python benchmarks/bench_routing.py [--nodes 500,2000] [--workers 4] [--random]
+
+By default the diagrams are flowchart-like: subgraphs of 40 steps, with
+most edges between nearby steps. --random links uniformly random nodes
+instead.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.generator import DiagramSpec, generate
+from mermaid_to_drawio.converter import MermaidToDrawIOConverter
+from mermaid_to_drawio.layout_manager import NODE_WIDTH, NODE_HEIGHT
+from mermaid_to_drawio.routing import SpatialGrid, route_edges
+
+
+def crossing_edges(layout):
+    """Edges whose drawn path crosses a box other than its endpoints and their groups."""
+    graph = layout.graph
+    rects, owners = [], []
+    for node_id in graph.nodes:
+        x, y = layout.get_position(node_id)
+        rects.append((x, y, NODE_WIDTH, NODE_HEIGHT))
+        owners.append(node_id)
+    for group_id in graph.groups:
+        rects.append(tuple(layout.get_group_bbox(group_id)))
+        owners.append(group_id)
+    index = {owner: i for i, owner in enumerate(owners)}
+    grid = SpatialGrid(rects)
+
+    def ignored(node):
+        yield index[node.id]
+        group_id = node.group
+        while group_id is not None:
+            yield index[group_id]
+            group_id = graph.groups[group_id].parent
+
+    crossing = 0
+    for edge in graph.edges:
+        source, target = graph.nodes[edge.source], graph.nodes[edge.target]
+        if source is target:
+            continue
+        path = [(source.x + NODE_WIDTH // 2, source.y + NODE_HEIGHT // 2), *(edge.points or ()),
+                (target.x + NODE_WIDTH // 2, target.y + NODE_HEIGHT // 2)]
+        ignore = (*ignored(source), *ignored(target))
+        for start, end in zip(path, path[1:]):
+            # The grid returns the boxes overlapping the segment's bounding box
+            if any(_crosses(rects[i], start, end) for i in grid.query(*start, *end, ignore)):
+                crossing += 1
+                break
+    return crossing
+
+
+def _crosses(rect, start, end):
+    """Whether a segment passes through the interior of rect (Liang-Barsky clipping)."""
+    x, y, w, h = rect
+    (x1, y1), (x2, y2) = start, end
+    dx, dy = x2 - x1, y2 - y1
+    low, high = 0.0, 1.0
+    for p, q in ((-dx, x1 - x), (dx, x + w - x1), (-dy, y1 - y), (dy, y + h - y1)):
+        if p == 0:
+            if q <= 0:
+                return False
+        else:
+            t = q / p
+            if p < 0:
+                low = max(low, t)
+            else:
+                high = min(high, t)
+    return low < high
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", default="500,2000", help="Comma-separated node counts")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--random", action="store_true", help="Uniformly random edges (worst case)")
+    args = parser.parse_args()
+
+    print(f"{'nodes':>7}{'edges':>8}{'straight':>10}{'routed':>8}{'serial':>10}{'us/edge':>9}"
+          f"{f'{args.workers} procs':>10}")
+    for size in map(int, args.nodes.split(",")):
+        spec = DiagramSpec(size, edge_density=1.3, depth=1, group_size=40, style_density=0, link_density=0,
+                           locality=0 if args.random else 0.9)
+        converter = MermaidToDrawIOConverter(layout="layered")
+        converter.parse_stream(generate(spec))
+        layout = converter.layout_manager
+        layout.layout()
+        straight = crossing_edges(layout)
+
+        start = time.perf_counter()
+        route_edges(layout)
+        serial = time.perf_counter() - start
+        routed = crossing_edges(layout)
+
+        start = time.perf_counter()
+        route_edges(layout, workers=args.workers)
+        parallel = time.perf_counter() - start
+
+        edges = len(converter.graph.edges)
+        print(f"{size:>7}{edges:>8}{straight:>10}{routed:>8}{serial * 1000:>8.0f}ms"
+              f"{serial / edges * 1e6:>9.1f}{parallel * 1000:>8.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
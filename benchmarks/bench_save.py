@@ -0,0 +1,64 @@
+"""
+Serialization benchmark: legacy minidom round-trip vs. the streaming writer.
+
+    python benchmarks/bench_save.py [--nodes 20000]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+import xml.dom.minidom
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.generator import DiagramSpec, generate
+from mermaid_to_drawio.converter import MermaidToDrawIOConverter
+
+
+def legacy_minidom(converter):
+    converter.build()
+    xml_str = ET.tostring(converter.mxfile, encoding="utf-8")
+    io.StringIO().write(xml.dom.minidom.parseString(xml_str).toprettyxml(indent="  "))
+
+
+def tree_pretty(converter):
+    converter.build()
+    converter.write(io.StringIO())
+
+
+def streamed_pretty(converter):
+    converter.write(io.StringIO())
+
+
+def streamed_compact(converter):
+    converter.write(io.StringIO(), compact=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=20000, help="Nodes in the generated diagram")
+    args = parser.parse_args()
+
+    source = "\n".join(generate(DiagramSpec(args.nodes)))
+    print(f"{'mode':<18}{'build+save':>12}{'peak memory':>14}")
+    for fn in (legacy_minidom, tree_pretty, streamed_pretty, streamed_compact):
+        converter = MermaidToDrawIOConverter()
+        converter.parse_text(source)
+        start = time.perf_counter()
+        fn(converter)
+        elapsed = time.perf_counter() - start
+
+        converter = MermaidToDrawIOConverter()
+        converter.parse_text(source)
+        tracemalloc.start()
+        fn(converter)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{fn.__name__:<18}{elapsed * 1000:>10.0f}ms{peak / 2**20:>12.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
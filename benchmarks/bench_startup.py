@@ -0,0 +1,52 @@
+"""
+Import-time benchmark for the command line entry points.
+
+    python benchmarks/bench_startup.py [--runs 5] [--budget-ms 60]
+
+Imports each module in a fresh interpreter under ``python -X importtime``
+and reports the best cumulative time of several runs. Exits with status 1
+when the CLI takes longer than --budget-ms. The test suite checks a looser
+budget relative to importing json, which holds on slow machines too.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+MODULES = ("mermaid_to_drawio", "mermaid_to_drawio.cli", "mermaid_to_drawio.converter", "mermaid_to_drawio.reverse")
+
+
+def import_time(module):
+    """Cumulative microseconds for importing module in a fresh interpreter."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if name.strip() == module:
+                return int(cumulative)
+    raise RuntimeError(f"no import time reported for {module}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Imports per module; the best one counts")
+    parser.add_argument("--budget-ms", type=float, default=60,
+                        help="Budget for importing mermaid_to_drawio.cli (about 40ms when last measured)")
+    args = parser.parse_args()
+
+    best = {}
+    for module in MODULES:
+        best[module] = min(import_time(module) for _ in range(args.runs)) / 1000
+        print(f"{module:<32}{best[module]:>8.1f}ms", flush=True)
+    cli = best["mermaid_to_drawio.cli"]
+    if cli > args.budget_ms:
+        print(f"importing the CLI took {cli:.1f}ms, over the {args.budget_ms:.0f}ms budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Per-element style cost: StyleParser.parse on repeated style strings and
+build() on a diagram where every node and edge carries a style.
+
+    python benchmarks/bench_styles.py [--nodes 20000] [--distinct 8]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.generator import DiagramSpec, generate
+from mermaid_to_drawio.converter import MermaidToDrawIOConverter, SHAPE_MAP
+from mermaid_to_drawio.style_parser import StyleParser
+
+def _best(fn, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=20000)
+    parser.add_argument("--distinct", type=int, default=8, help="Number of distinct style strings")
+    args = parser.parse_args()
+
+    # Every node and edge styled, from args.distinct style strings
+    lines = list(generate(DiagramSpec(args.nodes, depth=0, style_density=1, link_density=1, styles=args.distinct)))
+    source = "\n".join(lines)
+    styles = [line.split(" ", 2)[2] for line in lines if line.startswith("style ")]
+    parse = StyleParser.parse
+    uncached = getattr(parse, "__wrapped__", parse)
+    print(f"StyleParser.parse uncached: {_best(lambda: [uncached(s) for s in styles]) / len(styles) * 1e6:6.2f} us/call")
+    print(f"StyleParser.parse:          {_best(lambda: [parse(s) for s in styles]) / len(styles) * 1e6:6.2f} us/call")
+
+    def build():
+        converter = MermaidToDrawIOConverter()
+        converter.parse_text(source)
+        converter.layout_manager.layout()
+        start = time.perf_counter()
+        converter.build()
+        return time.perf_counter() - start
+
+    converter = MermaidToDrawIOConverter()
+    converter.parse_text(source)
+    nodes = list(converter.graph.nodes.values())
+    theme = converter.theme
+
+    def legacy_node_styles():
+        # The per-node formatting build() did before styles were interned
+        for node in nodes:
+            base_style = SHAPE_MAP[node.shape or "rectangle"]
+            custom_style = node.style or ""
+            theme_style = f"fillColor={theme['node']['fillColor']};strokeColor={theme['node']['strokeColor']};strokeWidth={theme['node']['strokeWidth']}"
+            f"{base_style};{theme_style};{custom_style}"
+
+    print(f"node style, formatted:      {_best(legacy_node_styles) / len(nodes) * 1e6:6.2f} us/node")
+    print(f"node style, interned:       {_best(lambda: [converter._node_style(n) for n in nodes]) / len(nodes) * 1e6:6.2f} us/node")
+
+    elements = len(nodes) + len(converter.graph.edges)
+    print(f"build():                    {min(build() for _ in range(3)) / elements * 1e6:6.2f} us/element")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Seeded generator of synthetic Mermaid flowcharts for benchmarking.
+
+The same parameters and seed always produce the same diagram, so runs of
+different versions convert identical input.
+"""
+import random
+
+SHAPES = ("[{}]", "({})", "{{{}}}", "(({}))", "[[{}]]", ">{}]")
+WORDS = ("load", "parse", "check", "store", "send", "queue", "retry", "merge", "split", "render",
+         "fetch", "commit", "index", "build", "deploy", "audit", "cache", "notify", "scan", "sync")
+STYLES = ("fill:#f9f,stroke:#333,stroke-width:2px", "fill:#bbf,stroke:#f66,stroke-width:1px",
+          "fill:#dfd,stroke:#393,stroke-dasharray:5 5")
+LINK_STYLES = ("stroke:#ff3,stroke-width:4px", "stroke:#f00,stroke-width:2px,stroke-dasharray:3")
+# Colors for DiagramSpec.styles, in every notation StyleParser accepts
+PALETTE = ("red", "#aaf", "rgb(10, 20, 30)", "orange", "#333", "teal", "rgba(0,255,0,0.5)", "navy")
+
+
+class DiagramSpec:
+    """Shape of a generated diagram.
+
+    nodes           number of nodes
+    edge_density    average outgoing edges per node
+    depth           maximum subgraph nesting depth (0 for none)
+    group_size      nodes per innermost subgraph
+    style_density   fraction of nodes with a ``style`` line
+    link_density    fraction of edges with a ``linkStyle`` line
+    label_length    approximate characters per node label
+    seed            random seed
+    components      number of disconnected parts, of consecutive nodes
+    locality        fraction of edges to a nearby later node; the rest go
+                    anywhere in the component (0 for uniformly random edges)
+    styles          number of distinct style and linkStyle strings (0 for
+                    the few built-in ones)
+    """
+
+    def __init__(self, nodes=1000, edge_density=1.5, depth=2, group_size=50, style_density=0.05,
+                 link_density=0.02, label_length=16, seed=1,
+                 components=1, locality=0.9, styles=0):
+        self.nodes = nodes
+        self.edge_density = edge_density
+        self.depth = depth
+        self.group_size = group_size
+        self.style_density = style_density
+        self.link_density = link_density
+        self.label_length = label_length
+        self.seed = seed
+        self.components = components
+        self.locality = locality
+        self.styles = styles
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+def _label(rng, length):
+    words = []
+    size = -1
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words).capitalize()
+
+
+def _style_pools(count):
+    if not count:
+        return STYLES, LINK_STYLES
+    colors = [PALETTE[k % len(PALETTE)] for k in range(count)]
+    return ([f"fill:{color},stroke:#333,stroke-width:{1 + k}px" for k, color in enumerate(colors)],
+            [f"stroke:{color},stroke-width:{1 + k}px" for k, color in enumerate(colors)])
+
+
+def generate(spec):
+    """Yield the lines of a flowchart described by spec (a DiagramSpec)."""
+    rng = random.Random(spec.seed)
+    styles, link_styles = _style_pools(spec.styles)
+    yield "graph TD"
+    stack = 0
+    block = 0
+    links = 0
+    whole, fraction = divmod(spec.edge_density, 1)
+    start = end = 0
+    for i in range(spec.nodes):
+        if i == end:
+            # Edges stay within [start, end), the component of node i
+            part = i * spec.components // spec.nodes
+            start = i
+            end = -(-(part + 1) * spec.nodes // spec.components)
+        if spec.depth and i % spec.group_size == 0:
+            # Cycle through nesting levels 1..depth, so every depth occurs
+            level = block % spec.depth + 1
+            block += 1
+            while stack >= level:
+                yield "end"
+                stack -= 1
+            while stack < level:
+                stack += 1
+                yield f"subgraph Block {block} level {stack}"
+
+        yield f"N{i}" + rng.choice(SHAPES).format(_label(rng, spec.label_length))
+        for _ in range(int(whole) + (rng.random() < fraction)):
+            # Mostly near neighbours, like real flowcharts, with some long jumps
+            if rng.random() < spec.locality:
+                target = min(end - 1, i + 1 + int(rng.expovariate(0.3)))
+            else:
+                target = start + rng.randrange(end - start)
+            if rng.random() < 0.2:
+                yield f"N{i} -- {rng.choice(WORDS)} --> N{target}"
+            else:
+                yield f"N{i} --> N{target}"
+            if rng.random() < spec.link_density:
+                yield f"linkStyle {links} {rng.choice(link_styles)}"
+            links += 1
+        if rng.random() < spec.style_density:
+            yield f"style N{i} {rng.choice(styles)}"
+    for _ in range(stack):
+        yield "end"
@@ -0,0 +1,159 @@
+"""
+Scaling benchmark: per-stage time, throughput and peak RSS from 100 to 1M nodes.
+
+    python -m benchmarks.suite [--sizes 100,1000,10000,100000] [--output results.json]
+    python -m benchmarks.suite --sizes 1000000 --depth 3 --edge-density 2
+    python -m benchmarks.suite --compare old.json
+
+Each size is converted in a fresh process, so its peak RSS is its own.
+Results are written as JSON, and --compare prints the speed ratio against
+an earlier results file.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from benchmarks.generator import DiagramSpec, generate
+from mermaid_to_drawio import __version__
+from mermaid_to_drawio.converter import MermaidToDrawIOConverter
+from mermaid_to_drawio.stats import STAGES, ConversionStats
+
+DEFAULT_SIZES = "100,1000,10000,100000"
+
+
+class _CountingSink:
+    """Text file stand-in that only counts what is written."""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, text):
+        self.size += len(text)
+
+
+def run_one(input_file, options):
+    """Convert one generated file in this process and return its measurements."""
+    stats = ConversionStats()
+    workers = options.get("workers", 1)
+    converter = MermaidToDrawIOConverter(input_file, layout=options["layout"], routing=options["route"],
+                                         layout_options={"workers": workers}, route_workers=workers, stats=stats)
+    converter.parse_mermaid()
+    sink = _CountingSink()
+    converter.write(sink, compact=options["compact"], compress=options["compress"])
+    data = stats.as_dict()
+    data["output_chars"] = sink.size
+    return data
+
+
+def measure(spec, options):
+    """Generate the diagram for spec and convert it in a child process."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "diagram.mmd")
+        with open(path, "w", encoding="utf-8") as f:
+            lines = 0
+            for line in generate(spec):
+                f.write(line + "\n")
+                lines += 1
+        child = subprocess.run(
+            [sys.executable, "-m", "benchmarks.suite", "--run-one", path, "--options", json.dumps(options)],
+            cwd=ROOT, stdout=subprocess.PIPE, check=True,
+        )
+    data = json.loads(child.stdout)
+    data["nodes"] = spec.nodes
+    data["lines"] = lines
+    data["nodes_per_second"] = spec.nodes / data["total_seconds"] if data["total_seconds"] else None
+    return data
+
+
+def compare(old, new):
+    """Print new/old time ratios for the sizes present in both result sets."""
+    before = {result["nodes"]: result for result in old["results"]}
+    print(f"\nvs {old['version']} ({old['timestamp']}): new time / old time, lower is better")
+    print(f"{'nodes':>9}{'total':>9}" + "".join(f"{stage:>9}" for stage in STAGES))
+    for result in new["results"]:
+        previous = before.get(result["nodes"])
+        if previous is None:
+            continue
+        line = f"{result['nodes']:>9}{result['total_seconds'] / previous['total_seconds']:>8.2f}x"
+        for stage in STAGES:
+            timing, old_timing = result["stages"].get(stage), previous["stages"].get(stage)
+            if timing and old_timing and old_timing["seconds"]:
+                line += f"{timing['seconds'] / old_timing['seconds']:>8.2f}x"
+            else:
+                line += f"{'-':>9}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated node counts")
+    parser.add_argument("--edge-density", type=float, default=1.5, help="Average outgoing edges per node")
+    parser.add_argument("--depth", type=int, default=2, help="Maximum subgraph nesting depth")
+    parser.add_argument("--group-size", type=int, default=50, help="Nodes per innermost subgraph")
+    parser.add_argument("--style-density", type=float, default=0.05, help="Fraction of nodes with a style line")
+    parser.add_argument("--link-density", type=float, default=0.02, help="Fraction of edges with a linkStyle line")
+    parser.add_argument("--label-length", type=int, default=16, help="Approximate label length")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--components", type=int, default=1, help="Number of disconnected parts")
+    parser.add_argument("--workers", type=int, default=1, help="Processes for layout and routing")
+    parser.add_argument("--layout", choices=["layered", "grid"], default="layered")
+    parser.add_argument("--route", action="store_true")
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--compress", action="store_true")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", metavar="FILE", help="Earlier results file to compare against")
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+    parser.add_argument("--options", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        json.dump(run_one(args.run_one, json.loads(args.options)), sys.stdout)
+        return
+
+    options = {"layout": args.layout, "route": args.route, "compact": args.compact, "compress": args.compress,
+               "workers": args.workers}
+    report = {
+        "version": __version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": options,
+        "results": [],
+    }
+    print(f"{'nodes':>9}{'lines':>9}{'parse':>9}{'layout':>9}{'route':>9}{'build':>9}{'save':>9}"
+          f"{'total':>10}{'nodes/s':>10}{'RSS':>9}")
+    for size in map(int, args.sizes.split(",")):
+        spec = DiagramSpec(size, args.edge_density, args.depth, args.group_size, args.style_density,
+                           args.link_density, args.label_length, args.seed, args.components)
+        result = measure(spec, options)
+        result["spec"] = spec.as_dict()
+        report["results"].append(result)
+
+        stages = result["stages"]
+        line = f"{size:>9}{result['lines']:>9}"
+        for stage in STAGES:
+            line += f"{stages[stage]['seconds']:>8.2f}s" if stage in stages else f"{'-':>9}"
+        rss = result["max_rss_bytes"]
+        line += f"{result['total_seconds']:>9.2f}s{result['nodes_per_second'] or 0:>10.0f}"
+        line += f"{rss / 2**20:>7.0f}MB" if rss else f"{'-':>9}"
+        print(line, flush=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Batch conversion of many Mermaid files, optionally across worker processes.
+"""
+import glob
+import logging
+import os
+import re
+import time
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+MERMAID_EXTENSIONS = (".mmd", ".mermaid")
+MARKDOWN_EXTENSIONS = (".md", ".markdown")
+
+Job = namedtuple("Job", ["input_file", "output_file"])
+# stats is a ConversionStats.as_dict() when statistics were requested
+Result = namedtuple("Result", ["input_file", "output_file", "ok", "error", "seconds", "cached", "stats"],
+                    defaults=(None,))
+
+_MAGIC_RE = re.compile(r"[*?[]")
+
+
+def _glob_root(pattern):
+    """The leading directories of pattern that contain no wildcards."""
+    root = pattern
+    while _MAGIC_RE.search(root):
+        root = os.path.dirname(root)
+    return root or os.curdir
+
+
+def collect_inputs(patterns, extensions=MERMAID_EXTENSIONS, out_dir=None):
+    """Expand files, directories and glob patterns into (path, relative_name) pairs.
+
+    relative_name is the path below the directory or glob root it was found
+    under, so outputs can mirror the input tree under --out-dir. Raises
+    ValueError if two inputs would be written to the same output file.
+    """
+    seen = set()
+    outputs = {}
+    inputs = []
+
+    def add(path, relative):
+        if path in seen:
+            return
+        output = os.path.normpath(output_path(path, relative, out_dir))
+        if output in outputs and output != "-":
+            raise ValueError(f"{outputs[output]} and {path} would both be written to {output}")
+        seen.add(path)
+        outputs[output] = path
+        inputs.append((path, relative))
+
+    for pattern in patterns:
+        if pattern == "-":
+            add(pattern, pattern)
+        elif os.path.isdir(pattern):
+            for dirpath, dirnames, filenames in os.walk(pattern):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if filename.endswith(extensions):
+                        path = os.path.join(dirpath, filename)
+                        add(path, os.path.relpath(path, pattern))
+        elif _MAGIC_RE.search(pattern):
+            root = _glob_root(pattern)
+            for path in sorted(glob.glob(pattern, recursive=True)):
+                if os.path.isfile(path):
+                    add(path, os.path.relpath(path, root))
+        else:
+            # Missing files are kept so they are reported as failures
+            add(pattern, os.path.basename(pattern))
+    return inputs
+
+
+def output_path(input_file, relative_name, out_dir=None):
+    if input_file == "-" and out_dir is None:
+        return "-"
+    if out_dir is None:
+        return os.path.splitext(input_file)[0] + ".drawio"
+    name = "stdin" if input_file == "-" else relative_name
+    return os.path.join(out_dir, os.path.splitext(name)[0] + ".drawio")
+
+
+def is_markdown(job, options):
+    """Whether job holds Mermaid blocks inside a Markdown document rather than a bare diagram."""
+    return options.get("markdown", False) or str(job.input_file).lower().endswith(MARKDOWN_EXTENSIONS)
+
+
+def new_stats(mode):
+    """A ConversionStats for mode None (no statistics), "time" or "memory"."""
+    if mode is None:
+        return None
+    from mermaid_to_drawio.stats import ConversionStats
+
+    return ConversionStats(memory=mode == "memory")
+
+
+def create_converter(job, options, workers=1, diagram_name="Mermaid Diagram", stats=None):
+    from mermaid_to_drawio.converter import MermaidToDrawIOConverter
+    from mermaid_to_drawio.ids import ID_ALLOCATORS
+
+    return MermaidToDrawIOConverter(
+        job.input_file,
+        job.output_file,
+        theme=options.get("theme"),
+        layout=options.get("layout", "grid"),
+        layout_options=dict(options.get("layout_options") or {}, workers=workers),
+        id_allocator=ID_ALLOCATORS[options.get("ids", "counter")](),
+        routing=options.get("route", False),
+        route_workers=workers,
+        sizing=options.get("sizing", "text"),
+        diagram_name=diagram_name,
+        stats=stats,
+    )
+
+
+def convert_file(job, options, cache=None, workers=1, stats=None):
+    """Convert one file; never raises so a bad input cannot abort the batch.
+
+    With a cache, the source is hashed first and a hit is copied into place
+    before any of the conversion code is imported. workers is the number of
+    processes this one file may use (for routing or Markdown pages). stats
+    ("time" or "memory") attaches per-stage statistics to the Result.
+    """
+    start = time.perf_counter()
+    cached = False
+    stats = new_stats(stats)
+    try:
+        if job.output_file != "-":
+            out_dir = os.path.dirname(job.output_file)
+            if out_dir:
+                os.makedirs(out_dir, exist_ok=True)
+
+        markdown = is_markdown(job, options)
+        source = key = None
+        if cache is not None and job.input_file != "-" and job.output_file != "-":
+            with open(job.input_file, "rb") as f:
+                source = f.read()
+            key = cache.key(source, dict(options, markdown=markdown))
+            cached = cache.get(key, job.output_file)
+
+        if cached:
+            logger.info(f"Saved Draw.io file: {job.output_file} (cached)")
+            if stats is not None:
+                stats.counts["cache_hits"] += 1
+        elif markdown:
+            from mermaid_to_drawio.markdown import convert_document
+
+            text = None if source is None else source.decode("utf-8")
+            convert_document(job.input_file, job.output_file, options, text, workers, stats)
+        else:
+            converter = create_converter(job, options, workers, stats=stats)
+            if source is None:
+                converter.parse_mermaid()
+            else:
+                converter.parse_text(source.decode("utf-8"))
+            converter.save(compact=options.get("compact", False), compress=options.get("compress", False),
+                           raise_errors=True)
+        if key is not None and not cached:
+            cache.put(key, job.output_file)
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return Result(job.input_file, job.output_file, error is None, error, time.perf_counter() - start, cached,
+                  None if stats is None else stats.as_dict())
+
+
+def _convert_job(args):
+    return convert_file(*args)
+
+
+def run_batch(jobs, options, workers=1, cache=None, stats=None):
+    """Convert every job, yielding a Result per file in input order.
+
+    A single job gets all the workers for itself; otherwise each job runs
+    in one process.
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield convert_file(job, options, cache, workers if len(jobs) == 1 else 1, stats)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_convert_job, [(job, options, cache, 1, stats) for job in jobs], chunksize=chunksize)
@@ -0,0 +1,104 @@
+"""
+On-disk cache of converted .drawio files, keyed by a hash of everything that
+affects the output. Only standard-library modules are imported here so that a
+cache hit never loads the parser, layout or XML code.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from mermaid_to_drawio import __version__
+from mermaid_to_drawio.layout_defaults import resolve_layout_options
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_AGE = 30 * 24 * 3600
+# Bump whenever the same source and options convert to different output
+CACHE_FORMAT = 2
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "mermaid2drawio")
+
+
+class ConversionCache:
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def key(self, source, options):
+        """Hash the Mermaid source (bytes) with the conversion options, package version and cache format.
+
+        Layout options are hashed as the spacing the LayoutManager resolves
+        them to, so changed defaults invalidate old entries.
+        """
+        layout_options = dict(options.get("layout_options") or {})
+        layout_options.update(resolve_layout_options(layout_options))
+        options = dict(options, layout_options=layout_options)
+        digest = hashlib.sha256()
+        digest.update(f"{__version__}\0{CACHE_FORMAT}".encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(json.dumps(options, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(source)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".drawio")
+
+    def get(self, key, output_file):
+        """Copy the cached output for key to output_file; returns False on a miss."""
+        path = self._path(key)
+        try:
+            shutil.copyfile(path, output_file)
+        except FileNotFoundError:
+            return False
+        # mtime doubles as the last-used time for eviction
+        os.utime(path)
+        return True
+
+    def put(self, key, output_file):
+        path = self._path(key)
+        try:
+            import tempfile
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file first so concurrent workers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            os.close(fd)
+            shutil.copyfile(output_file, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not cache {output_file}: {e}")
+
+    def evict(self):
+        """Drop entries older than max_age, then least recently used ones until under max_bytes."""
+        entries = []
+        now = time.time()
+        for dirpath, _, filenames in os.walk(self.cache_dir):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            if total <= self.max_bytes and now - mtime <= self.max_age:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
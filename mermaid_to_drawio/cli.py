@@ -0,0 +1,212 @@
+import argparse
+import logging
+import os
+import sys
+from mermaid_to_drawio.batch import (
+    MARKDOWN_EXTENSIONS, MERMAID_EXTENSIONS, Job, collect_inputs, is_markdown, output_path, run_batch,
+)
+from mermaid_to_drawio.cache import ConversionCache
+from mermaid_to_drawio.themes import THEMES
+
+logger = logging.getLogger("mermaid_to_drawio")
+
+
+def _add_conversion_arguments(parser):
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Number of worker processes (0 = one per CPU)")
+    parser.add_argument("--theme", choices=list(THEMES), default="light", help="Color theme")
+    parser.add_argument("--layout", choices=["layered", "grid"], default="layered",
+                        help="Layout engine: hierarchical layers following edges, or a fixed grid")
+    parser.add_argument("--route", action="store_true",
+                        help="Route edges orthogonally around nodes and subgraphs")
+    parser.add_argument("--compact", action="store_true", help="Write XML without indentation")
+    parser.add_argument("--compress", action="store_true",
+                        help="Store diagrams deflated and base64-encoded, as draw.io does (much smaller files)")
+    parser.add_argument("--node-size", choices=["text", "fixed"], default="text",
+                        help="Size node boxes to fit their labels, or make them all 180x60")
+    parser.add_argument("--ids", choices=["counter", "hash", "uuid"], default="counter",
+                        help="How group and edge ids are generated (counter and hash are reproducible)")
+
+
+def _options(args):
+    return {
+        "theme": THEMES[args.theme],
+        "layout": args.layout,
+        "layout_options": {},
+        "compact": args.compact,
+        "compress": args.compress,
+        "ids": args.ids,
+        "route": args.route,
+        "sizing": args.node_size,
+    }
+
+
+def _workers(args):
+    return args.jobs if args.jobs > 0 else os.cpu_count() or 1
+
+
+def _setup_logging():
+    if not logging.getLogger().handlers:
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+
+def _report_stats(results, fmt):
+    import json
+    from mermaid_to_drawio.stats import ConversionStats
+
+    total = ConversionStats()
+    for result in results:
+        if result.stats is not None:
+            total.merge(result.stats)
+    if fmt == "json":
+        files = [
+            dict(result.stats or {}, input=result.input_file, output=result.output_file, ok=result.ok,
+                 cached=result.cached, seconds=result.seconds)
+            for result in results
+        ]
+        print(json.dumps({"total": total.as_dict(), "files": files}, indent=2), file=sys.stderr)
+    else:
+        if len(results) > 1:
+            print(f"{len(results)} files", file=sys.stderr)
+        print(total.format_table(), file=sys.stderr)
+
+
+def serve_main(argv=None):
+    parser = argparse.ArgumentParser(prog="mermaid2drawio serve",
+                                     description="Serve Mermaid to Draw.io conversions over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="TCP port to listen on")
+    parser.add_argument("--unix-socket", help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--cache-size", type=int, default=256, help="Number of recent results kept in memory")
+    _add_conversion_arguments(parser)
+    args = parser.parse_args(argv)
+    _setup_logging()
+
+    from mermaid_to_drawio.server import serve
+    return serve(_options(args), args.host, args.port, args.unix_socket, _workers(args), args.cache_size)
+
+
+def reverse_main(argv=None):
+    parser = argparse.ArgumentParser(prog="drawio2mermaid", description="Convert Draw.io diagrams back to Mermaid")
+    parser.add_argument("inputs", nargs="+", metavar="input", help="Draw.io input files ('-' for stdin)")
+    parser.add_argument("-o", "--output",
+                        help="Mermaid output file for a single input ('-' for stdout, .md for all pages as Markdown)")
+    parser.add_argument("--page", type=int, help="Convert only this page (0-based)")
+    parser.add_argument("--theme", choices=list(THEMES), default="light",
+                        help="Theme the diagram was converted with; its colors are not written as styles")
+    args = parser.parse_args(argv)
+    _setup_logging()
+    if args.output and len(args.inputs) > 1:
+        parser.error("-o/--output can only be used with a single input")
+
+    from mermaid_to_drawio.reverse import DrawioToMermaidConverter
+
+    failed = 0
+    for path in args.inputs:
+        converter = DrawioToMermaidConverter(path, args.output, theme=THEMES[args.theme])
+        try:
+            converter.parse_drawio()
+            if args.page is not None and not 0 <= args.page < len(converter.pages):
+                raise ValueError(f"no page {args.page} ({len(converter.pages)} pages)")
+            if args.output is None and path != "-" and args.page is None and len(converter.pages) > 1:
+                # <name>.md is likely the document the pages came from
+                raise ValueError(f"{len(converter.pages)} pages; choose one with --page or write all "
+                                 f"of them with -o FILE.md")
+            converter.save(args.page)
+        except Exception as e:
+            failed += 1
+            logger.error(f"FAIL {path}: {e}")
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["serve"]:
+        return serve_main(argv[1:])
+
+    parser = argparse.ArgumentParser(description="Convert Mermaid to Draw.io",
+                                     epilog="Run 'mermaid2drawio serve --help' for the conversion server.")
+    parser.add_argument("inputs", nargs="+", metavar="input",
+                        help="Mermaid input files, directories or glob patterns ('-' for stdin)")
+    parser.add_argument("-o", "--output", help="Draw.io output file for a single input ('-' for stdout)")
+    parser.add_argument("--out-dir", help="Write outputs under this directory instead of next to the inputs")
+    _add_conversion_arguments(parser)
+    parser.add_argument("--markdown", action="store_true",
+                        help="Treat inputs as Markdown and convert every ```mermaid block into a page of one "
+                             "file (automatic for .md and .markdown files)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and update the output whenever the (single) input changes")
+    parser.add_argument("--cache-dir", help="Directory for cached outputs (default: ~/.cache/mermaid2drawio)")
+    parser.add_argument("--no-cache", action="store_true", help="Always convert, without reading or writing the cache")
+    parser.add_argument("--stats", nargs="?", const="table", choices=["table", "json"],
+                        help="Print per-stage times and graph counts to stderr (default: table)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Add per-stage peak memory to --stats (traces allocations, so runs slower)")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Write a cProfile dump of the conversion to FILE (runs in a single process)")
+    args = parser.parse_args(argv)
+    _setup_logging()
+
+    options = _options(args)
+    options["markdown"] = args.markdown
+    cache = None if args.no_cache else ConversionCache(args.cache_dir)
+
+    extensions = MERMAID_EXTENSIONS + MARKDOWN_EXTENSIONS if args.markdown else MERMAID_EXTENSIONS
+    try:
+        inputs = collect_inputs(args.inputs, extensions, args.out_dir)
+    except ValueError as e:
+        parser.error(str(e))
+    if not inputs:
+        parser.error("no Mermaid files found")
+    if args.output and len(inputs) > 1:
+        parser.error("-o/--output can only be used with a single input; use --out-dir")
+    if args.watch and (len(inputs) > 1 or inputs[0][0] == "-"):
+        parser.error("--watch needs exactly one input file")
+
+    jobs = [
+        Job(path, args.output or output_path(path, relative, args.out_dir))
+        for path, relative in inputs
+    ]
+    if args.watch:
+        if is_markdown(jobs[0], options):
+            parser.error("--watch does not support Markdown inputs")
+        from mermaid_to_drawio.watch import watch
+        return watch(jobs[0], options)
+
+    workers = _workers(args)
+    stats = "memory" if args.trace_memory else "time" if args.stats else None
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        # Worker processes would not show up in the profile
+        workers = 1
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    failed = 0
+    results = []
+    for result in run_batch(jobs, options, workers, cache, stats):
+        results.append(result)
+        if result.ok:
+            logger.debug(f"ok   {result.input_file} -> {result.output_file} ({result.seconds * 1000:.0f}ms)")
+        else:
+            failed += 1
+            logger.error(f"FAIL {result.input_file}: {result.error}")
+
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        logger.info(f"Wrote profile: {args.profile} (view with: python -m pstats {args.profile})")
+    if stats is not None:
+        _report_stats(results, args.stats or "table")
+
+    if cache is not None:
+        cache.evict()
+    if len(jobs) > 1 or failed:
+        logger.info(f"{len(jobs) - failed} converted, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+draw.io's compressed diagram format.
+
+A compressed ``<diagram>`` holds its mxGraphModel as text that is
+URL-encoded (like JavaScript's encodeURIComponent), raw-deflated (no zlib
+header) and base64-encoded. draw.io opens both these and plain diagrams.
+"""
+import base64
+import xml.etree.ElementTree as ET
+import zlib
+from urllib.parse import quote, unquote, unquote_to_bytes
+
+# Characters encodeURIComponent leaves alone besides letters, digits and "-_.~"
+_URI_SAFE = "!*'()"
+_ASCII_QUOTE = {c: f"%{c:02X}" for c in range(128) if chr(c) != quote(chr(c), safe=_URI_SAFE)}
+
+
+def _encode(text):
+    # str.translate runs in C; quote() handles the rarer non-ASCII text
+    if text.isascii():
+        return text.translate(_ASCII_QUOTE).encode("ascii")
+    return quote(text, safe=_URI_SAFE).encode("ascii")
+
+
+class DeflateStream:
+    """Text sink that writes everything written to it to fh in compressed form.
+
+    The base64 output is produced in step with the deflate output, so the
+    model is never held in memory as a whole.
+    """
+
+    def __init__(self, fh, level=zlib.Z_DEFAULT_COMPRESSION):
+        self.fh = fh
+        self._deflate = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        # base64 works on 3-byte groups; leftover bytes wait for the next write
+        self._pending = b""
+
+    def write(self, text):
+        self._emit(self._deflate.compress(_encode(text)))
+
+    def _emit(self, data):
+        if self._pending:
+            data = self._pending + data
+        cut = len(data) - len(data) % 3
+        self._pending = data[cut:]
+        if cut:
+            self.fh.write(base64.b64encode(data[:cut]).decode("ascii"))
+
+    def close(self):
+        self._emit(self._deflate.flush())
+        if self._pending:
+            self.fh.write(base64.b64encode(self._pending).decode("ascii"))
+            self._pending = b""
+
+
+class InflateStream:
+    """Binary file-like reader of the model XML in a compressed diagram payload.
+
+    The payload is inflated and URL-decoded chunk by chunk as it is read
+    (e.g. by ET.iterparse), so the model text never exists as a whole.
+    """
+
+    def __init__(self, payload, chunk_size=1 << 16):
+        self._data = base64.b64decode(payload.strip())
+        self._inflate = zlib.decompressobj(-zlib.MAX_WBITS)
+        self._chunk_size = chunk_size
+        # An escape cut in two at the end of a chunk waits for the next one
+        self._pending = b""
+        self._done = False
+
+    def read(self, size=-1):
+        while not self._done:
+            if self._data:
+                text = self._pending + self._inflate.decompress(self._data, self._chunk_size)
+                self._data = self._inflate.unconsumed_tail
+                cut = text.rfind(b"%", len(text) - 2)
+                if cut == -1:
+                    cut = len(text)
+                text, self._pending = text[:cut], text[cut:]
+            else:
+                text = self._pending + self._inflate.flush()
+                self._pending = b""
+                self._done = True
+            if text:
+                return unquote_to_bytes(text)
+        return b""
+
+
+def compress(text):
+    """Compress model XML text into a diagram payload."""
+    data = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS)
+    payload = data.compress(_encode(text)) + data.flush()
+    return base64.b64encode(payload).decode("ascii")
+
+
+def decompress(payload):
+    """Return the model XML text stored in a compressed diagram payload."""
+    data = zlib.decompress(base64.b64decode(payload.strip()), -zlib.MAX_WBITS)
+    return unquote(data.decode("ascii"))
+
+
+def diagram_model(diagram):
+    """Return the mxGraphModel element of a <diagram>, decompressing it if needed."""
+    model = diagram.find("mxGraphModel")
+    if model is None and diagram.text and diagram.text.strip():
+        model = ET.fromstring(decompress(diagram.text))
+    return model
+
+
+def read_pages(source):
+    """Read a .drawio file (path or file object) into a list of (page name, mxGraphModel element)."""
+    root = ET.parse(source).getroot()
+    return [(diagram.get("name"), diagram_model(diagram)) for diagram in root.iter("diagram")]
@@ -1,11 +1,19 @@
-import argparse
-import re
-import uuid
+import io
+import sys
 import logging
+from collections import Counter
+from contextlib import nullcontext
 import xml.etree.ElementTree as ET
-import xml.dom.minidom
+from mermaid_to_drawio.graph import Graph
+from mermaid_to_drawio.ids import CounterIdAllocator
 from mermaid_to_drawio.layout_manager import LayoutManager
+from mermaid_to_drawio.parser import (
+    tokenize, CHAIN, HEADER, DIRECTION, SUBGRAPH, END, STYLE, LINK_STYLE, CLASS_DEF, CLASS,
+)
 from mermaid_to_drawio.style_parser import StyleParser
+from mermaid_to_drawio.text_metrics import node_size
+from mermaid_to_drawio.themes import DEFAULT_THEME
+from mermaid_to_drawio.writer import DrawioWriter
 
 logger = logging.getLogger(__name__)
 
@@ -20,280 +28,582 @@ SHAPE_MAP = {
     "hexagon": "shape=hexagon",
 }
 
+_UNSEEN = object()
+
 class MermaidToDrawIOConverter:
-    def __init__(self, input_file, output_file=None, theme=None):
+    def __init__(self, input_file=None, output_file=None, theme=None, layout="grid", layout_options=None,
+                 id_allocator=None, routing=False, route_workers=1, diagram_name="Mermaid Diagram", stats=None,
+                 sizing="text"):
         self.input_file = input_file
-        self.output_file = output_file or input_file.rsplit(".", 1)[0] + ".drawio"
-        self.theme = theme or {
-            "node": {"fillColor": "#ffffff", "strokeColor": "#333333", "strokeWidth": "1"},
-            "edge": {"strokeColor": "#666666", "strokeWidth": "2"}
-        }
-        self.nodes = {}
-        self.edges = []
-        self.styles = {}
-        self.shape_styles = {}
-        self.groups = {}
-        self.node_to_group = {}
+        if output_file is None and input_file is not None:
+            # Diagrams read from stdin are written to stdout
+            output_file = "-" if input_file == "-" else input_file.rsplit(".", 1)[0] + ".drawio"
+        self.output_file = output_file
+        self.theme = theme or DEFAULT_THEME
+        # Theme fragments are formatted once; final style strings are interned
+        # so identically styled cells share one string
+        # "text" sizes each node box to its wrapped label, "fixed" uses NODE_WIDTH x NODE_HEIGHT
+        self.sizing = sizing
+        wrap = "whiteSpace=wrap;html=1;" if sizing == "text" else ""
+        self._node_theme_style = (f"{wrap}fillColor={self.theme['node']['fillColor']};"
+                                  f"strokeColor={self.theme['node']['strokeColor']};"
+                                  f"strokeWidth={self.theme['node']['strokeWidth']}")
+        self._edge_theme_style = (f"endArrow=block;strokeColor={self.theme['edge']['strokeColor']};"
+                                  f"strokeWidth={self.theme['edge']['strokeWidth']}")
+        self._style_cache = {}
+        self._class_style_cache = {}
+        self._edge_style_cache = {}
+        self.graph = Graph()
         self.group_stack = []
-        self.edge_styles = {}
-        self.layout_manager = LayoutManager()
+        # Styles and classes set on nodes that have not been mentioned yet
+        self.pending_styles = {}
+        self.pending_classes = {}
+        self.link_count = 0
+        self.id_allocator = id_allocator or CounterIdAllocator()
+        self.direction = "TD"
+        self.layout_manager = LayoutManager(engine=layout, graph=self.graph, **(layout_options or {}))
+        self.routing = routing
+        self.route_workers = route_workers
+        # Optional ConversionStats recording per-stage time, memory and counts
+        self.stats = stats
         
         self.mxfile = ET.Element("mxfile", host="app.diagrams.net")
-        self.diagram = ET.SubElement(self.mxfile, "diagram", name="Mermaid Diagram")
+        self.diagram = ET.SubElement(self.mxfile, "diagram", name=diagram_name)
         self.graph_model = ET.SubElement(self.diagram, "mxGraphModel")
         self.root = ET.SubElement(self.graph_model, "root")
         ET.SubElement(self.root, "mxCell", id="0")
         ET.SubElement(self.root, "mxCell", id="1", parent="0")
+        self._emit = self.root.append
+        self._built = False
+        # Serialized cell text per compact setting and tokens per source line,
+        # kept once update() (or an incremental parse) is in use
+        self._serialized = None
+        self._line_tokens = None
+
+    def _stage(self, name):
+        return self.stats.stage(name) if self.stats is not None else nullcontext()
 
-    def generate_id(self):
-        return str(uuid.uuid4()).replace("-", "")[:10]
+    def generate_id(self, kind="group", path=()):
+        return self.id_allocator.allocate(kind, path)
 
     def parse_mermaid(self):
-        try:
-            with open(self.input_file, "r", encoding="utf-8") as f:
-                lines = f.readlines()
+        if self.input_file == "-":
+            self.parse_stream(sys.stdin)
+            return
+        with open(self.input_file, "r", encoding="utf-8") as f:
+            self.parse_stream(f)
 
-            edge_index = 0
-            for line in lines:
-                line = line.strip()
-                if not line or line.startswith("%%") or line.startswith("direction"):
-                    continue
-                    
-                # Handle subgraphs
-                if line.startswith("subgraph"):
-                    self._handle_subgraph(line)
-                    continue
-                    
-                # Handle group end
-                if line == "end":
-                    if self.group_stack:
-                        self.group_stack.pop()
-                    continue
-                    
-                # Handle node declarations
-                if self._parse_node(line):
-                    continue
-                    
-                # Handle styles
-                if self._parse_style(line):
-                    continue
-                    
-                # Handle edges
-                if self._parse_edge(line, edge_index):
-                    edge_index += 1
-                    continue
-                    
-                # Handle edge styles
-                if self._parse_edge_style(line):
-                    continue
+    def parse_text(self, text, incremental=False):
+        """Parse Mermaid source held in a string.
+
+        incremental keeps the token of every line, so a later update() only
+        tokenizes the lines that changed.
+        """
+        if incremental:
+            self._line_tokens = {}
+            self.parse_stream(text.splitlines())
+        else:
+            self.parse_stream(io.StringIO(text))
+
+    def parse_stream(self, lines):
+        """Parse Mermaid source from any iterable of lines (file object, stdin, generator).
+
+        Lines are consumed lazily and fed straight into the graph, so the
+        source never has to be held in memory as a whole.
+        """
+        counts = self.stats.counts if self.stats is not None else None
+        line_tokens = self._line_tokens
+        try:
+            with self._stage("parse"):
+                for line in lines:
+                    if isinstance(line, bytes):
+                        line = line.decode("utf-8")
+                    token = tokenize(line, counts)
+                    if line_tokens is not None:
+                        line_tokens[line] = token
+                    if token is not None:
+                        self._apply_token(token)
+                    if counts is not None:
+                        counts["lines"] += 1
 
         except Exception as e:
             logger.error(f"Error parsing Mermaid: {e}")
             raise
 
-    def _handle_subgraph(self, line):
-        group_name = line[len("subgraph"):].strip()
-        group_id = self.generate_id()
+    def _apply_token(self, token):
+        kind, value = token
+        if kind == CHAIN:
+            self._add_chain(*value)
+        elif kind == SUBGRAPH:
+            self._handle_subgraph(value)
+        elif kind in (HEADER, DIRECTION):
+            if not value:
+                pass
+            elif self.group_stack:
+                self.layout_manager.set_group_direction(self.group_stack[-1], value.upper())
+            else:
+                self.direction = value.upper()
+                self.layout_manager.direction = self.direction
+        elif kind == END:
+            if self.group_stack:
+                self.group_stack.pop()
+        elif kind == STYLE:
+            node_id, style_str = value
+            node = self.graph.nodes.get(node_id)
+            if node is None:
+                self.pending_styles[node_id] = StyleParser.parse(style_str)
+            else:
+                node.style = StyleParser.parse(style_str)
+                self._measure(node)
+        elif kind == LINK_STYLE:
+            indices, style_str = value
+            style = StyleParser.parse(style_str)
+            if indices is None:
+                self.graph.default_link_style = style
+            else:
+                for idx in indices:
+                    self.graph.link_styles[idx] = style
+        elif kind == CLASS_DEF:
+            names, style_str = value
+            # Each class is resolved once; nodes refer to it by name
+            style = StyleParser.parse(style_str)
+            for name in names:
+                self.graph.class_defs[name] = style
+            self._class_style_cache.clear()
+            self._style_cache.clear()
+            if self.sizing == "text" and "fontSize=" in style:
+                # The class may be applied to nodes that were already measured
+                for node in self.graph.nodes.values():
+                    self._measure(node)
+        elif kind == CLASS:
+            node_ids, name = value
+            for node_id in node_ids:
+                node = self.graph.nodes.get(node_id)
+                if node is None:
+                    classes = self.pending_classes.get(node_id, ())
+                    if name not in classes:
+                        self.pending_classes[node_id] = classes + (name,)
+                elif name not in node.classes:
+                    node.classes += (name,)
+                    self._measure(node)
+
+    def _handle_subgraph(self, group_name):
         parent_id = self.group_stack[-1] if self.group_stack else None
-        self.groups[group_id] = (group_name, parent_id)
+        path = [group_name]
+        ancestor = parent_id
+        while ancestor is not None:
+            group = self.graph.groups[ancestor]
+            path.append(group.name)
+            ancestor = group.parent
+        group_id = self.generate_id("group", tuple(reversed(path)))
+        self.layout_manager.add_group(group_id, parent_id).name = group_name
         self.group_stack.append(group_id)
 
-    def _parse_node(self, line):
-        patterns = [
-            (r"(\w+)\[(.+?)\]", "rectangle"),
-            (r"(\w+)\((.+?)\)", "rounded"),
-            (r"(\w+)\(\((.+?)\)\)", "ellipse"),
-            (r"(\w+)>([^\]\[]+)\]", "parallelogram"),
-            (r"(\w+)\{([^}]+)\}", "rhombus"),
-            (r"(\w+)\[\[(.+?)\]\]", "cylinder"),
-            (r"(\w+)\(\(\((.+?)\)\)\)", "hexagon"),
-        ]
-        
-        for pattern, shape in patterns:
-            match = re.match(pattern, line)
-            if match:
-                node_id, label = match.groups()
-                self.nodes[node_id] = label
-                self.shape_styles[node_id] = SHAPE_MAP[shape]
-                if self.group_stack:
-                    self.node_to_group[node_id] = self.group_stack[-1]
-                self.layout_manager.add_node(node_id)
-                return True
-        return False
-
-    def _parse_style(self, line):
-        match = re.match(r"style\s+(\w+)\s+(.*)", line)
-        if match:
-            node_id, style_str = match.groups()
-            self.styles[node_id] = StyleParser.parse(style_str)
-            return True
-        return False
-
-    def _parse_edge(self, line, edge_index):
-        patterns = [
-            (r"(\w+)\s*--\s*(.*?)\s*-->\s*(\w+)", True),   # Labeled edge
-            (r"(\w+)\s*-->\s*(\w+)", False),               # Simple edge
-            (r"(\w+)\s*<-->\s*(\w+)", False)               # Bidirectional
-        ]
-        
-        for pattern, has_label in patterns:
-            match = re.match(pattern, line)
-            if match:
-                groups = match.groups()
-                if has_label:
-                    src, label, tgt = groups
-                else:
-                    src, tgt = groups
-                    label = ""
-                
-                self._add_edge(src, tgt, label, edge_index)
-                if " <--> " in line:  # Bidirectional
-                    self._add_edge(tgt, src, "", edge_index + 1)
-                    edge_index += 1
-                return True
-        return False
-
-    def _parse_edge_style(self, line):
-        match = re.match(r"linkStyle\s+(\d+)\s+(.*)", line)
-        if match:
-            idx, style_str = match.groups()
-            self.edge_styles[int(idx)] = StyleParser.parse(style_str)
-            return True
-        return False
+    def _add_chain(self, node_refs, links):
+        for ref in node_refs:
+            self._add_node(ref)
+        for i, link in enumerate(links):
+            src, tgt = node_refs[i].id, node_refs[i + 1].id
+            self._add_edge(src, tgt, link.label, self.link_count)
+            if link.bidirectional:
+                self._add_edge(tgt, src, "", self.link_count)
+            self.link_count += 1
+
+    def _add_node(self, ref):
+        node_id, label, shape, class_name = ref
+        node = self.graph.nodes.get(node_id)
+        if node is None:
+            node = self.graph.add_node(node_id)
+            node.style = self.pending_styles.pop(node_id, None)
+            node.classes = self.pending_classes.pop(node_id, ())
+        elif shape is None:
+            if class_name is not None and class_name not in node.classes:
+                node.classes += (class_name,)
+                self._measure(node)
+            return
+        if class_name is not None and class_name not in node.classes:
+            node.classes += (class_name,)
+        if shape is not None:
+            node.label = label
+            node.shape = shape
+        # A node belongs to the subgraph it is declared or first mentioned in
+        if self.group_stack:
+            self.layout_manager.assign_node(node_id, self.group_stack[-1])
+        self.layout_manager.add_node(node_id)
+        self._measure(node)
+
+    def _measure(self, node):
+        if self.sizing == "text":
+            width, height = node_size(node.label, node.shape, self._custom_style(node))
+            self.layout_manager.set_size(node.id, width, height)
 
     def _add_edge(self, src, tgt, label, edge_index):
-        self.edges.append((src, tgt, label, edge_index))
-        self.nodes.setdefault(src, src)
-        self.nodes.setdefault(tgt, tgt)
-        self.layout_manager.add_node(src)
-        self.layout_manager.add_node(tgt)
-
-    def build(self):
-        # Create groups
-        group_elements = {}
-        for gid, (name, parent_id) in self.groups.items():
-            group_elements[gid] = self._create_group(gid, name, parent_id)
-        
-        # Create nodes
-        for node_id, label in self.nodes.items():
-            group_id = self.node_to_group.get(node_id)
-            self._create_node(node_id, label, group_id)
-        
-        # Adjust group geometries
-        for gid, (geom, _) in group_elements.items():
-            bbox = self.layout_manager.get_group_bbox(gid)
-            if bbox:
-                geom.attrib.update({
-                    "x": str(bbox[0]),
-                    "y": str(bbox[1]),
-                    "width": str(bbox[2]),
-                    "height": str(bbox[3])
-                })
-        
-        # Create edges
-        for src, tgt, label, edge_idx in self.edges:
-            self._create_edge(src, tgt, label, edge_idx)
-
-    def _create_group(self, gid, name, parent_id=None):
-        parent = parent_id or "1"
-        cell = ET.SubElement(self.root, "mxCell", {
-            "id": gid,
-            "value": name,
+        self.layout_manager.add_edge(src, tgt, label, edge_index)
+
+    def build(self, writer=None):
+        """Create the mxCell elements for all groups, nodes and edges.
+
+        Cells are appended to the in-memory tree, or streamed straight to
+        ``writer`` (a DrawioWriter) without being kept when one is given.
+        """
+        if writer is None:
+            self._emit = self.root.append
+        elif self.stats is None:
+            self._emit = writer.write_cell
+        else:
+            # Streamed cells are written as they are built; count the writing as save time
+            self._emit = self.stats.timed("save", writer.write_cell)
+        try:
+            with self._stage("build"):
+                # Positions and group extents must be known before cells are emitted
+                with self._stage("layout"):
+                    self.layout_manager.layout()
+                if self.routing:
+                    from mermaid_to_drawio.routing import route_edges
+
+                    with self._stage("route"):
+                        route_edges(self.layout_manager, workers=self.route_workers)
+
+                # Containers come before their contents
+                for group in self.graph.walk_groups():
+                    self._create_group(group)
+
+                for node in self.graph.nodes.values():
+                    self._create_node(node)
+
+                for edge in self.graph.edges:
+                    self._create_edge(edge)
+        finally:
+            self._emit = self.root.append
+        if self.stats is not None:
+            counts = self.stats.counts
+            counts["nodes"] += len(self.graph.nodes)
+            counts["edges"] += len(self.graph.edges)
+            counts["groups"] += len(self.graph.groups)
+        if writer is None:
+            self._built = True
+
+    def _origin(self, group_id):
+        """Top-left corner of a group (0, 0 for the top level); draw.io places children relative to it."""
+        if group_id is None:
+            return 0, 0
+        bbox = self.layout_manager.get_group_bbox(group_id)
+        return (bbox[0], bbox[1]) if bbox else (0, 0)
+
+    def _group_geometry(self, group):
+        x, y, width, height = self.layout_manager.get_group_bbox(group.id) or [0, 0, 100, 100]
+        origin_x, origin_y = self._origin(group.parent)
+        return x - origin_x, y - origin_y, width, height
+
+    def _node_geometry(self, node):
+        x, y = self.layout_manager.get_position(node.id)
+        origin_x, origin_y = self._origin(node.group)
+        return (x - origin_x, y - origin_y, *self.layout_manager.get_size(node.id))
+
+    def _create_group(self, group):
+        bbox = self._group_geometry(group)
+        cell = ET.Element("mxCell", {
+            "id": group.id,
+            "value": group.name,
             "style": "swimlane;collapsible=0;",
             "vertex": "1",
-            "parent": parent
+            "parent": group.parent or "1"
         })
-        geom = ET.SubElement(cell, "mxGeometry", {
-            "x": "0", "y": "0", "width": "100", "height": "100", "as": "geometry"
+        ET.SubElement(cell, "mxGeometry", {
+            "x": str(bbox[0]),
+            "y": str(bbox[1]),
+            "width": str(bbox[2]),
+            "height": str(bbox[3]),
+            "as": "geometry"
         })
-        return geom, cell
+        self._emit(cell)
+        return cell
 
-    def _create_node(self, node_id, label, group_id=None):
-        base_style = self.shape_styles.get(node_id, SHAPE_MAP["rectangle"])
-        custom_style = self.styles.get(node_id, "")
-        theme_style = f"fillColor={self.theme['node']['fillColor']};strokeColor={self.theme['node']['strokeColor']};strokeWidth={self.theme['node']['strokeWidth']}"
-        style = f"{base_style};{theme_style};{custom_style}"
-        
-        x, y = self.layout_manager.get_position(node_id)
-        parent = group_id or "1"
-        
-        cell = ET.SubElement(self.root, "mxCell", {
-            "id": node_id,
-            "value": label,
+    def _create_node(self, node):
+        style = self._node_style(node)
+        x, y, width, height = self._node_geometry(node)
+
+        cell = ET.Element("mxCell", {
+            "id": node.id,
+            "value": node.label,
             "style": style,
             "vertex": "1",
-            "parent": parent
+            "parent": node.group or "1"
         })
         ET.SubElement(cell, "mxGeometry", {
-            "x": str(x), "y": str(y), "width": "180", "height": "60", "as": "geometry"
+            "x": str(x), "y": str(y), "width": str(width), "height": str(height), "as": "geometry"
         })
-        self.layout_manager.add_node_to_group(group_id, node_id, x, y, 180, 60)
+        self._emit(cell)
         return cell
 
-    def _create_edge(self, src, tgt, label, edge_idx):
-        default_style = f"endArrow=block;strokeColor={self.theme['edge']['strokeColor']};strokeWidth={self.theme['edge']['strokeWidth']}"
-        custom_style = self.edge_styles.get(edge_idx, "")
-        style = f"{default_style};{custom_style}"
-        
-        edge = ET.SubElement(self.root, "mxCell", {
-            "value": label,
-            "style": style,
+    def _node_style(self, node):
+        key = (node.shape, node.classes, node.style)
+        style = self._style_cache.get(key)
+        if style is None:
+            base_style = SHAPE_MAP[node.shape or "rectangle"]
+            style = self._style_cache[key] = f"{base_style};{self._node_theme_style};{self._custom_style(node)}"
+        return style
+
+    def _custom_style(self, node):
+        """The node's class styles followed by its own style, which takes precedence."""
+        class_style = self._class_style(node.classes)
+        if not class_style:
+            return node.style or ""
+        return f"{class_style};{node.style}" if node.style else class_style
+
+    def _class_style(self, classes):
+        style = self._class_style_cache.get(classes)
+        if style is None:
+            class_defs = self.graph.class_defs
+            # classDef default styles the nodes without a class
+            names = classes or ("default",)
+            style = ";".join(class_defs[name] for name in names if class_defs.get(name))
+            self._class_style_cache[classes] = style
+        return style
+
+    def _edge_style(self, edge_idx):
+        custom_style = self.graph.link_styles.get(edge_idx, self.graph.default_link_style or "")
+        style = self._edge_style_cache.get(custom_style)
+        if style is None:
+            style = self._edge_style_cache[custom_style] = f"{self._edge_theme_style};{custom_style}"
+        return style
+
+    def _create_edge(self, edge):
+        cell = ET.Element("mxCell", {
+            "id": self.generate_id("edge", (edge.source, edge.target, str(edge.index))),
+            "value": edge.label,
+            "style": self._edge_style(edge.index),
             "edge": "1",
-            "source": src,
-            "target": tgt,
+            "source": edge.source,
+            "target": edge.target,
             "parent": "1"
         })
-        ET.SubElement(edge, "mxGeometry", {"relative": "1", "as": "geometry"})
-        return edge
+        geometry = ET.SubElement(cell, "mxGeometry", {"relative": "1", "as": "geometry"})
+        if edge.points:
+            points = ET.SubElement(geometry, "Array", {"as": "points"})
+            for x, y in edge.points:
+                ET.SubElement(points, "mxPoint", {"x": str(x), "y": str(y)})
+        self._emit(cell)
+        return cell
+
+    def update(self, text):
+        """Re-parse the full source and patch the built diagram to match it.
+
+        The new statements are diffed against the current nodes, edges,
+        styles, linkStyles and subgraphs. Only the layout blocks that contain
+        changes are laid out again, and only cells whose content, parent or
+        geometry changed are rewritten. Returns the ids of the cells that were
+        added, changed or removed.
+        """
+        if not self._built:
+            self.build()
+        if self._serialized is None:
+            self._serialized = {}
+        layout = self.layout_manager
+
+        fresh = MermaidToDrawIOConverter(theme=self.theme, layout=layout.engine,
+                                         id_allocator=self.id_allocator.fresh(), sizing=self.sizing)
+        # Unchanged lines reuse their tokens from the previous update
+        previous_tokens = self._line_tokens or {}
+        self._line_tokens = {}
+        for line in text.splitlines():
+            token = previous_tokens.get(line, _UNSEEN)
+            if token is _UNSEEN:
+                token = tokenize(line)
+            self._line_tokens[line] = token
+            if token is not None:
+                fresh._apply_token(token)
+
+        graph, new = self.graph, fresh.graph
+        # Geometry is compared relative to the parent, so moving a group does
+        # not rewrite the cells inside it
+        old_groups = {gid: (group.name, group.parent, self._group_geometry(group))
+                      for gid, group in graph.groups.items()}
+        old_nodes = {node_id: (self._node_state(node), self._node_geometry(node))
+                     for node_id, node in graph.nodes.items()}
+        old_edges = [(edge.source, edge.target, edge.label, self._edge_style(edge.index), edge.points)
+                     for edge in graph.edges]
+        old_orders = layout.block_orders()
 
-    def save(self):
+        # Bring the shared graph in line with the new statements; the layout
+        # manager marks the blocks that have to be laid out again
+        for gid, new_group in new.groups.items():
+            group = layout.add_group(gid, new_group.parent)
+            group.name = new_group.name
+            if group.direction != new_group.direction:
+                group.direction = new_group.direction
+                layout.invalidate(gid)
+        for node_id, new_node in new.nodes.items():
+            node = graph.nodes.get(node_id)
+            if node is None or node.group != new_node.group:
+                layout.assign_node(node_id, new_node.group)
+                node = layout.add_node(node_id)
+            node.label, node.shape, node.style = new_node.label, new_node.shape, new_node.style
+            node.classes = new_node.classes
+            layout.set_size(node_id, new_node.width, new_node.height)
+        for node_id in [node_id for node_id in graph.nodes if node_id not in new.nodes]:
+            layout.remove_node(node_id)
+        old_pairs = Counter((edge.source, edge.target) for edge in graph.edges)
+        new_pairs = Counter((edge.source, edge.target) for edge in new.edges)
+        for pair, count in (old_pairs - new_pairs).items():
+            for _ in range(count):
+                layout.remove_edge(*pair)
+        for pair, count in (new_pairs - old_pairs).items():
+            for _ in range(count):
+                layout.add_edge(*pair)
+        # Keep the source order, labels and link numbers of the new edges
+        graph.replace_edges(new.edges)
+        for gid in [gid for gid in graph.groups if gid not in new.groups]:
+            layout.remove_group(gid)
+        # A fresh conversion would see nodes, subgraphs and edges in the new source order
+        layout.match_order(new, old_orders)
+        if fresh.direction != self.direction:
+            layout.direction = fresh.direction
+            for gid in [None, *graph.groups]:
+                layout.invalidate(gid)
+
+        graph.link_styles = new.link_styles
+        graph.default_link_style = new.default_link_style
+        if graph.class_defs != new.class_defs:
+            graph.class_defs = new.class_defs
+            self._class_style_cache.clear()
+            self._style_cache.clear()
+        self.pending_styles = fresh.pending_styles
+        self.pending_classes = fresh.pending_classes
+        self.link_count = fresh.link_count
+        self.direction = fresh.direction
+        with self._stage("layout"):
+            layout.layout()
+        if self.routing:
+            # Any moved box can change the best route of any edge
+            from mermaid_to_drawio.routing import route_edges
+
+            with self._stage("route"):
+                route_edges(layout, workers=self.route_workers)
+
+        # Patch the cells
+        cells = {cell.get("id"): cell for cell in self.root}
+        changed = set()
+        new_group_cells = []
+        reorder = False
+        for group in graph.walk_groups():
+            gid = group.id
+            if gid not in old_groups:
+                new_group_cells.append(self._render(self._create_group, group))
+                changed.add(gid)
+                reorder = True
+            elif old_groups[gid] != (group.name, group.parent, self._group_geometry(group)):
+                reorder = reorder or old_groups[gid][1] != group.parent
+                self._patch(cells[gid], self._render(self._create_group, group))
+                changed.add(gid)
+        self.root[2:2] = new_group_cells
+
+        for node_id, node in graph.nodes.items():
+            if node_id not in old_nodes:
+                self.root.append(self._render(self._create_node, node))
+                changed.add(node_id)
+            elif old_nodes[node_id] != (self._node_state(node), self._node_geometry(node)):
+                self._patch(cells[node_id], self._render(self._create_node, node))
+                changed.add(node_id)
+
+        edge_cells = [cell for cell in self.root if cell.get("edge") == "1"]
+        for i, edge in enumerate(graph.edges):
+            if i < len(edge_cells):
+                if old_edges[i] == (edge.source, edge.target, edge.label, self._edge_style(edge.index),
+                                    edge.points):
+                    continue
+                cell = edge_cells[i]
+                new_cell = self._render(self._create_edge, edge)
+                new_cell.set("id", cell.get("id"))
+                self._patch(cell, new_cell)
+            else:
+                cell = self._render(self._create_edge, edge)
+                self.root.append(cell)
+            changed.add(cell.get("id"))
+
+        removed = {gid for gid in old_groups if gid not in graph.groups}
+        removed.update(node_id for node_id in old_nodes if node_id not in graph.nodes)
+        removed.update(cell.get("id") for cell in edge_cells[len(graph.edges):])
+        if removed:
+            self.root[:] = [cell for cell in self.root if cell.get("id") not in removed]
+            for serialized in self._serialized.values():
+                for cell_id in removed:
+                    serialized.pop(cells.get(cell_id), None)
+        if reorder:
+            # Containers must still come before their contents
+            group_cells = {cell.get("id"): cell for cell in self.root[2:2 + len(graph.groups)]}
+            self.root[2:2 + len(graph.groups)] = [group_cells[group.id] for group in graph.walk_groups()]
+        return changed | removed
+
+    def _node_state(self, node):
+        return (node.label, self._node_style(node), node.group)
+
+    def _render(self, create, *args):
+        rendered = []
+        self._emit = rendered.append
+        try:
+            create(*args)
+        finally:
+            self._emit = self.root.append
+        return rendered[0]
+
+    def _patch(self, cell, new_cell):
+        cell.attrib.clear()
+        cell.attrib.update(new_cell.attrib)
+        cell[:] = list(new_cell)
+        for serialized in self._serialized.values():
+            serialized.pop(cell, None)
+
+    def write(self, fh, compact=False, compress=False):
+        """Serialize the diagram to a text file handle.
+
+        If build() has not been called, cells are generated and written one
+        at a time instead of being collected in the tree first. compress
+        stores the model in draw.io's deflated, base64-encoded form.
+        """
+        with self._stage("save"):
+            with DrawioWriter(fh, compact=compact, mxfile_attrib=self.mxfile.attrib, compress=compress) as writer:
+                self.write_diagram(writer)
+
+    def write_diagram(self, writer):
+        """Write this diagram as one page of the document open in ``writer``."""
+        writer.begin_diagram(self.diagram.attrib, self.graph_model.attrib)
+        if self._serialized is None:
+            for cell in self.root:
+                writer.write_cell(cell)
+        else:
+            # Unchanged cells reuse their text from the previous write
+            serialized = self._serialized.setdefault(writer.compact, {})
+            for cell in self.root:
+                text = serialized.get(cell)
+                if text is None:
+                    text = serialized[cell] = writer.serialize(cell)
+                writer.write_text(text)
+        if not self._built:
+            self.build(writer)
+        writer.end_diagram()
+
+    def save(self, compact=False, compress=False, raise_errors=False):
+        """Write the diagram to output_file; returns False on failure unless raise_errors is set."""
         try:
-            xml_str = ET.tostring(self.mxfile, encoding="utf-8")
-            pretty = xml.dom.minidom.parseString(xml_str).toprettyxml(indent="  ")
-            with open(self.output_file, "w", encoding="utf-8") as f:
-                f.write(pretty)
+            if self.output_file == "-":
+                self.write(sys.stdout, compact, compress)
+            else:
+                with open(self.output_file, "w", encoding="utf-8") as f:
+                    self.write(f, compact, compress)
             logger.info(f"Saved Draw.io file: {self.output_file}")
             return True
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Error saving file: {e}")
             return False
 
-def main():
-    parser = argparse.ArgumentParser(description="Convert Mermaid to Draw.io")
-    parser.add_argument("input", help="Mermaid input file")
-    parser.add_argument("-o", "--output", help="Draw.io output file")
-    parser.add_argument("--theme", choices=["light", "dark", "default"], default="light", help="Color theme")
-    args = parser.parse_args()
-
-    themes = {
-        "light": {
-            "node": {"fillColor": "#ffffff", "strokeColor": "#333333", "strokeWidth": "1"},
-            "edge": {"strokeColor": "#666666", "strokeWidth": "2"}
-        },
-        "dark": {
-            "node": {"fillColor": "#333333", "strokeColor": "#f0f0f0", "strokeWidth": "1"},
-            "edge": {"strokeColor": "#aaaaaa", "strokeWidth": "2"}
-        },
-        "default": {
-            "node": {"fillColor": "#DAE8FC", "strokeColor": "#333333", "strokeWidth": "1"},
-            "edge": {"strokeColor": "#666666", "strokeWidth": "2"}
-        }
-        
-    }
-
-    converter = MermaidToDrawIOConverter(
-        args.input, 
-        args.output, 
-        theme=themes[args.theme]
-    )
-    
-    try:
-        converter.parse_mermaid()
-        converter.build()
-        converter.save()
-    except Exception as e:
-        logger.error(f"Conversion failed: {e}")
+def main(argv=None):
+    # The command line lives in cli.py; kept here for existing entry points
+    from mermaid_to_drawio.cli import main as cli_main
+    return cli_main(argv)
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Graph model shared by the parser, the layout manager and the XML emitter.
+
+Nodes, edges and subgraphs are ``__slots__`` records. Nodes and groups live in
+insertion-ordered dicts keyed by id, so lookups are O(1). Each record holds
+all of its fields, so an element is stored once instead of once per table.
+"""
+
+
+class Node:
+    __slots__ = ("id", "label", "shape", "style", "classes", "group", "x", "y", "width", "height")
+
+    def __init__(self, node_id, label=None, shape=None, style=None, group=None):
+        self.id = node_id
+        self.label = node_id if label is None else label
+        self.shape = shape
+        self.style = style
+        # Names of the classDefs applied to the node, in the order they were assigned
+        self.classes = ()
+        self.group = group
+        # Top-left corner, set by the layout manager
+        self.x = None
+        self.y = None
+        # Box size from the label text, None for the default size
+        self.width = None
+        self.height = None
+
+
+class Edge:
+    # index is the Mermaid link number used by linkStyle; both directions of
+    # a bidirectional link share it
+    __slots__ = ("source", "target", "label", "index", "points")
+
+    def __init__(self, source, target, label="", index=None):
+        self.source = source
+        self.target = target
+        self.label = label
+        self.index = index
+        # Waypoints [(x, y), ...], set by edge routing
+        self.points = None
+
+
+class Group:
+    __slots__ = ("id", "name", "parent", "direction", "children", "bbox")
+
+    def __init__(self, group_id, name=None, parent=None, direction=None):
+        self.id = group_id
+        self.name = group_id if name is None else name
+        self.parent = parent
+        self.direction = direction
+        self.children = []
+        # [x, y, width, height], set by compound layout
+        self.bbox = None
+
+
+class Graph:
+    def __init__(self):
+        self.nodes = {}
+        self.edges = []
+        self.groups = {}
+        self.top_groups = []
+        self.link_styles = {}
+        # linkStyle default, for links without a style of their own
+        self.default_link_style = None
+        # classDef name -> draw.io style string
+        self.class_defs = {}
+        self._adjacency = None
+
+    def add_node(self, node_id, label=None, shape=None, group=None):
+        """Return the node with this id, creating it if needed."""
+        node = self.nodes.get(node_id)
+        if node is None:
+            node = self.nodes[node_id] = Node(node_id, label, shape, group=group)
+            self._adjacency = None
+        return node
+
+    def remove_node(self, node_id):
+        node = self.nodes.pop(node_id, None)
+        if node is not None:
+            self._adjacency = None
+        return node
+
+    def add_edge(self, source, target, label="", index=None):
+        edge = Edge(source, target, label, index)
+        self.edges.append(edge)
+        self._adjacency = None
+        return edge
+
+    def remove_edge(self, source, target):
+        """Remove the first edge from source to target."""
+        for i, edge in enumerate(self.edges):
+            if edge.source == source and edge.target == target:
+                del self.edges[i]
+                self._adjacency = None
+                return edge
+        raise ValueError(f"no edge {source} -> {target}")
+
+    def replace_edges(self, edges):
+        self.edges = list(edges)
+        self._adjacency = None
+
+    def reorder_nodes(self, node_ids):
+        """Put the nodes in the order of node_ids, which must hold exactly their ids."""
+        self.nodes = {node_id: self.nodes[node_id] for node_id in node_ids}
+        self._adjacency = None
+
+    def child_groups(self, group_id):
+        """Ids of the groups directly inside group_id (None for the top level)."""
+        return self.top_groups if group_id is None else self.groups[group_id].children
+
+    def walk_groups(self):
+        """Yield every group after its parent (pre-order over the subgraph tree)."""
+        stack = self.top_groups[::-1]
+        while stack:
+            group = self.groups[stack.pop()]
+            yield group
+            stack.extend(reversed(group.children))
+
+    def add_group(self, group_id, name=None, parent_id=None):
+        """Return the group with this id, creating it or moving it under parent_id."""
+        group = self.groups.get(group_id)
+        if group is None:
+            group = self.groups[group_id] = Group(group_id, name, parent_id)
+        elif group.parent == parent_id:
+            return group
+        else:
+            self.child_groups(group.parent).remove(group_id)
+            group.parent = parent_id
+        self.child_groups(parent_id).append(group_id)
+        return group
+
+    def remove_group(self, group_id):
+        """Drop a group; its child groups move up to its parent."""
+        group = self.groups.pop(group_id)
+        siblings = self.child_groups(group.parent)
+        siblings.remove(group_id)
+        for child in group.children:
+            self.groups[child].parent = group.parent
+            siblings.append(child)
+        return group
+
+    def adjacency(self):
+        """Return ``(node_ids, succ)``: nodes in insertion order and successor index lists.
+
+        Self-loops and edges to unknown nodes are left out. The lists are
+        cached until the nodes or edges change; callers must not modify them.
+        """
+        if self._adjacency is None:
+            node_ids = list(self.nodes)
+            index = {node_id: i for i, node_id in enumerate(node_ids)}
+            succ = [[] for _ in node_ids]
+            for edge in self.edges:
+                i, j = index.get(edge.source), index.get(edge.target)
+                if i is not None and j is not None and i != j:
+                    succ[i].append(j)
+            self._adjacency = (node_ids, succ)
+        return self._adjacency
@@ -0,0 +1,72 @@
+"""
+Id allocators for the cells the converter creates itself (groups and edges).
+
+Mermaid node ids are always word characters (``\\w+``), so every generated id
+contains a ``-``: it can never clash with a user node id, whatever order
+nodes and groups are declared in.
+"""
+
+class CounterIdAllocator:
+    """Sequential ids per kind: group-1, group-2, edge-1, ..."""
+
+    def __init__(self):
+        self._counters = {}
+
+    def fresh(self):
+        """A new allocator with the same settings and nothing allocated yet."""
+        return CounterIdAllocator()
+
+    def allocate(self, kind, path=()):
+        count = self._counters.get(kind, 0) + 1
+        self._counters[kind] = count
+        return f"{kind}-{count}"
+
+
+class HashIdAllocator:
+    """Ids derived from a stable hash of the element's path (e.g. parent group names).
+
+    Unlike counters, ids survive unrelated insertions earlier in the source,
+    which keeps diffs of regenerated files small.
+    """
+
+    def __init__(self, length=12):
+        import hashlib
+
+        self._sha1 = hashlib.sha1
+        self.length = length
+        self._used = set()
+
+    def fresh(self):
+        return HashIdAllocator(self.length)
+
+    def allocate(self, kind, path=()):
+        digest = self._sha1("\0".join(path).encode("utf-8")).hexdigest()[:self.length]
+        candidate = f"{kind}-{digest}"
+        suffix = 1
+        while candidate in self._used:
+            suffix += 1
+            candidate = f"{kind}-{digest}-{suffix}"
+        self._used.add(candidate)
+        return candidate
+
+
+class UuidIdAllocator:
+    """Random ids; output differs on every run."""
+
+    def __init__(self):
+        import uuid
+
+        self._uuid4 = uuid.uuid4
+
+    def fresh(self):
+        return UuidIdAllocator()
+
+    def allocate(self, kind, path=()):
+        return f"{kind}-{self._uuid4().hex}"
+
+
+ID_ALLOCATORS = {
+    "counter": CounterIdAllocator,
+    "hash": HashIdAllocator,
+    "uuid": UuidIdAllocator,
+}
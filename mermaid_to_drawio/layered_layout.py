@@ -0,0 +1,167 @@
+"""
+Hierarchical (Sugiyama-style) layered layout.
+
+The phases are the classic ones, each kept linear or close to it:
+cycle breaking by DFS, longest-path layering, barycenter crossing
+reduction and a single-pass coordinate assignment. Long edges are not
+split into dummy nodes; their endpoints still pull on each other during
+crossing reduction, which keeps the cost proportional to V + E.
+"""
+
+DIRECTIONS = {"TD": "TD", "TB": "TD", "BT": "BT", "LR": "LR", "RL": "RL"}
+
+
+def _break_cycles(count, succ):
+    """Return DAG successor lists, reversing the back edges found by an iterative DFS."""
+    state = [0] * count  # 0 = unvisited, 1 = on stack, 2 = done
+    dag = [[] for _ in range(count)]
+    for root in range(count):
+        if state[root]:
+            continue
+        state[root] = 1
+        stack = [(root, iter(succ[root]))]
+        while stack:
+            u, children = stack[-1]
+            for v in children:
+                if state[v] == 1:
+                    dag[v].append(u)
+                else:
+                    dag[u].append(v)
+                    if state[v] == 0:
+                        state[v] = 1
+                        stack.append((v, iter(succ[v])))
+                        break
+            else:
+                state[u] = 2
+                stack.pop()
+    return dag
+
+
+def _assign_layers(count, dag):
+    indegree = [0] * count
+    for targets in dag:
+        for v in targets:
+            indegree[v] += 1
+    layer = [0] * count
+    queue = [i for i in range(count) if indegree[i] == 0]
+    for u in queue:  # queue grows while iterating (Kahn's algorithm)
+        next_layer = layer[u] + 1
+        for v in dag[u]:
+            if layer[v] < next_layer:
+                layer[v] = next_layer
+            indegree[v] -= 1
+            if indegree[v] == 0:
+                queue.append(v)
+    return layer, queue
+
+
+def _reduce_crossings(layers, dag, pred, sweeps):
+    position = [0.0] * len(dag)
+    for layer_nodes in layers:
+        for i, v in enumerate(layer_nodes):
+            position[v] = i
+
+    for sweep in range(sweeps):
+        downward = sweep % 2 == 0
+        neighbours = pred if downward else dag
+        ordered = layers[1:] if downward else layers[-2::-1]
+        for layer_nodes in ordered:
+            keys = {}
+            for v in layer_nodes:
+                adjacent = neighbours[v]
+                keys[v] = sum(position[u] for u in adjacent) / len(adjacent) if adjacent else position[v]
+            layer_nodes.sort(key=keys.__getitem__)
+            for i, v in enumerate(layer_nodes):
+                position[v] = i
+    return layers
+
+
+def layered_layout(nodes, edges, direction="TD", sizes=None, default_size=(180, 60),
+                   node_sep=40, rank_sep=60, sweeps=4, succ=None):
+    """Lay out a directed graph in layers.
+
+    Returns ``(positions, (width, height))`` where positions maps each node id to
+    the top-left corner of its box, relative to the top-left of the drawing.
+    ``succ`` may give successor index lists for ``nodes`` directly (see
+    Graph.adjacency()), in which case ``edges`` is ignored.
+    """
+    direction = DIRECTIONS.get((direction or "TD").upper(), "TD")
+    sizes = sizes or {}
+    count = len(nodes)
+    if not count:
+        return {}, (0, 0)
+
+    if succ is None:
+        index = {node_id: i for i, node_id in enumerate(nodes)}
+        succ = [[] for _ in range(count)]
+        for src, tgt in edges:
+            i, j = index.get(src), index.get(tgt)
+            if i is not None and j is not None and i != j:
+                succ[i].append(j)
+
+    dag = _break_cycles(count, succ)
+    layer, topo_order = _assign_layers(count, dag)
+    pred = [[] for _ in range(count)]
+    for u, targets in enumerate(dag):
+        for v in targets:
+            pred[v].append(u)
+
+    layers = [[] for _ in range(max(layer) + 1)]
+    for v in topo_order:
+        layers[layer[v]].append(v)
+    _reduce_crossings(layers, dag, pred, sweeps)
+
+    # Box extent along the layer and across it (layer thickness)
+    horizontal_layers = direction in ("LR", "RL")
+    along_size = [0] * count
+    across_size = [0] * count
+    for i, node_id in enumerate(nodes):
+        width, height = sizes.get(node_id, default_size)
+        along_size[i], across_size[i] = (height, width) if horizontal_layers else (width, height)
+
+    # Place each layer left to right, pulling nodes towards the centre of
+    # their predecessors, then shift the layer as a whole to close the gap.
+    center = [0.0] * count
+    for depth, layer_nodes in enumerate(layers):
+        cursor = None
+        shift = 0.0
+        for v in layer_nodes:
+            half = along_size[v] / 2
+            parents = pred[v]
+            desired = sum(center[u] for u in parents) / len(parents) if depth and parents else None
+            lowest = half if cursor is None else cursor + node_sep + half
+            placed = lowest if desired is None else max(desired, lowest)
+            if desired is not None:
+                shift += desired - placed
+            center[v] = placed
+            cursor = placed + half
+        if layer_nodes and shift < 0:
+            shift /= len(layer_nodes)
+            for v in layer_nodes:
+                center[v] += shift
+
+    min_along = min(center[v] - along_size[v] / 2 for v in range(count))
+    max_along = max(center[v] + along_size[v] / 2 for v in range(count))
+
+    thickness = [max(across_size[v] for v in layer_nodes) for layer_nodes in layers]
+    layer_start = []
+    total = 0
+    for t in thickness:
+        layer_start.append(total)
+        total += t + rank_sep
+    total_across = total - rank_sep
+
+    positions = {}
+    for v, node_id in enumerate(nodes):
+        along = center[v] - along_size[v] / 2 - min_along
+        depth = layer[v]
+        across = layer_start[depth] + (thickness[depth] - across_size[v]) / 2
+        if direction in ("BT", "RL"):
+            across = total_across - across - across_size[v]
+        if horizontal_layers:
+            positions[node_id] = (round(across), round(along))
+        else:
+            positions[node_id] = (round(along), round(across))
+
+    extent = (round(max_along - min_along), round(total_across))
+    return positions, (extent[::-1] if horizontal_layers else extent)
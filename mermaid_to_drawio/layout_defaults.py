@@ -0,0 +1,23 @@
+"""
+Default LayoutManager spacing, in a module that imports nothing so the
+conversion cache can hash the resolved layout parameters without loading
+the layout code.
+"""
+
+LAYOUT_DEFAULTS = {
+    "x_gap": 220,
+    "y_gap": 80,
+    "x_offset": 60,
+    "y_offset": 60,
+    "node_sep": 40,
+    "rank_sep": 60,
+}
+
+
+def resolve_layout_options(layout_options=None):
+    """The spacing a LayoutManager built with layout_options would use."""
+    resolved = dict(LAYOUT_DEFAULTS)
+    for name in resolved:
+        if layout_options and name in layout_options:
+            resolved[name] = layout_options[name]
+    return resolved
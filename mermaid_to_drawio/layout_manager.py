@@ -1,54 +1,442 @@
+import logging
+from mermaid_to_drawio.graph import Graph
+from mermaid_to_drawio.layered_layout import layered_layout
+from mermaid_to_drawio.layout_defaults import LAYOUT_DEFAULTS
+
+logger = logging.getLogger(__name__)
+
+NODE_WIDTH = 180
+NODE_HEIGHT = 60
+GROUP_PADDING = 20
+GROUP_HEADER = 20  # room for the swimlane title above the padded content
+GRID_ROWS = 20
+PARALLEL_THRESHOLD = 20000  # nodes below which a process pool costs more than it saves
+
+
+def grid_layout(nodes, edges, direction="TD", sizes=None, default_size=(NODE_WIDTH, NODE_HEIGHT),
+                node_sep=40, rank_sep=60, succ=None):
+    """Column-major grid that ignores edges; columns are as wide as their widest box."""
+    sizes = sizes or {}
+    positions = {}
+    x = 0
+    width = height = 0
+    for start in range(0, len(nodes), GRID_ROWS):
+        column = nodes[start:start + GRID_ROWS]
+        y = 0
+        column_width = 0
+        for node_id in column:
+            w, h = sizes.get(node_id, default_size)
+            positions[node_id] = (x, y)
+            column_width = max(column_width, w)
+            y += h + rank_sep
+        height = max(height, y - rank_sep)
+        width = x + column_width
+        x = width + node_sep
+    return positions, (width, height)
+
+
+LAYOUT_ENGINES = {
+    "grid": grid_layout,
+    "layered": layered_layout,
+}
+
+
+def connected_components(count, succ):
+    """Split node indices 0..count-1 into weakly connected components (union-find).
+
+    Components are returned as ascending index lists, ordered by their first node.
+    """
+    parent = list(range(count))
+    for u, targets in enumerate(succ):
+        for v in targets:
+            # Path halving; the smaller index stays the root, so parent[i] <= i always
+            while parent[u] != u:
+                parent[u] = u = parent[parent[u]]
+            while parent[v] != v:
+                parent[v] = v = parent[parent[v]]
+            if u < v:
+                parent[v] = u
+            elif v < u:
+                parent[u] = v
+                u = v
+    components = {}
+    for i in range(count):
+        # parent[i] < i has already been resolved to its root
+        parent[i] = root = parent[parent[i]]
+        components.setdefault(root, []).append(i)
+    return list(components.values())
+
+
+def pack_boxes(boxes, gap_along=40, gap_across=60, max_width=None):
+    """Pack (width, height) boxes into shelves, tallest first (next-fit decreasing height).
+
+    Shelves are filled left to right up to max_width, which defaults to the
+    side of a square of the same area (but at least the widest box). Returns
+    the top-left offset of each box, in input order, and the packed extent.
+    """
+    if not boxes:
+        return [], (0, 0)
+    if max_width is None:
+        area = sum((w + gap_along) * (h + gap_across) for w, h in boxes)
+        max_width = max(max(w for w, _ in boxes), int(area ** 0.5))
+    offsets = [None] * len(boxes)
+    x = y = shelf_height = width = 0
+    for i in sorted(range(len(boxes)), key=lambda i: -boxes[i][1]):
+        w, h = boxes[i]
+        if x and x + w > max_width:
+            y += shelf_height + gap_across
+            x = shelf_height = 0
+        offsets[i] = (x, y)
+        width = max(width, x + w)
+        shelf_height = max(shelf_height, h)
+        x += w + gap_along
+    return offsets, (width, y + shelf_height)
+
+
+def _layout_job(job):
+    """Lay out a batch of components; runs in a worker process."""
+    engine, components, options = job
+    engine = LAYOUT_ENGINES.get(engine, grid_layout)
+    return [engine(nodes, (), sizes=sizes, succ=succ, **options) for nodes, succ, sizes in components]
+
 class LayoutManager:
-    def __init__(self, x_gap=220, y_gap=80, x_offset=60, y_offset=60):
+    def __init__(self, x_gap=LAYOUT_DEFAULTS["x_gap"], y_gap=LAYOUT_DEFAULTS["y_gap"],
+                 x_offset=LAYOUT_DEFAULTS["x_offset"], y_offset=LAYOUT_DEFAULTS["y_offset"],
+                 engine="grid", direction="TD", node_sep=LAYOUT_DEFAULTS["node_sep"],
+                 rank_sep=LAYOUT_DEFAULTS["rank_sep"], graph=None, workers=1):
         self.x_gap = x_gap
         self.y_gap = y_gap
         self.x_offset = x_offset
         self.y_offset = y_offset
-        self.positions = {}
-        self.node_counter = 0
-        self.groups = {}
-        self.group_bbox = {}
-    
+        self.engine = engine
+        self.direction = direction
+        self.node_sep = node_sep
+        self.rank_sep = rank_sep
+        # Processes used to lay out the connected components of large graphs
+        self.workers = workers
+        # Nodes, edges and the subgraph tree are read from (and positions
+        # stored on) the graph shared with the converter
+        self.graph = graph if graph is not None else Graph()
+        self._blocks = {}
+        self._dirty_groups = set()
+        self._dirty = False
+        # Number of nodes with their own size, which the fixed grid slots cannot honour
+        self._sized = 0
+
     def add_node(self, node_id):
-        if node_id not in self.positions:
-            row = self.node_counter % 20
-            col = self.node_counter // 20
-            x = self.x_offset + col * self.x_gap
-            y = self.y_offset + row * self.y_gap
-            self.positions[node_id] = (x, y)
-            self.node_counter += 1
-    
-    def add_node_to_group(self, group_id, node_id, x, y, width, height):
-        if not group_id:
+        node = self.graph.add_node(node_id)
+        if node.x is None:
+            self._mark_dirty(node.group)
+        return node
+
+    def set_size(self, node_id, width, height):
+        """Give a node its own box size (None, None for the default size)."""
+        node = self.graph.nodes.get(node_id) or self.graph.add_node(node_id)
+        if node.width != width or node.height != height:
+            self._sized += (width is not None) - (node.width is not None)
+            node.width = width
+            node.height = height
+            self._mark_dirty(node.group)
+
+    def get_size(self, node_id):
+        node = self.graph.nodes.get(node_id)
+        if node is None or node.width is None:
+            return (NODE_WIDTH, NODE_HEIGHT)
+        return (node.width, node.height)
+
+    def _sizes(self, node_ids):
+        nodes = self.graph.nodes
+        sizes = {}
+        for node_id in node_ids:
+            node = nodes[node_id]
+            if node.width is not None:
+                sizes[node_id] = (node.width, node.height)
+        return sizes
+
+    def add_edge(self, src, tgt, label="", index=None):
+        edge = self.graph.add_edge(src, tgt, label, index)
+        self._edge_changed(src, tgt)
+        return edge
+
+    def remove_node(self, node_id):
+        node = self.graph.remove_node(node_id)
+        if node is not None:
+            if node.width is not None:
+                self._sized -= 1
+            self._mark_dirty(node.group)
+
+    def remove_edge(self, src, tgt):
+        self.graph.remove_edge(src, tgt)
+        self._edge_changed(src, tgt)
+
+    def _edge_changed(self, src, tgt):
+        nodes = self.graph.nodes
+        self._mark_dirty(nodes[src].group if src in nodes else None)
+        self._mark_dirty(nodes[tgt].group if tgt in nodes else None)
+
+    def add_group(self, group_id, parent_id=None, direction=None):
+        """Register a group, or move an existing one under a new parent."""
+        group = self.graph.groups.get(group_id)
+        if group is not None and group.parent != parent_id:
+            self._mark_dirty(group.parent)
+        elif group is not None:
+            return group
+        group = self.graph.add_group(group_id, parent_id=parent_id)
+        if direction:
+            group.direction = direction
+        self._mark_dirty(group_id)
+        return group
+
+    def remove_group(self, group_id):
+        """Drop an empty group; its member nodes must have been reassigned or removed."""
+        group = self.graph.remove_group(group_id)
+        self._blocks.pop(group_id, None)
+        self._dirty_groups.discard(group_id)
+        self._mark_dirty(group.parent)
+
+    def set_group_direction(self, group_id, direction):
+        self.graph.groups[group_id].direction = direction
+        self._mark_dirty(group_id)
+
+    def assign_node(self, node_id, group_id):
+        """Make node_id a direct member of group_id for compound layout."""
+        node = self.graph.add_node(node_id)
+        previous = node.group
+        if previous == group_id:
             return
-            
-        if group_id not in self.groups:
-            self.groups[group_id] = []
-            
-        self.groups[group_id].append(node_id)
-        
-        # Update group bounding box
-        if group_id not in self.group_bbox:
-            self.group_bbox[group_id] = [x, y, x + width, y + height]
+        node.group = group_id
+        self._mark_dirty(previous)
+        self._mark_dirty(group_id)
+
+    def invalidate(self, group_id=None):
+        """Force the block of group_id (None for the top level) to be laid out again."""
+        self._mark_dirty(group_id)
+
+    def _mark_dirty(self, group_id):
+        # A block's size feeds its parent's packing, so dirtiness runs up to the root
+        self._dirty = True
+        groups = self.graph.groups
+        while group_id is not None and group_id not in self._dirty_groups:
+            self._dirty_groups.add(group_id)
+            group = groups.get(group_id)
+            group_id = group.parent if group is not None else None
+        self._dirty_groups.add(None)
+
+    def layout(self):
+        """Recompute positions if nodes, edges or groups changed since the last run.
+
+        Without subgraphs the grid puts nodes in fixed slots (unless nodes
+        have their own sizes) and other engines lay out the whole graph.
+        With subgraphs every group is laid out bottom-up as a block, and
+        blocks whose subtree did not change are reused.
+        At the top level, each connected component is laid out on its own
+        (in a process pool for large graphs) and the results are packed.
+        """
+        if not self._dirty:
+            return
+        if self.graph.groups:
+            self._layout_compound()
+        elif self.engine == "grid" and not self._sized:
+            # x_gap by y_gap slots, GRID_ROWS to a column, in declaration order
+            for i, node in enumerate(self.graph.nodes.values()):
+                node.x = self.x_offset + i // GRID_ROWS * self.x_gap
+                node.y = self.y_offset + i % GRID_ROWS * self.y_gap
+        else:
+            node_ids, succ = self.graph.adjacency()
+            positions, _ = self._run_components(node_ids, succ, self._sizes(node_ids), self.direction)
+            nodes = self.graph.nodes
+            for node_id, (x, y) in positions.items():
+                node = nodes[node_id]
+                node.x = x + self.x_offset
+                node.y = y + self.y_offset
+        self._dirty_groups.clear()
+        self._dirty = False
+
+    def _run_engine(self, nodes, edges, sizes, direction, succ=None):
+        engine = LAYOUT_ENGINES.get(self.engine, grid_layout)
+        return engine(
+            nodes, edges,
+            direction=direction,
+            sizes=sizes,
+            default_size=(NODE_WIDTH, NODE_HEIGHT),
+            node_sep=self.node_sep,
+            rank_sep=self.rank_sep,
+            succ=succ,
+        )
+
+    def _run_components(self, nodes, succ, sizes, direction):
+        """Like _run_engine, but lays out each connected component separately and packs them."""
+        components = connected_components(len(nodes), succ)
+        if len(components) == 1 or self.engine == "grid":
+            return self._run_engine(nodes, (), sizes, direction, succ)
+
+        jobs = []
+        results = [None] * len(components)
+        for i, members in enumerate(components):
+            if len(members) == 1:
+                node_id = nodes[members[0]]
+                results[i] = ({node_id: (0, 0)}, sizes.get(node_id, (NODE_WIDTH, NODE_HEIGHT)))
+                continue
+            local = {v: j for j, v in enumerate(members)}
+            component_nodes = [nodes[v] for v in members]
+            component_succ = [[local[v] for v in succ[u]] for u in members]
+            component_sizes = {node_id: sizes[node_id] for node_id in component_nodes if node_id in sizes}
+            jobs.append((i, (component_nodes, component_succ, component_sizes)))
+
+        options = {"direction": direction, "default_size": (NODE_WIDTH, NODE_HEIGHT),
+                   "node_sep": self.node_sep, "rank_sep": self.rank_sep}
+        if self.workers > 1 and len(nodes) >= PARALLEL_THRESHOLD and len(jobs) > 1:
+            # Largest components first, dealt round-robin so the batches are balanced
+            jobs.sort(key=lambda job: -len(job[1][0]))
+            batches = [jobs[k::self.workers * 4] for k in range(min(len(jobs), self.workers * 4))]
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                work = [(self.engine, [component for _, component in batch], options) for batch in batches]
+                for batch, layouts in zip(batches, executor.map(_layout_job, work)):
+                    for (i, _), result in zip(batch, layouts):
+                        results[i] = result
         else:
-            bbox = self.group_bbox[group_id]
-            bbox[0] = min(bbox[0], x)
-            bbox[1] = min(bbox[1], y)
-            bbox[2] = max(bbox[2], x + width)
-            bbox[3] = max(bbox[3], y + height)
-    
+            for i, component in jobs:
+                results[i] = _layout_job((self.engine, [component], options))[0]
+        logger.debug(f"Laid out {len(components)} components, {len(jobs)} with edges")
+
+        # Shelves run across the flow, so LR/RL diagrams are packed in columns
+        horizontal = direction in ("LR", "RL")
+        boxes = [(h, w) if horizontal else (w, h) for _, (w, h) in results]
+        offsets, extent = pack_boxes(boxes, self.node_sep, self.rank_sep)
+        positions = {}
+        for (local, _), (dx, dy) in zip(results, offsets):
+            if horizontal:
+                dx, dy = dy, dx
+            for node_id, (x, y) in local.items():
+                positions[node_id] = (x + dx, y + dy)
+        return positions, (extent[::-1] if horizontal else extent)
+
+    def _layout_compound(self):
+        graph = self.graph
+        members = {None: []}
+        for group_id in graph.groups:
+            members[group_id] = []
+        for node in graph.nodes.values():
+            members[node.group].append(node.id)
+        block_edges = self._lift_edges()
+
+        # Post-order: children's block sizes are needed to pack their parent
+        for group_id in self._post_order():
+            if group_id not in self._dirty_groups and group_id in self._blocks:
+                continue
+            children = graph.child_groups(group_id)
+            items = members[group_id] + [("group", child) for child in children]
+            sizes = self._sizes(members[group_id])
+            sizes.update((("group", child), self._blocks[child][:2]) for child in children)
+            group = graph.groups.get(group_id)
+            direction = group.direction if group is not None and group.direction else self.direction
+            edges = block_edges.get(group_id, [])
+            if group_id is None:
+                index = {item: i for i, item in enumerate(items)}
+                succ = [[] for _ in items]
+                for src, tgt in edges:
+                    succ[index[src]].append(index[tgt])
+                local, (width, height) = self._run_components(items, succ, sizes, direction)
+            else:
+                local, (width, height) = self._run_engine(items, edges, sizes, direction)
+            if group_id is not None:
+                width += 2 * GROUP_PADDING
+                height += 2 * GROUP_PADDING + GROUP_HEADER
+            self._blocks[group_id] = (width, height, local)
+
+        # Pre-order: turn block-local offsets into absolute coordinates
+        stack = [(None, self.x_offset, self.y_offset)]
+        while stack:
+            group_id, origin_x, origin_y = stack.pop()
+            if group_id is not None:
+                width, height, _ = self._blocks[group_id]
+                graph.groups[group_id].bbox = [origin_x, origin_y, width, height]
+                origin_x += GROUP_PADDING
+                origin_y += GROUP_PADDING + GROUP_HEADER
+            for item, (x, y) in self._blocks[group_id][2].items():
+                if isinstance(item, tuple):
+                    stack.append((item[1], origin_x + x, origin_y + y))
+                else:
+                    node = graph.nodes[item]
+                    node.x = origin_x + x
+                    node.y = origin_y + y
+
+    def _post_order(self):
+        order = []
+        stack = [None]
+        while stack:
+            group_id = stack.pop()
+            order.append(group_id)
+            stack.extend(self.graph.child_groups(group_id))
+        order.reverse()
+        return order
+
+    def block_orders(self):
+        """Per block (group id, None for the top level): its member nodes, child groups and lifted edges, in order.
+
+        Engines place items in the order they are given, so a block whose
+        orders changed has to be laid out again even if its contents did not.
+        """
+        graph = self.graph
+        orders = {group_id: ([], list(graph.child_groups(group_id)), []) for group_id in [None, *graph.groups]}
+        for node in graph.nodes.values():
+            orders[node.group][0].append(node.id)
+        for group_id, edges in self._lift_edges().items():
+            orders[group_id][2].extend(edges)
+        return orders
+
+    def match_order(self, other, previous_orders):
+        """Order nodes and child groups as in graph other, which has the same members.
+
+        previous_orders is block_orders() from before the graph was edited;
+        blocks whose orders differ now are marked for layout.
+        """
+        graph = self.graph
+        graph.reorder_nodes(other.nodes)
+        graph.top_groups[:] = other.top_groups
+        for group_id, group in graph.groups.items():
+            group.children[:] = other.groups[group_id].children
+        for group_id, order in self.block_orders().items():
+            if previous_orders.get(group_id) != order:
+                self._mark_dirty(group_id)
+
+    def _lift_edges(self):
+        """Map each edge onto the two items that represent its endpoints in their lowest common block."""
+        nodes, groups = self.graph.nodes, self.graph.groups
+        block_edges = {}
+        for edge in self.graph.edges:
+            src, tgt = nodes.get(edge.source), nodes.get(edge.target)
+            if src is None or tgt is None:
+                continue
+            src_items = {}
+            item, group_id = src.id, src.group
+            while True:
+                src_items[group_id] = item
+                if group_id is None:
+                    break
+                item, group_id = ("group", group_id), groups[group_id].parent
+            item, group_id = tgt.id, tgt.group
+            while group_id not in src_items:
+                item, group_id = ("group", group_id), groups[group_id].parent
+            if src_items[group_id] != item:
+                block_edges.setdefault(group_id, []).append((src_items[group_id], item))
+        return block_edges
+
     def get_position(self, node_id):
-        return self.positions.get(node_id, (0, 0))
-    
+        if self._dirty:
+            self.layout()
+        node = self.graph.nodes.get(node_id)
+        if node is None or node.x is None:
+            return (0, 0)
+        return (node.x, node.y)
+
     def get_group_bbox(self, group_id):
-        if group_id not in self.group_bbox:
+        if self._dirty:
+            self.layout()
+        group = self.graph.groups.get(group_id)
+        if group is None or group.bbox is None:
             return None
-            
-        bbox = self.group_bbox[group_id]
-        padding = 20
-        return [
-            bbox[0] - padding,
-            bbox[1] - padding,
-            bbox[2] - bbox[0] + 2 * padding,
-            bbox[3] - bbox[1] + 2 * padding
-        ]
\ No newline at end of file
+        # Compound layout sized the group as a padded block
+        return list(group.bbox)
@@ -0,0 +1,138 @@
+"""
+Markdown (or any text) documents with embedded Mermaid blocks.
+
+Every fenced ```mermaid (or ~~~mermaid) block becomes one page of a single
+mxfile. Pages are converted independently, optionally across worker
+processes, and written in order in one streaming pass.
+"""
+import io
+import logging
+import re
+import sys
+from collections import Counter, namedtuple
+from mermaid_to_drawio.writer import DrawioWriter
+
+logger = logging.getLogger(__name__)
+
+Block = namedtuple("Block", ["name", "source", "line"])
+
+_FENCE_RE = re.compile(r"^ {0,3}(`{3,}|~{3,})\s*([^`\s]*)")
+_HEADING_RE = re.compile(r"^ {0,3}#{1,6}\s+(.*?)(?:\s+#+)?\s*$")
+
+
+def extract_blocks(lines):
+    """Return the Mermaid blocks of a document as Blocks, in document order.
+
+    Each page is named after the closest heading above its block, or
+    "Diagram N" if there is none. Repeated names get a " (2)", " (3)", ...
+    suffix. Headings inside other code blocks are ignored.
+    """
+    blocks = []
+    heading = None
+    names = Counter()
+    fence = body = None
+    start = 0
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if fence is not None:
+            stripped = line.strip()
+            if stripped.startswith(fence) and stripped == stripped[0] * len(stripped):
+                if body is not None:
+                    name = heading or f"Diagram {len(blocks) + 1}"
+                    names[name] += 1
+                    if names[name] > 1:
+                        name = f"{name} ({names[name]})"
+                    blocks.append(Block(name, "\n".join(body) + "\n", start))
+                fence = body = None
+            elif body is not None:
+                body.append(line)
+            continue
+
+        match = _FENCE_RE.match(line)
+        if match:
+            fence = match.group(1)
+            # Only Mermaid blocks are collected; other fences are skipped whole
+            body = [] if match.group(2).lower() == "mermaid" else None
+            start = number + 1
+            continue
+        match = _HEADING_RE.match(line)
+        if match and match.group(1):
+            heading = match.group(1)
+    return blocks
+
+
+def render_page(block, options, compact=False, compress=False, stats=None):
+    """Convert one block and return its <diagram> element as text."""
+    from mermaid_to_drawio.batch import Job, create_converter
+
+    converter = create_converter(Job(None, None), options, diagram_name=block.name, stats=stats)
+    converter.parse_text(block.source)
+    buffer = io.StringIO()
+    converter.write_diagram(DrawioWriter(buffer, compact=compact, prolog=False, compress=compress))
+    return buffer.getvalue()
+
+
+def _render_job(args):
+    block, options, compact, compress, stats_mode = args
+    from mermaid_to_drawio.batch import new_stats
+
+    stats = new_stats(stats_mode)
+    text = render_page(block, options, compact, compress, stats)
+    return text, None if stats is None else stats.as_dict()
+
+
+def render_pages(blocks, options, compact=False, compress=False, workers=1, stats=None):
+    """Yield the rendered page of every block in order, converting up to ``workers`` at once.
+
+    Statistics of every page are added to stats (a ConversionStats), if given.
+    """
+    if stats is not None:
+        stats.counts["pages"] += len(blocks)
+    if workers <= 1 or len(blocks) <= 1:
+        for block in blocks:
+            yield render_page(block, options, compact, compress, stats)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    stats_mode = None if stats is None else "memory" if stats.memory else "time"
+    jobs = [(block, options, compact, compress, stats_mode) for block in blocks]
+    with ProcessPoolExecutor(max_workers=min(workers, len(blocks))) as executor:
+        for text, page_stats in executor.map(_render_job, jobs):
+            if page_stats is not None:
+                stats.merge(page_stats)
+            yield text
+
+
+def write_document(blocks, fh, options, workers=1, stats=None):
+    """Write blocks as the pages of one mxfile, each page as soon as it and the ones before are ready."""
+    compact = options.get("compact", False)
+    compress = options.get("compress", False)
+    with DrawioWriter(fh, compact=compact, compress=compress) as writer:
+        for page in render_pages(blocks, options, compact, compress, workers, stats):
+            writer.write_pages(page)
+
+
+def convert_document(input_file, output_file, options, text=None, workers=1, stats=None):
+    """Convert every Mermaid block of a document into one multi-page .drawio file.
+
+    Returns the number of pages written. Raises ValueError if the document
+    has no Mermaid blocks.
+    """
+    if text is None:
+        if input_file == "-":
+            text = sys.stdin.read()
+        else:
+            with open(input_file, "r", encoding="utf-8") as f:
+                text = f.read()
+    blocks = extract_blocks(text.splitlines())
+    if not blocks:
+        raise ValueError(f"no Mermaid blocks found in {input_file}")
+
+    if output_file == "-":
+        write_document(blocks, sys.stdout, options, workers, stats)
+    else:
+        with open(output_file, "w", encoding="utf-8") as f:
+            write_document(blocks, f, options, workers, stats)
+    logger.info(f"Saved Draw.io file: {output_file} ({len(blocks)} pages)")
+    return len(blocks)
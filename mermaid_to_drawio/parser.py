@@ -0,0 +1,176 @@
+"""
+Single-pass scanner for Mermaid flowchart statements.
+
+Each line is classified once by a combined keyword grammar; anything that is
+not a keyword statement is scanned left to right as a chain of node
+references joined by links, e.g. ``A[Foo] -- label --> B{Bar} --> C``.
+"""
+import re
+from collections import namedtuple
+
+# Token kinds
+HEADER = "header"
+DIRECTION = "direction"
+SUBGRAPH = "subgraph"
+END = "end"
+STYLE = "style"
+LINK_STYLE = "linkStyle"
+CLASS_DEF = "classDef"
+CLASS = "class"
+CHAIN = "chain"
+
+Token = namedtuple("Token", ["kind", "value"])
+NodeRef = namedtuple("NodeRef", ["id", "label", "shape", "class_name"], defaults=(None,))
+Link = namedtuple("Link", ["label", "bidirectional"])
+
+_STATEMENT_RE = re.compile(r"""
+    (?P<comment>%%)
+  | (?P<header>(?:graph|flowchart)\b\s*(?P<header_dir>\w+)?)
+  | (?P<direction>direction\s+(?P<dir>\w+))
+  | (?P<subgraph>subgraph\b\s*(?P<title>.*))
+  | (?P<end>end\s*;?$)
+  | (?P<style>style\s+(?P<style_id>\w+)\s+(?P<style_body>.*))
+  | (?P<linkStyle>linkStyle\s+(?P<link_index>default|\d+(?:\s*,\s*\d+)*)\s+(?P<link_body>.*))
+  | (?P<classDef>classDef\s+(?P<class_names>\w+(?:\s*,\s*\w+)*)\s+(?P<class_body>.*))
+  | (?P<class>class\s+(?P<class_ids>\w+(?:\s*,\s*\w+)*)\s+(?P<class_name>\w+)\s*;?$)
+""", re.VERBOSE)
+
+# Longer delimiters come first so "((x))" is not read as "(" + "(x)" + ")".
+_NODE_RE = re.compile(r"""
+    (?P<id>\w+)
+    (?:
+        \(\(\((?P<hexagon>.+?)\)\)\)
+      | \(\((?P<ellipse>.+?)\)\)
+      | \[\[(?P<cylinder>.+?)\]\]
+      | \[(?P<rectangle>.+?)\]
+      | \((?P<rounded>.+?)\)
+      | >(?P<parallelogram>[^\]\[]+)\]
+      | \{(?P<rhombus>[^}]+)\}
+    )?
+    \s*
+""", re.VERBOSE)
+
+_LINK_RE = re.compile(r"""
+    (?:
+        (?P<bidirectional><-->)
+      | -->(?:\|(?P<pipe_label>[^|]*)\|)?
+      | --\s*(?P<text_label>[^\s>-].*?)\s*-->
+    )
+    \s*
+""", re.VERBOSE)
+
+_CLASS_RE = re.compile(r":::(\w+)\s*")
+
+_CHAIN_END_RE = re.compile(r";?\s*$")
+
+_LIST_SEPARATOR_RE = re.compile(r"\s*,\s*")
+
+# Mermaid's entity codes, e.g. "#91;" for "[", let labels hold delimiter characters
+_ENTITY_RE = re.compile(r"#(\d{1,7});")
+
+
+def _unquote(text):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] == '"':
+        return text[1:-1]
+    return text
+
+
+def _entity(match):
+    code = int(match.group(1))
+    return chr(code) if code <= 0x10FFFF else match.group(0)
+
+
+def _scan_chain(line, counts=None):
+    node_match = _NODE_RE.match
+    link_match = _LINK_RE.match
+    end_match = _CHAIN_END_RE.match
+
+    nodes = []
+    links = []
+    pos = 0
+    while True:
+        match = node_match(line, pos)
+        if not match:
+            if counts is not None:
+                # Every node and link so far, one end check per node, and this attempt
+                counts["regex_attempts"] += 2 * len(nodes) + len(links) + 1
+            return None
+        shape = match.lastgroup
+        if shape == "id":
+            shape = label = None
+        else:
+            label = match.group(shape)
+            if '"' in label:
+                label = _unquote(label)
+            if "#" in label:
+                label = _ENTITY_RE.sub(_entity, label)
+        pos = match.end()
+
+        # A:::name assigns a classDef to the node
+        class_name = None
+        if line.startswith(":::", pos):
+            if counts is not None:
+                counts["regex_attempts"] += 1
+            class_match = _CLASS_RE.match(line, pos)
+            if class_match:
+                class_name = class_match.group(1)
+                pos = class_match.end()
+        nodes.append(NodeRef(match.group("id"), label, shape, class_name))
+
+        if end_match(line, pos):
+            if counts is not None:
+                counts["regex_attempts"] += 2 * len(nodes) + len(links)
+            return Token(CHAIN, (nodes, links))
+        match = link_match(line, pos)
+        if not match:
+            if counts is not None:
+                counts["regex_attempts"] += 2 * len(nodes) + len(links) + 1
+            return None
+        label = match.group("pipe_label") or match.group("text_label") or ""
+        if '"' in label:
+            label = _unquote(label)
+        if "#" in label:
+            label = _ENTITY_RE.sub(_entity, label)
+        links.append(Link(label, match.group("bidirectional") is not None))
+        pos = match.end()
+
+
+def tokenize(line, counts=None):
+    """Classify one source line, returning a Token or None if it carries nothing.
+
+    If counts (a Counter) is given, the regex match attempts are added to
+    counts["regex_attempts"].
+    """
+    line = line.strip()
+    if not line:
+        return None
+
+    if counts is not None:
+        counts["regex_attempts"] += 1
+    match = _STATEMENT_RE.match(line)
+    if match:
+        kind = match.lastgroup
+        if kind == "comment":
+            return None
+        if kind == HEADER:
+            return Token(HEADER, match.group("header_dir"))
+        if kind == DIRECTION:
+            return Token(DIRECTION, match.group("dir"))
+        if kind == SUBGRAPH:
+            return Token(SUBGRAPH, match.group("title").strip())
+        if kind == END:
+            return Token(END, None)
+        if kind == STYLE:
+            return Token(STYLE, (match.group("style_id"), match.group("style_body")))
+        if kind == CLASS_DEF:
+            names = _LIST_SEPARATOR_RE.split(match.group("class_names"))
+            return Token(CLASS_DEF, (names, match.group("class_body")))
+        if kind == CLASS:
+            return Token(CLASS, (_LIST_SEPARATOR_RE.split(match.group("class_ids")), match.group("class_name")))
+        # linkStyle default applies to every link without an index of its own
+        index = match.group("link_index")
+        indices = None if index == "default" else tuple(map(int, _LIST_SEPARATOR_RE.split(index)))
+        return Token(LINK_STYLE, (indices, match.group("link_body")))
+
+    return _scan_chain(line, counts)
@@ -0,0 +1,416 @@
+"""
+draw.io to Mermaid, the reverse of MermaidToDrawIOConverter.
+
+Files are read with ET.iterparse and every cell is dropped from the tree as
+soon as it has been read, so memory holds one small record per cell instead
+of the whole document. Compressed pages are inflated as they are parsed.
+
+Vertices become nodes, swimlanes and containers become subgraphs, and edges
+become links. Shapes are mapped back by inverting SHAPE_MAP and styles by
+inverting StyleParser; style values equal to the theme's defaults are left
+out, so a converted diagram comes back without extra ``style`` lines.
+"""
+import logging
+import re
+import sys
+import xml.etree.ElementTree as ET
+from io import StringIO
+from mermaid_to_drawio.compression import InflateStream
+from mermaid_to_drawio.converter import SHAPE_MAP
+from mermaid_to_drawio.graph import Graph
+from mermaid_to_drawio.themes import DEFAULT_THEME
+
+logger = logging.getLogger(__name__)
+
+# Mermaid node syntax per shape, the inverse of the parser's node grammar
+SHAPE_SYNTAX = {
+    "rectangle": ("[", "]"),
+    "rounded": ("(", ")"),
+    "ellipse": ("((", "))"),
+    "cylinder": ("[[", "]]"),
+    "parallelogram": (">", "]"),
+    "rhombus": ("{", "}"),
+    "hexagon": ("(((", ")))"),
+}
+
+# draw.io's own names for shapes the forward converter spells differently
+SHAPE_ALIASES = {"cylinder3": "cylinder", "datastore": "cylinder", "doubleEllipse": "ellipse"}
+
+# draw.io style keys and the CSS properties StyleParser turns into them
+CSS_KEYS = {
+    "fill": "fill",
+    "fillColor": "fill",
+    "stroke": "stroke",
+    "strokeColor": "stroke",
+    "color": "color",
+    "fontColor": "color",
+    "strokeWidth": "stroke-width",
+    "fontSize": "font-size",
+    "dashed": "stroke-dasharray",
+}
+_PIXEL_KEYS = ("stroke-width", "font-size")
+
+# Words the parser reads as statements, so they cannot be node ids
+KEYWORDS = {"graph", "flowchart", "subgraph", "end", "style", "linkStyle", "direction", "classDef", "class"}
+
+_ID_RE = re.compile(r"\w+$")
+_ENTITY_RE = re.compile(r"#\d+;")
+# Characters that would end a node or link label early, as Mermaid entity codes
+_LABEL_ESCAPES = str.maketrans({c: f"#{ord(c)};" for c in '[](){}|"'})
+_LABEL_ESCAPES_HASH = str.maketrans({c: f"#{ord(c)};" for c in '[](){}|"#'})
+_CONTAINER_TAGS = ("UserObject", "object")
+
+
+def _style_items(style):
+    """Split a draw.io style string into (key, value) pairs; bare names have value None."""
+    items = []
+    for part in (style or "").split(";"):
+        if not part:
+            continue
+        key, sep, value = part.partition("=")
+        items.append((key, value if sep else None))
+    return items
+
+
+def _invert_shape_map():
+    shapes = {}
+    for name, style in SHAPE_MAP.items():
+        props = dict(_style_items(style))
+        shapes.setdefault((props["shape"], props.get("rounded") == "1"), name)
+    return shapes
+
+
+_SHAPES = _invert_shape_map()
+
+
+def shape_name(items):
+    """The Mermaid shape of a vertex with these style items."""
+    props = dict(items)
+    shape = props.get("shape")
+    if shape is None and items and items[0][1] is None:
+        # Native draw.io styles start with the shape name, e.g. "ellipse;whiteSpace=wrap"
+        shape = items[0][0]
+    shape = SHAPE_ALIASES.get(shape, shape)
+    rounded = props.get("rounded") == "1"
+    return _SHAPES.get((shape, rounded)) or _SHAPES.get((shape, False)) or ("rounded" if rounded else "rectangle")
+
+
+def css_style(items, defaults):
+    """Turn draw.io style items back into a Mermaid style body, leaving out the theme defaults."""
+    css = {}
+    seen = set()
+    for key, value in items:
+        # The theme's keys come first; a repeated key is a custom style, even with the same value
+        if value is None or (key not in seen and defaults.get(key) == value):
+            seen.add(key)
+            continue
+        seen.add(key)
+        name = CSS_KEYS.get(key)
+        if name is None:
+            # StyleParser passes unknown CSS properties through; draw.io's own keys are camelCase
+            if "-" not in key:
+                continue
+            name = key
+        elif name in _PIXEL_KEYS:
+            value += "px"
+        elif name == "stroke-dasharray":
+            value = "5 5" if value == "1" else "0"
+        css[name] = value
+    return ",".join(f"{name}:{value}" for name, value in css.items())
+
+
+def _label(text, escapes=_LABEL_ESCAPES):
+    text = text.replace("\r\n", "<br>").replace("\n", "<br>")
+    if "#" in text and _ENTITY_RE.search(text):
+        escapes = _LABEL_ESCAPES_HASH
+    return text.translate(escapes)
+
+
+class _Page:
+    """Cells of one page, kept as small tuples until the page is complete."""
+
+    def __init__(self, name):
+        self.name = name
+        self.vertices = []  # (id, parent, value, style, geometry)
+        self.edges = []  # (id, parent, value, style, source, target)
+        # One copy of each style and parent id, however many cells share it
+        self._strings = {}
+
+    def add_cell(self, cell, wrapper=None):
+        attrib = cell.attrib
+        if wrapper is not None:
+            cell_id, value = wrapper.get("id"), wrapper.get("label", "")
+        else:
+            cell_id, value = attrib.get("id"), attrib.get("value", "")
+        strings = self._strings
+        parent = attrib.get("parent")
+        parent = strings.setdefault(parent, parent)
+        style = attrib.get("style")
+        style = strings.setdefault(style, style)
+        if attrib.get("edge") == "1":
+            self.edges.append((cell_id, parent, value, style, attrib.get("source"), attrib.get("target")))
+        elif attrib.get("vertex") == "1":
+            geometry = cell.find("mxGeometry")
+            box = None
+            if geometry is not None:
+                box = tuple(float(geometry.get(k, 0)) for k in ("x", "y", "width", "height"))
+            self.vertices.append((cell_id, parent, value, style, box))
+
+
+class DrawioToMermaidConverter:
+    def __init__(self, input_file=None, output_file=None, theme=None):
+        self.input_file = input_file
+        if output_file is None and input_file is not None:
+            output_file = "-" if input_file == "-" else input_file.rsplit(".", 1)[0] + ".mmd"
+        self.output_file = output_file
+        self.theme = theme or DEFAULT_THEME
+        # (name, Graph, direction) per page, in file order
+        self.pages = []
+        # Generated files repeat a few style strings many times
+        self._kinds = {}
+        self._css_cache = {}
+
+    def parse_drawio(self):
+        if self.input_file == "-":
+            self.parse_stream(sys.stdin.buffer)
+        else:
+            with open(self.input_file, "rb") as f:
+                self.parse_stream(f)
+
+    def parse_text(self, text):
+        self.parse_stream(StringIO(text))
+
+    def parse_stream(self, source):
+        """Read every page of a .drawio document (or a bare mxGraphModel) from a file object."""
+        page = self._read(source)
+        if page is not None:
+            self._add_page(page)
+
+    def _read(self, source, page=None):
+        """Collect the cells in source into page (or the pages its <diagram>s start); return the open page."""
+        stack = []
+        for event, elem in ET.iterparse(source, events=("start", "end")):
+            if event == "start":
+                if elem.tag == "diagram":
+                    page = _Page(elem.get("name") or f"Page-{len(self.pages) + 1}")
+                stack.append(elem)
+                continue
+            stack.pop()
+            tag = elem.tag
+            parent = stack[-1] if stack else None
+            if tag == "mxCell":
+                if page is None:
+                    page = _Page(f"Page-{len(self.pages) + 1}")
+                if parent is not None and parent.tag in _CONTAINER_TAGS:
+                    # The wrapper holds the id and label; it is dropped when it ends
+                    page.add_cell(elem, parent)
+                    continue
+                page.add_cell(elem)
+            elif tag == "diagram":
+                if elem.text and elem.text.strip():
+                    self._read(InflateStream(elem.text), page)
+                self._add_page(page)
+                page = None
+            elif tag not in _CONTAINER_TAGS:
+                continue
+            # Drop what has been read, so the tree never grows
+            elem.clear()
+            if parent is not None:
+                parent.remove(elem)
+        return page
+
+    def _kind(self, style):
+        """"subgraph", "group", "skip" or the Mermaid shape for a vertex with this style."""
+        kind = self._kinds.get(style)
+        if kind is None:
+            items = _style_items(style)
+            props = dict(items)
+            if "swimlane" in props or props.get("container") == "1":
+                kind = "subgraph"
+            elif "group" in props:
+                # draw.io groups only bundle their children
+                kind = "group"
+            elif "text" in props or "edgeLabel" in props:
+                kind = "skip"
+            else:
+                kind = shape_name(items)
+            self._kinds[style] = kind
+        return kind
+
+    def _css(self, style, defaults):
+        key = (style, id(defaults))
+        css = self._css_cache.get(key)
+        if css is None:
+            css = self._css_cache[key] = css_style(_style_items(style), defaults)
+        return css
+
+    def _add_page(self, page):
+        graph = Graph()
+        cells = {}
+        groups = {}
+        labels = {}
+        edge_ids = {edge[0] for edge in page.edges}
+        for vertex in page.vertices:
+            cell_id, parent, value, style = vertex[:4]
+            if parent in edge_ids:
+                # A label placed on an edge
+                labels.setdefault(parent, value)
+                continue
+            kind = self._kind(style)
+            if kind == "subgraph":
+                groups[cell_id] = vertex
+            elif kind == "group":
+                cells[cell_id] = (parent, None)
+            elif kind != "skip":
+                cells[cell_id] = (parent, vertex)
+        for cell_id, vertex in groups.items():
+            cells[cell_id] = (vertex[1], None)
+
+        def container(parent):
+            # The innermost subgraph holding a cell, skipping plain groups
+            while parent is not None and parent not in groups:
+                parent = cells[parent][0] if parent in cells else None
+            return parent
+
+        ids = self._mermaid_ids([cell_id for cell_id, (_, vertex) in cells.items() if vertex is not None])
+
+        def add_group(cell_id):
+            group = graph.groups.get(cell_id)
+            if group is None:
+                parent = container(groups[cell_id][1])
+                if parent is not None:
+                    add_group(parent)
+                name = groups[cell_id][2].replace("\n", " ") or cell_id
+                group = graph.add_group(cell_id, name, parent)
+            return group
+
+        for cell_id in groups:
+            add_group(cell_id)
+
+        node_defaults = self.theme["node"]
+        boxes = {}
+        for cell_id, (parent, vertex) in cells.items():
+            if vertex is None:
+                continue
+            node = graph.add_node(ids[cell_id], vertex[2], self._kind(vertex[3]), group=container(parent))
+            node.style = self._css(vertex[3], node_defaults) or None
+            boxes[cell_id] = (parent, vertex[4])
+
+        edge_defaults = self.theme["edge"]
+        skipped = 0
+        dx = dy = 0.0
+        for cell_id, _, value, style, source, target in page.edges:
+            if source not in ids or target not in ids:
+                skipped += 1
+                continue
+            edge = graph.add_edge(ids[source], ids[target], value or labels.get(cell_id, ""), len(graph.edges))
+            css = self._css(style, edge_defaults)
+            if css:
+                graph.link_styles[edge.index] = css
+            (source_parent, a), (target_parent, b) = boxes[source], boxes[target]
+            if a and b and source_parent == target_parent:
+                dx += (b[0] + b[2] / 2) - (a[0] + a[2] / 2)
+                dy += (b[1] + b[3] / 2) - (a[1] + a[3] / 2)
+        if skipped:
+            logger.debug(f"Skipped {skipped} edges that do not join two nodes on page {page.name}")
+
+        # Mermaid keeps no coordinates; the main flow of the drawing gives the direction
+        if abs(dx) > abs(dy):
+            direction = "LR" if dx > 0 else "RL"
+        else:
+            direction = "BT" if dy < 0 else "TD"
+        self.pages.append((page.name, graph, direction))
+
+    def _mermaid_ids(self, cell_ids):
+        """Map cell ids to Mermaid node ids, renaming the ones the parser cannot read."""
+        ids = {}
+        used = set()
+        renamed = []
+        for cell_id in cell_ids:
+            if cell_id and _ID_RE.match(cell_id) and cell_id not in KEYWORDS:
+                ids[cell_id] = cell_id
+                used.add(cell_id)
+            else:
+                renamed.append(cell_id)
+        counter = 0
+        for cell_id in renamed:
+            counter += 1
+            while f"n{counter}" in used:
+                counter += 1
+            ids[cell_id] = f"n{counter}"
+        return ids
+
+    def to_mermaid(self, page=0):
+        out = StringIO()
+        self.write(out, page)
+        return out.getvalue()
+
+    def write(self, fh, page=0):
+        """Write one page as a Mermaid flowchart."""
+        _, graph, direction = self.pages[page]
+        write = fh.write
+        write(f"graph {direction}\n")
+
+        members = {}
+        for node in graph.nodes.values():
+            members.setdefault(node.group, []).append(node)
+        indent = "    "
+        for node in members.get(None, ()):
+            write(f"{indent}{self._declaration(node)}\n")
+        # Pre-order over the subgraph tree; None marks the end of a subgraph
+        stack = graph.top_groups[::-1]
+        depth = 1
+        while stack:
+            group_id = stack.pop()
+            if group_id is None:
+                depth -= 1
+                write(f"{indent * depth}end\n")
+                continue
+            group = graph.groups[group_id]
+            write(f"{indent * depth}subgraph {group.name}\n")
+            depth += 1
+            for node in members.get(group_id, ()):
+                write(f"{indent * depth}{self._declaration(node)}\n")
+            stack.append(None)
+            stack.extend(reversed(group.children))
+
+        for edge in graph.edges:
+            label = f"|{_label(edge.label)}|" if edge.label else ""
+            write(f"{indent}{edge.source} -->{label} {edge.target}\n")
+        for node in graph.nodes.values():
+            if node.style:
+                write(f"{indent}style {node.id} {node.style}\n")
+        for index, style in graph.link_styles.items():
+            write(f"{indent}linkStyle {index} {style}\n")
+
+    @staticmethod
+    def _declaration(node):
+        if node.label == node.id and node.shape == "rectangle":
+            return node.id
+        start, end = SHAPE_SYNTAX[node.shape]
+        return f"{node.id}{start}{_label(node.label) or ' '}{end}"
+
+    def write_markdown(self, fh):
+        """Write every page as a heading and a ```mermaid block."""
+        for i, (name, _, _) in enumerate(self.pages):
+            if i:
+                fh.write("\n")
+            fh.write(f"## {name}\n\n```mermaid\n")
+            self.write(fh, i)
+            fh.write("```\n")
+
+    def save(self, page=None):
+        """Write the output file; without a page, several pages are written as Markdown."""
+        markdown = self.output_file.endswith((".md", ".markdown")) or (page is None and len(self.pages) > 1)
+        if self.output_file == "-":
+            self._save_to(sys.stdout, page, markdown)
+            return
+        with open(self.output_file, "w", encoding="utf-8") as f:
+            self._save_to(f, page, markdown)
+        logger.info(f"Saved Mermaid file: {self.output_file}")
+
+    def _save_to(self, fh, page, markdown):
+        if markdown and page is None:
+            self.write_markdown(fh)
+        else:
+            self.write(fh, page or 0)
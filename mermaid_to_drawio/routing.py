@@ -0,0 +1,310 @@
+"""
+Orthogonal edge routing around laid out nodes and subgraph containers.
+
+Every node box and group bbox is an obstacle, indexed in a uniform grid so
+that checking a segment only looks at the obstacles in the cells it crosses.
+For each edge a few simple shapes are tried first (straight, Z and L routes);
+if all of them are blocked, an A* search over the grid lines formed by the
+nearby obstacle borders finds a short route with few bends.
+Waypoints are aligned with the node centres so draw.io leaves and enters the
+boxes at right angles.
+"""
+import heapq
+import logging
+from mermaid_to_drawio.layout_manager import NODE_WIDTH, NODE_HEIGHT
+
+logger = logging.getLogger(__name__)
+
+MARGIN = 10
+CELL_SIZE = 200
+BEND_COST = 40
+SEARCH_LIMIT = 4000  # A* steps per edge before falling back to a plain route
+PARALLEL_THRESHOLD = 2000  # edges below which a process pool costs more than it saves
+
+
+class SpatialGrid:
+    """Uniform grid over axis-aligned rectangles (x, y, width, height)."""
+
+    def __init__(self, rects, cell_size=CELL_SIZE):
+        self.rects = rects
+        self.cell_size = cell_size
+        self.cells = {}
+        for i, (x, y, w, h) in enumerate(rects):
+            for cx in range(int(x // cell_size), int((x + w) // cell_size) + 1):
+                for cy in range(int(y // cell_size), int((y + h) // cell_size) + 1):
+                    self.cells.setdefault((cx, cy), []).append(i)
+
+    def query(self, x1, y1, x2, y2, ignore=()):
+        """Indices of the rectangles whose interior overlaps the box (x1, y1)-(x2, y2).
+
+        The box may be degenerate, so this also finds the rectangles an
+        axis-aligned segment or a point passes through. Touching a border
+        does not count.
+        """
+        size = self.cell_size
+        if x1 > x2:
+            x1, x2 = x2, x1
+        if y1 > y2:
+            y1, y2 = y2, y1
+        hits = []
+        seen = set(ignore)
+        for cx in range(int(x1 // size), int(x2 // size) + 1):
+            for cy in range(int(y1 // size), int(y2 // size) + 1):
+                for i in self.cells.get((cx, cy), ()):
+                    if i in seen:
+                        continue
+                    seen.add(i)
+                    x, y, w, h = self.rects[i]
+                    if x < x2 and x1 < x + w and y < y2 and y1 < y + h:
+                        hits.append(i)
+        return hits
+
+
+class Router:
+    def __init__(self, rects, margin=MARGIN, cell_size=CELL_SIZE):
+        self.rects = rects
+        self.margin = margin
+        # Obstacles are padded so routes keep a margin around every box
+        padded = [(x - margin, y - margin, w + 2 * margin, h + 2 * margin) for x, y, w, h in rects]
+        self.grid = SpatialGrid(padded, cell_size)
+        self.extent = (
+            min((x for x, _, _, _ in padded), default=0) - cell_size,
+            min((y for _, y, _, _ in padded), default=0) - cell_size,
+            max((x + w for x, _, w, _ in padded), default=0) + cell_size,
+            max((y + h for _, y, _, h in padded), default=0) + cell_size,
+        )
+
+    def route(self, source, target, ignore=()):
+        """Waypoints for an edge between two obstacle indices, or [] for a straight line.
+
+        ``ignore`` lists obstacles the edge may cross, such as its endpoints
+        and the groups that contain them.
+        """
+        sx, sy, sw, sh = self.rects[source]
+        tx, ty, tw, th = self.rects[target]
+        scx, scy = sx + sw // 2, sy + sh // 2
+        tcx, tcy = tx + tw // 2, ty + th // 2
+        start, end = (scx, scy), (tcx, tcy)
+
+        def clear(points):
+            path = [start, *points, end]
+            return not any(self.grid.query(x1, y1, x2, y2, ignore) for (x1, y1), (x2, y2) in zip(path, path[1:]))
+
+        # Middle of the gap between the boxes (or between their centres if they overlap)
+        if ty >= sy + sh:
+            mid_y = (sy + sh + ty) // 2
+        elif sy >= ty + th:
+            mid_y = (ty + th + sy) // 2
+        else:
+            mid_y = (scy + tcy) // 2
+        if tx >= sx + sw:
+            mid_x = (sx + sw + tx) // 2
+        elif sx >= tx + tw:
+            mid_x = (tx + tw + sx) // 2
+        else:
+            mid_x = (scx + tcx) // 2
+
+        candidates = []
+        if scx == tcx or scy == tcy:
+            candidates.append([])
+        vertical_first = abs(tcy - scy) >= abs(tcx - scx)
+        vertical_z = [(scx, mid_y), (tcx, mid_y)]
+        horizontal_z = [(mid_x, scy), (mid_x, tcy)]
+        candidates.extend([vertical_z, horizontal_z] if vertical_first else [horizontal_z, vertical_z])
+        candidates.extend([[(scx, tcy)], [(tcx, scy)]])
+        for points in candidates:
+            if clear(points):
+                return _simplify(start, points, end)
+
+        points = self._search(start, end, set(ignore))
+        if points is not None:
+            return _simplify(start, points, end)
+        # Nothing clears every obstacle; keep the plain orthogonal route
+        return _simplify(start, vertical_z if vertical_first else horizontal_z, end)
+
+    def _search(self, start, end, ignore):
+        """Find waypoints with A*, first near the edge and then over the whole drawing.
+
+        The first area is the box around both endpoints. If obstacles wall
+        the route in there, the search is repeated over the whole drawing so
+        it can go around them. Returns None if nothing is found.
+        """
+        (sx, sy), (ex, ey) = start, end
+        pad = self.grid.cell_size
+        area = (min(sx, ex) - pad, min(sy, ey) - pad, max(sx, ex) + pad, max(sy, ey) + pad)
+        points, walled_in = self._search_area(start, end, ignore, area)
+        if points is None and walled_in:
+            x_lo, y_lo, x_hi, y_hi = self.extent
+            area = (min(x_lo, area[0]), min(y_lo, area[1]), max(x_hi, area[2]), max(y_hi, area[3]))
+            points, _ = self._search_area(start, end, ignore, area)
+        return points
+
+    def _search_area(self, start, end, ignore, area):
+        """A* over the grid formed by the obstacle borders inside area (a Hanan grid).
+
+        Between two neighbouring grid lines no border is crossed, so a step is
+        free exactly when its midpoint lies outside every obstacle. Bends cost
+        extra to keep routes simple. Returns ``(waypoints, walled_in)``;
+        waypoints is None if the area holds no route (walled_in is True) or
+        SEARCH_LIMIT steps ran out first.
+        """
+        grid = self.grid
+        pad = grid.cell_size
+        (sx, sy), (ex, ey) = start, end
+        x_lo, y_lo, x_hi, y_hi = area
+        xs, ys = {sx, ex, x_lo, x_hi}, {sy, ey, y_lo, y_hi}
+        for i in grid.query(x_lo, y_lo, x_hi, y_hi, ignore):
+            x, y, w, h = grid.rects[i]
+            xs.update(v for v in (x, x + w) if x_lo < v < x_hi)
+            ys.update(v for v in (y, y + h) if y_lo < v < y_hi)
+        xs, ys = sorted(xs), sorted(ys)
+        goal = (xs.index(ex), ys.index(ey))
+
+        cells, rects = grid.cells, grid.rects
+        blocked = {}
+
+        def free(key):
+            # key is (x index, y index, axis) of the step's lower end; steps are
+            # shared by the states arriving from each direction
+            result = blocked.get(key)
+            if result is None:
+                ix, iy, axis = key
+                if axis == 0:
+                    px, py = (xs[ix] + xs[ix + 1]) / 2, ys[iy]
+                else:
+                    px, py = xs[ix], (ys[iy] + ys[iy + 1]) / 2
+                result = True
+                for i in cells.get((int(px // pad), int(py // pad)), ()):
+                    x, y, w, h = rects[i]
+                    if x < px < x + w and y < py < y + h and i not in ignore:
+                        result = False
+                        break
+                blocked[key] = result
+            return result
+
+        # States are (x index, y index, direction of the last step: 0 across, 1 down, -1 none).
+        # Heap entries break ties on the larger cost so that the search runs deep first.
+        width, height = len(xs), len(ys)
+        origin = (xs.index(sx), ys.index(sy), -1)
+        best = {origin: 0}
+        came_from = {}
+        heap = [(abs(ex - sx) + abs(ey - sy), 0, origin)]
+        steps = 0
+        while heap:
+            _, cost, state = heapq.heappop(heap)
+            cost = -cost
+            ix, iy, direction = state
+            if (ix, iy) == goal:
+                path = []
+                while state in came_from:
+                    state = came_from[state]
+                    path.append((xs[state[0]], ys[state[1]]))
+                return path[-2::-1], False
+            if cost > best[state]:
+                continue
+            steps += 1
+            if steps > SEARCH_LIMIT:
+                return None, False
+            px, py = xs[ix], ys[iy]
+            for jx, jy, step_direction, step in ((ix - 1, iy, 0, (ix - 1, iy, 0)), (ix + 1, iy, 0, (ix, iy, 0)),
+                                                 (ix, iy - 1, 1, (ix, iy - 1, 1)), (ix, iy + 1, 1, (ix, iy, 1))):
+                if not (0 <= jx < width and 0 <= jy < height) or not free(step):
+                    continue
+                qx, qy = xs[jx], ys[jy]
+                new_cost = cost + abs(qx - px) + abs(qy - py)
+                if direction != -1 and direction != step_direction:
+                    new_cost += BEND_COST
+                next_state = (jx, jy, step_direction)
+                if new_cost < best.get(next_state, new_cost + 1):
+                    best[next_state] = new_cost
+                    came_from[next_state] = state
+                    estimate = new_cost + abs(ex - qx) + abs(ey - qy)
+                    if qx != ex and qy != ey:
+                        # Off both of the goal's lines, at least one more bend is needed
+                        estimate += BEND_COST
+                    heapq.heappush(heap, (estimate, -new_cost, next_state))
+        return None, True
+
+
+def _simplify(start, points, end):
+    """Drop waypoints that repeat a point or sit on a straight run."""
+    path = [start]
+    for point in [*points, end]:
+        if point == path[-1]:
+            continue
+        if len(path) > 1:
+            (x0, y0), (x1, y1) = path[-2], path[-1]
+            if x0 == x1 == point[0] or y0 == y1 == point[1]:
+                path[-1] = point
+                continue
+        path.append(point)
+    return path[1:-1]
+
+
+_worker_router = None
+
+
+def _init_worker(rects, margin):
+    global _worker_router
+    _worker_router = Router(rects, margin)
+
+
+def _route_job(job):
+    return _worker_router.route(*job)
+
+
+def route_edges(layout, node_size=(NODE_WIDTH, NODE_HEIGHT), margin=MARGIN, workers=1):
+    """Set ``points`` on every edge of ``layout.graph`` from the current layout.
+
+    Nodes without their own size are node_size boxes. Self-loops and edges
+    to unknown nodes get no waypoints. With more than one
+    worker and at least PARALLEL_THRESHOLD edges, routing is spread over a
+    process pool; each worker builds the spatial index once.
+    """
+    graph = layout.graph
+    width, height = node_size
+    rects = []
+    index = {}
+    for node_id, node in graph.nodes.items():
+        x, y = layout.get_position(node_id)
+        index[node_id] = len(rects)
+        rects.append((x, y, node.width or width, node.height or height))
+    group_index = {}
+    for group_id in graph.groups:
+        bbox = layout.get_group_bbox(group_id)
+        if bbox is not None:
+            group_index[group_id] = len(rects)
+            rects.append(tuple(bbox))
+
+    def ancestors(node):
+        group_id = node.group
+        while group_id is not None:
+            if group_id in group_index:
+                yield group_index[group_id]
+            group_id = graph.groups[group_id].parent
+
+    jobs = []
+    routed = []
+    for edge in graph.edges:
+        source, target = graph.nodes.get(edge.source), graph.nodes.get(edge.target)
+        edge.points = None
+        if source is None or target is None or source is target:
+            continue
+        ignore = (index[source.id], index[target.id], *ancestors(source), *ancestors(target))
+        jobs.append((index[source.id], index[target.id], ignore))
+        routed.append(edge)
+
+    if workers > 1 and len(jobs) >= PARALLEL_THRESHOLD:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(rects, margin)) as executor:
+            results = executor.map(_route_job, jobs, chunksize=chunksize)
+            for edge, points in zip(routed, results):
+                edge.points = points
+    else:
+        router = Router(rects, margin)
+        for edge, job in zip(routed, jobs):
+            edge.points = router.route(*job)
+    logger.debug(f"Routed {len(routed)} edges around {len(rects)} obstacles")
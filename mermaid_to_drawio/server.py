@@ -0,0 +1,258 @@
+"""
+Conversion server: `mermaid2drawio serve`.
+
+An asyncio HTTP/1.1 front end (TCP or Unix socket) hands conversions to a
+pool of worker processes that have already imported the converter.
+Identical requests that arrive while one is being converted share its
+result, and recent results are kept in an in-memory LRU.
+
+    POST /convert[?layout=grid&route=1&compress=1]   Mermaid text in, .drawio XML out
+    GET  /metrics                                    request, cache and latency counters as JSON
+    GET  /health
+"""
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY = 16 * 1024 * 1024
+LATENCY_WINDOW = 1000
+
+# Per-request overrides accepted in the query string
+_FLAGS = ("route", "compact", "compress")
+_CHOICES = {"layout": ("layered", "grid"), "ids": ("counter", "hash", "uuid"), "sizing": ("text", "fixed")}
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+def _warm_worker():
+    # Import everything a conversion needs before the first request arrives
+    import mermaid_to_drawio.converter  # noqa: F401
+    import mermaid_to_drawio.batch  # noqa: F401
+
+
+def _ready():
+    return True
+
+
+def convert_text(text, options):
+    """Convert Mermaid text to .drawio XML text; runs in a worker process."""
+    from mermaid_to_drawio.batch import Job, create_converter
+
+    converter = create_converter(Job(None, None), options)
+    converter.parse_text(text)
+    out = io.StringIO()
+    converter.write(out, compact=options.get("compact", False), compress=options.get("compress", False))
+    return out.getvalue()
+
+
+class ConversionServer:
+    def __init__(self, options, workers=1, cache_size=256):
+        self.options = options
+        self.workers = workers
+        self.cache_size = cache_size
+        self._executor = None
+        self._results = OrderedDict()
+        self._inflight = {}
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.conversions = 0
+        self.hits = 0
+        self.coalesced = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+
+    async def start(self):
+        """Start the worker processes and wait until each has imported the converter."""
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _ready) for _ in range(self.workers)))
+        logger.info(f"{self.workers} worker(s) ready")
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def request_options(self, query):
+        """Server options with the overrides from a query string; raises ValueError for bad values."""
+        options = dict(self.options)
+        for name, values in parse_qs(query).items():
+            value = values[-1]
+            if name in _FLAGS:
+                options[name] = value.lower() in ("1", "true", "yes", "on")
+            elif name in _CHOICES and value in _CHOICES[name]:
+                options[name] = value
+            else:
+                raise ValueError(f"unsupported parameter {name}={value}")
+        return options
+
+    async def convert(self, text, options=None):
+        """Return the .drawio XML for text, from the LRU, a conversion already running, or the pool."""
+        options = self.options if options is None else options
+        digest = hashlib.sha256(json.dumps(options, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        key = digest.digest()
+
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+            self.hits += 1
+            return result
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = self._inflight[key] = loop.run_in_executor(self._executor, convert_text, text, options)
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            self.queue_depth -= 1
+            del self._inflight[key]
+        self.conversions += 1
+        self._results[key] = result
+        if len(self._results) > self.cache_size:
+            self._results.popitem(last=False)
+        return result
+
+    def metrics(self):
+        latencies = sorted(self._latencies)
+
+        def percentile(p):
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 3) if latencies else None
+
+        return {
+            "uptime_seconds": round(time.time() - self.started, 3),
+            "workers": self.workers,
+            "requests": self.requests,
+            "errors": self.errors,
+            "conversions": self.conversions,
+            "cache_hits": self.hits,
+            "coalesced": self.coalesced,
+            "cache_entries": len(self._results),
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "latency_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "p99": percentile(0.99),
+                           "max": percentile(1.0), "samples": len(latencies)},
+        }
+
+    async def dispatch(self, method, target, body):
+        """Handle one request; returns (status, content type, body bytes)."""
+        url = urlsplit(target)
+        if url.path == "/convert":
+            if method != "POST":
+                return 405, "text/plain", b"use POST\n"
+            try:
+                options = self.request_options(url.query)
+                text = body.decode("utf-8")
+            except ValueError as e:
+                return 400, "text/plain", f"{e}\n".encode("utf-8")
+            start = time.perf_counter()
+            try:
+                result = await self.convert(text, options)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Conversion failed: {e}")
+                return 500, "text/plain", f"{type(e).__name__}: {e}\n".encode("utf-8")
+            finally:
+                self._latencies.append(time.perf_counter() - start)
+            return 200, "application/xml", result.encode("utf-8")
+        if url.path == "/metrics" and method == "GET":
+            return 200, "application/json", json.dumps(self.metrics(), indent=2).encode("utf-8")
+        if url.path == "/health" and method == "GET":
+            return 200, "text/plain", b"ok\n"
+        return 404, "text/plain", b"not found\n"
+
+    async def handle(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection, keeping it alive between requests."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                self.requests += 1
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                    length = int(headers.get("content-length", 0))
+                    if length < 0:
+                        raise ValueError(f"negative Content-Length {length}")
+                except ValueError:
+                    status, content_type, payload = 400, "text/plain", b"malformed request\n"
+                    keep_alive = False
+                else:
+                    keep_alive = keep_alive and version == "HTTP/1.1"
+                    if length > MAX_BODY:
+                        status, content_type, payload = 413, "text/plain", b"diagram too large\n"
+                        keep_alive = False
+                    else:
+                        body = await reader.readexactly(length) if length else b""
+                        status, content_type, payload = await self.dispatch(method, target, body)
+
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: {content_type}; charset=utf-8\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def listen(self, host="127.0.0.1", port=8080, unix_socket=None):
+        """Start listening and return the asyncio server."""
+        if unix_socket:
+            server = await asyncio.start_unix_server(self.handle, path=unix_socket)
+            logger.info(f"Serving on unix:{unix_socket}")
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            address = server.sockets[0].getsockname()
+            logger.info(f"Serving on http://{address[0]}:{address[1]}")
+        return server
+
+
+def serve(options, host="127.0.0.1", port=8080, unix_socket=None, workers=1, cache_size=256):
+    """Run the conversion server until interrupted."""
+
+    async def run():
+        server = ConversionServer(options, workers, cache_size)
+        await server.start()
+        try:
+            listener = await server.listen(host, port, unix_socket)
+            async with listener:
+                await listener.serve_forever()
+        finally:
+            server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
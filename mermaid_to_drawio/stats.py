@@ -0,0 +1,186 @@
+"""
+Per-stage instrumentation of a conversion.
+
+A ConversionStats passed to the converter records the wall time of each
+stage (parse, layout, route, build, save), optionally its peak traced
+memory, and counts such as nodes, edges and regex attempts. Stages may
+nest (save streams build, which runs layout); each stage's time excludes
+the stages inside it, so the stage times add up to the total.
+"""
+import json
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STAGES = ("parse", "layout", "route", "build", "save")
+
+
+def max_rss():
+    """Peak resident set size of this process in bytes, or None where unavailable."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+class _Frame:
+    __slots__ = ("name", "start", "children", "mem_start", "mem_peak")
+
+
+class ConversionStats:
+    def __init__(self, memory=False, hooks=()):
+        """memory=True traces allocations per stage with tracemalloc, which slows conversion down.
+
+        Each hook is called as ``hook(stage, seconds, peak_bytes)`` when a
+        stage ends; peak_bytes is None without memory tracing.
+        """
+        self.memory = memory
+        self.hooks = list(hooks)
+        self.seconds = Counter()
+        self.peak = {}
+        self.counts = Counter()
+        self._stack = []
+        self._tracing = False
+        # Largest RSS reported by merged stats from other processes
+        self._merged_rss = None
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def timed(self, name, fn):
+        """Wrap fn so time spent in it counts towards stage name instead of the enclosing stage.
+
+        Meant for small functions called many times, such as writing one
+        cell: no hooks run and no memory is traced per call.
+        """
+        seconds = self.seconds
+        stack = self._stack
+        clock = time.perf_counter
+
+        def wrapper(*args):
+            start = clock()
+            try:
+                return fn(*args)
+            finally:
+                elapsed = clock() - start
+                seconds[name] += elapsed
+                if stack:
+                    stack[-1].children += elapsed
+        return wrapper
+
+    def _enter(self, name):
+        frame = _Frame()
+        frame.name = name
+        frame.children = 0.0
+        frame.mem_start = frame.mem_peak = None
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._tracing = True
+            frame.mem_start = frame.mem_peak = tracemalloc.get_traced_memory()[0]
+            _reset_peak()
+        self._stack.append(frame)
+        frame.start = time.perf_counter()
+
+    def _exit(self):
+        end = time.perf_counter()
+        frame = self._stack.pop()
+        elapsed = end - frame.start
+        seconds = elapsed - frame.children
+        self.seconds[frame.name] += seconds
+
+        peak = None
+        if self.memory:
+            frame.mem_peak = max(frame.mem_peak, tracemalloc.get_traced_memory()[1])
+            peak = frame.mem_peak - frame.mem_start
+            self.peak[frame.name] = max(self.peak.get(frame.name, 0), peak)
+        if self._stack:
+            parent = self._stack[-1]
+            parent.children += elapsed
+            if self.memory:
+                # The child reset the peak, so carry it over to the enclosing stage
+                parent.mem_peak = max(parent.mem_peak, frame.mem_peak)
+                _reset_peak()
+        elif self._tracing:
+            # Only stop tracing that this object started
+            tracemalloc.stop()
+            self._tracing = False
+
+        for hook in self.hooks:
+            hook(frame.name, seconds, peak)
+
+    def merge(self, other):
+        """Add another ConversionStats (or its as_dict()) into this one."""
+        data = other if isinstance(other, dict) else other.as_dict()
+        for name, stage in data["stages"].items():
+            self.seconds[name] += stage["seconds"]
+            if stage["peak_bytes"] is not None:
+                self.peak[name] = max(self.peak.get(name, 0), stage["peak_bytes"])
+        self.counts.update(data["counts"])
+        if data.get("max_rss_bytes") is not None:
+            self._merged_rss = max(self._merged_rss or 0, data["max_rss_bytes"])
+
+    def as_dict(self):
+        ordered = [name for name in STAGES if name in self.seconds]
+        ordered += [name for name in self.seconds if name not in STAGES]
+        rss = max_rss()
+        if self._merged_rss is not None:
+            rss = max(rss or 0, self._merged_rss)
+        return {
+            "stages": {name: {"seconds": self.seconds[name], "peak_bytes": self.peak.get(name)} for name in ordered},
+            "total_seconds": sum(self.seconds.values()),
+            "counts": dict(self.counts),
+            "max_rss_bytes": rss,
+        }
+
+    def to_json(self):
+        return json.dumps(self.as_dict(), indent=2)
+
+    def format_table(self):
+        data = self.as_dict()
+        total = data["total_seconds"] or 1e-12
+        memory = any(stage["peak_bytes"] is not None for stage in data["stages"].values())
+        lines = [f"{'stage':<10}{'time':>11}{'share':>8}" + (f"{'peak mem':>11}" if memory else "")]
+        for name, stage in data["stages"].items():
+            line = f"{name:<10}{stage['seconds'] * 1000:>9.1f}ms{stage['seconds'] / total:>8.1%}"
+            if memory:
+                line += f"{(stage['peak_bytes'] or 0) / 2**20:>9.1f}MB"
+            lines.append(line)
+        lines.append(f"{'total':<10}{data['total_seconds'] * 1000:>9.1f}ms")
+        if data["counts"]:
+            lines.append("  ".join(f"{name.replace('_', ' ')}: {value}" for name, value in sorted(data["counts"].items())))
+        if data["max_rss_bytes"] is not None:
+            lines.append(f"max RSS: {data['max_rss_bytes'] / 2**20:.1f}MB")
+        return "\n".join(lines)
+
+
+class _Stage:
+    __slots__ = ("stats", "name")
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.stats._enter(self.name)
+        return self.stats
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stats._exit()
+
+
+def _reset_peak():
+    # tracemalloc.reset_peak() is Python 3.9+; before that peaks are process-wide
+    reset = getattr(tracemalloc, "reset_peak", None)
+    if reset is not None:
+        reset()
@@ -1,4 +1,12 @@
 import re
+from functools import lru_cache
+
+# Generated diagrams repeat a handful of style strings thousands of times
+STYLE_CACHE_SIZE = 4096
+
+# Declarations are separated by ";" or "," except inside rgb(...)/rgba(...)
+_DECLARATION_SEP_RE = re.compile(r"[;,](?![^(]*\))")
+_RGB_RE = re.compile(r"rgba?\((\d+),\s*(\d+),\s*(\d+)(?:,\s*[\d.]+)?\)")
 
 class StyleParser:
     COLOR_MAP = {
@@ -24,9 +32,9 @@ class StyleParser:
     }
 
     @staticmethod
+    @lru_cache(maxsize=STYLE_CACHE_SIZE)
     def parse(style_str):
-        style_str = style_str.replace(",", ";")
-        parts = style_str.split(";")
+        parts = _DECLARATION_SEP_RE.split(style_str)
         style_parts = []
         
         for part in parts:
@@ -47,6 +55,9 @@ class StyleParser:
                 if key == "stroke-width":
                     key = "strokeWidth"
                     value = value.replace("px", "")
+                elif key == "font-size":
+                    key = "fontSize"
+                    value = value.replace("px", "")
                 elif key == "stroke-dasharray":
                     key = "dashed"
                     value = "1" if value != "0" else "0"
@@ -58,6 +69,7 @@ class StyleParser:
         return ";".join(style_parts)
     
     @staticmethod
+    @lru_cache(maxsize=STYLE_CACHE_SIZE)
     def resolve_color(color):
         # Convert named colors to hex
         if color.lower() in StyleParser.COLOR_MAP:
@@ -71,7 +83,7 @@ class StyleParser:
     
     @staticmethod
     def rgb_to_hex(rgb_str):
-        match = re.match(r"rgba?\((\d+),\s*(\d+),\s*(\d+)(?:,\s*[\d.]+)?\)", rgb_str)
+        match = _RGB_RE.match(rgb_str)
         if match:
             r, g, b = match.groups()[:3]
             return f"#{int(r):02x}{int(g):02x}{int(b):02x}"
@@ -0,0 +1,118 @@
+"""
+Node sizes estimated from label text.
+
+Glyph advances come from a table of Helvetica widths (draw.io's default
+font), in thousandths of the font size. Labels are word-wrapped at
+MAX_TEXT_WIDTH and the wrapped block is padded and scaled to fit inside the
+node's shape. Measurements are memoized per (label, font size) and per
+(label, shape, style), so repeated labels cost a dict lookup.
+"""
+import re
+from functools import lru_cache
+
+FONT_SIZE = 12  # draw.io's default
+LINE_HEIGHT = 1.2
+MAX_TEXT_WIDTH = 200  # wrap width at the default font size; scales with the font
+PADDING = (24, 16)  # total horizontal and vertical room around the text
+MIN_SIZE = (80, 40)
+GRID = 10  # sizes are rounded up to a multiple of this
+SIZE_CACHE_SIZE = 16384
+
+# Printable ASCII (space to "~"), Helvetica AFM widths
+_ASCII_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_WIDTHS = {chr(32 + i): width for i, width in enumerate(_ASCII_WIDTHS)}
+_DEFAULT_WIDTH = 556
+
+# Scale and extra room per shape, for the text block to fit inside its outline
+SHAPE_FIT = {
+    "rhombus": (2.0, 2.0, 0, 0),
+    "ellipse": (1.42, 1.42, 0, 0),
+    "circle": (1.42, 1.42, 0, 0),
+    "hexagon": (1.25, 1.0, 0, 0),
+    "parallelogram": (1.0, 1.0, 40, 0),
+    "cylinder": (1.0, 1.0, 0, 30),
+}
+
+_BREAK_RE = re.compile(r"<br\s*/?>|\n", re.IGNORECASE)
+_FONT_SIZE_RE = re.compile(r"(?:^|;)fontSize=(\d+(?:\.\d+)?)")
+
+
+def _glyph_width(char):
+    import unicodedata
+
+    if unicodedata.combining(char):
+        return 0
+    if unicodedata.east_asian_width(char) in ("W", "F"):
+        return 1000
+    return _DEFAULT_WIDTH
+
+
+def text_width(text):
+    """Advance width of one line of text, in thousandths of the font size."""
+    try:
+        return sum(map(_WIDTHS.__getitem__, text))
+    except KeyError:
+        for char in text:
+            if char not in _WIDTHS:
+                _WIDTHS[char] = _glyph_width(char)
+        return sum(map(_WIDTHS.__getitem__, text))
+
+
+@lru_cache(maxsize=SIZE_CACHE_SIZE)
+def label_size(label, font_size=FONT_SIZE):
+    """Return ``(width, height, lines)`` of label word-wrapped at MAX_TEXT_WIDTH, in pixels."""
+    limit = MAX_TEXT_WIDTH * 1000 / FONT_SIZE
+    if "<" in label or "\n" in label:
+        paragraphs = _BREAK_RE.split(label)
+    else:
+        # Most labels are a single short line
+        width = text_width(label)
+        if width <= limit:
+            return width * font_size / 1000, LINE_HEIGHT * font_size, 1
+        paragraphs = (label,)
+
+    space = _WIDTHS[" "]
+    widest = 0
+    lines = 0
+    for paragraph in paragraphs:
+        line = -space
+        for word in paragraph.split():
+            width = text_width(word)
+            if line > 0 and line + space + width > limit:
+                widest = max(widest, line)
+                lines += 1
+                line = width
+            else:
+                line += space + width
+        widest = max(widest, line)
+        lines += 1
+    return widest * font_size / 1000, lines * LINE_HEIGHT * font_size, lines
+
+
+def font_size(style):
+    """The fontSize set in a draw.io style string, or FONT_SIZE."""
+    if not style or "fontSize=" not in style:
+        return FONT_SIZE
+    match = _FONT_SIZE_RE.search(style)
+    return float(match.group(1)) if match else FONT_SIZE
+
+
+def _round_up(value):
+    return int(-(-value // GRID) * GRID)
+
+
+@lru_cache(maxsize=SIZE_CACHE_SIZE)
+def node_size(label, shape=None, style=None):
+    """Return the ``(width, height)`` of a node box that fits its label."""
+    width, height, _ = label_size(label, font_size(style))
+    scale_x, scale_y, extra_x, extra_y = SHAPE_FIT.get(shape, (1.0, 1.0, 0, 0))
+    width = (width + PADDING[0]) * scale_x + extra_x
+    height = (height + PADDING[1]) * scale_y + extra_y
+    return max(MIN_SIZE[0], _round_up(width)), max(MIN_SIZE[1], _round_up(height))
@@ -0,0 +1,23 @@
+"""
+Color themes, as module constants so they are built once per process.
+
+This module imports nothing, so the CLI can offer the theme names without
+loading the converter.
+"""
+
+THEMES = {
+    "light": {
+        "node": {"fillColor": "#ffffff", "strokeColor": "#333333", "strokeWidth": "1"},
+        "edge": {"strokeColor": "#666666", "strokeWidth": "2"}
+    },
+    "dark": {
+        "node": {"fillColor": "#333333", "strokeColor": "#f0f0f0", "strokeWidth": "1"},
+        "edge": {"strokeColor": "#aaaaaa", "strokeWidth": "2"}
+    },
+    "default": {
+        "node": {"fillColor": "#DAE8FC", "strokeColor": "#333333", "strokeWidth": "1"},
+        "edge": {"strokeColor": "#666666", "strokeWidth": "2"}
+    }
+}
+
+DEFAULT_THEME = THEMES["light"]
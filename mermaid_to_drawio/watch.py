@@ -0,0 +1,55 @@
+"""
+Watch mode: keep one converter alive and patch its output on every save.
+"""
+import logging
+import os
+import time
+from mermaid_to_drawio.batch import create_converter
+
+logger = logging.getLogger(__name__)
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def watch(job, options, interval=0.2, stop=None):
+    """Convert job.input_file, then re-convert incrementally whenever it changes.
+
+    Runs until interrupted, or until ``stop`` (a threading.Event) is set.
+    """
+    compact = options.get("compact", False)
+    compress = options.get("compress", False)
+    converter = create_converter(job, options)
+    last_mtime = os.stat(job.input_file).st_mtime_ns
+    converter.parse_text(_read(job.input_file), incremental=True)
+    converter.build()
+    converter.save(compact=compact, compress=compress)
+    logger.info(f"Watching {job.input_file} for changes (Ctrl+C to stop)")
+
+    try:
+        while not (stop is not None and stop.is_set()):
+            if stop is not None:
+                stop.wait(interval)
+            else:
+                time.sleep(interval)
+            try:
+                mtime = os.stat(job.input_file).st_mtime_ns
+            except FileNotFoundError:
+                continue  # editors often replace the file on save
+            if mtime == last_mtime:
+                continue
+            last_mtime = mtime
+
+            start = time.perf_counter()
+            try:
+                changed = converter.update(_read(job.input_file))
+            except Exception as e:
+                logger.error(f"Update failed: {e}")
+                continue
+            converter.save(compact=compact, compress=compress)
+            logger.info(f"Updated {len(changed)} cells in {(time.perf_counter() - start) * 1000:.0f}ms")
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -0,0 +1,99 @@
+"""
+Streaming writer for draw.io (mxfile) documents.
+
+Cells are serialized one at a time straight to a text file handle, so the
+document is never held in memory as a whole string.
+"""
+import xml.etree.ElementTree as ET
+
+# xml.sax.saxutils.escape would do, but importing it loads urllib and http
+_ATTR_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;",
+                               "\n": "&#10;", "\r": "&#13;", "\t": "&#09;"})
+
+# ET.indent is only available on Python 3.9+; older versions fall back to compact cells.
+_indent = getattr(ET, "indent", None)
+
+
+def _start_tag(tag, attrib):
+    attrs = "".join(f' {key}="{str(value).translate(_ATTR_ESCAPES)}"' for key, value in attrib.items())
+    return f"<{tag}{attrs}>"
+
+
+class DrawioWriter:
+    CELL_LEVEL = 4  # mxfile > diagram > mxGraphModel > root > mxCell
+
+    def __init__(self, fh, compact=False, mxfile_attrib=None, prolog=True, compress=False):
+        """With prolog=False only pages are written, for splicing into another writer's document.
+
+        With compress=True each page's model is stored in draw.io's compressed
+        form; cells inside it are always compact.
+        """
+        self.fh = fh
+        self.compact = compact or compress
+        self.compress = compress
+        self._space = "" if compact else "  "
+        self._newline = "" if compact else "\n"
+        self._stream = None
+        self.prolog = prolog
+        if prolog:
+            self._write(0, '<?xml version="1.0" encoding="UTF-8"?>')
+            self._write(0, _start_tag("mxfile", mxfile_attrib or {"host": "app.diagrams.net"}))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+    def _write(self, level, text):
+        if self._stream is not None:
+            self._stream.write(text)
+        else:
+            self.fh.write(self._space * level + text + self._newline)
+
+    def begin_diagram(self, diagram_attrib, model_attrib=None):
+        if self.compress:
+            from mermaid_to_drawio.compression import DeflateStream
+
+            self.fh.write(self._space + _start_tag("diagram", diagram_attrib))
+            self._stream = DeflateStream(self.fh)
+        else:
+            self._write(1, _start_tag("diagram", diagram_attrib))
+        self._write(2, _start_tag("mxGraphModel", model_attrib or {}))
+        self._write(3, "<root>")
+
+    def serialize(self, cell):
+        if not self.compact and _indent is not None:
+            _indent(cell, space=self._space, level=self.CELL_LEVEL)
+        elif len(cell):
+            # Drop indentation left behind by an earlier pretty write of the same cell
+            cell.text = None
+            for child in cell:
+                child.tail = None
+        return ET.tostring(cell, encoding="unicode")
+
+    def write_cell(self, cell):
+        self._write(self.CELL_LEVEL, self.serialize(cell))
+
+    def write_text(self, text):
+        """Write a cell already produced by serialize() with the same compact setting."""
+        self._write(self.CELL_LEVEL, text)
+
+    def write_pages(self, text):
+        """Write pages rendered by a prolog=False writer with the same compact setting."""
+        self.fh.write(text)
+
+    def end_diagram(self):
+        self._write(3, "</root>")
+        self._write(2, "</mxGraphModel>")
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+            self.fh.write("</diagram>" + self._newline)
+        else:
+            self._write(1, "</diagram>")
+
+    def close(self):
+        if self.prolog:
+            self._write(0, "</mxfile>")
@@ -5,7 +5,7 @@ setup(
     version='0.1.0',
     description='Convert Mermaid diagrams to Draw.io XML format',
     author='Amit Kumar',
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "tests"]),
     include_package_data=True,
     python_requires='>=3.7',
     classifiers=[
@@ -14,7 +14,8 @@ setup(
     ],
     entry_points={
         'console_scripts': [
-            'mermaid2drawio=mermaid_to_drawio.converter:main'
+            'mermaid2drawio=mermaid_to_drawio.cli:main',
+            'drawio2mermaid=mermaid_to_drawio.cli:reverse_main',
         ]
     },
 )
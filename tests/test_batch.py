@@ -0,0 +1,69 @@
+import os
+import pytest
+from mermaid_to_drawio.batch import Job, collect_inputs, output_path, run_batch
+from mermaid_to_drawio.cli import main
+
+MMD = "graph TD\nA[Start] --> B[End]\n"
+
+def _tree(tmp_path):
+    (tmp_path / "docs" / "nested").mkdir(parents=True)
+    (tmp_path / "docs" / "one.mmd").write_text(MMD)
+    (tmp_path / "docs" / "nested" / "two.mmd").write_text(MMD)
+    (tmp_path / "docs" / "notes.txt").write_text("not a diagram")
+    return tmp_path / "docs"
+
+def test_collect_inputs(tmp_path):
+    docs = _tree(tmp_path)
+    from_dir = collect_inputs([str(docs)])
+    assert [rel for _, rel in from_dir] == ["one.mmd", os.path.join("nested", "two.mmd")]
+
+    from_glob = collect_inputs([str(docs / "**" / "*.mmd"), str(docs / "one.mmd")])
+    assert [rel for _, rel in from_glob] == [os.path.join("nested", "two.mmd"), "one.mmd"]
+
+def test_collect_inputs_rejects_clashing_outputs(tmp_path):
+    for name in ("a", "b"):
+        (tmp_path / "d" / name).mkdir(parents=True)
+        (tmp_path / "d" / name / "x.mmd").write_text(MMD)
+    pattern = str(tmp_path / "d" / "**" / "*.mmd")
+    inputs = collect_inputs([pattern], out_dir="out")
+    assert [rel for _, rel in inputs] == [os.path.join("a", "x.mmd"), os.path.join("b", "x.mmd")]
+
+    files = [str(tmp_path / "d" / name / "x.mmd") for name in ("a", "b")]
+    assert len(collect_inputs(files)) == 2
+    with pytest.raises(ValueError, match="would both be written"):
+        collect_inputs(files, out_dir="out")
+    with pytest.raises(SystemExit):
+        main(files + ["--out-dir", str(tmp_path / "out"), "--no-cache"])
+
+def test_output_path():
+    assert output_path("docs/a.mmd", "a.mmd") == "docs/a.drawio"
+    assert output_path("docs/x/a.mmd", "x/a.mmd", "out") == os.path.join("out", "x/a.drawio")
+    assert output_path("-", "-") == "-"
+
+def test_run_batch_reports_failures(tmp_path):
+    docs = _tree(tmp_path)
+    jobs = [
+        Job(str(docs / "one.mmd"), str(tmp_path / "out" / "one.drawio")),
+        Job(str(docs / "missing.mmd"), str(tmp_path / "out" / "missing.drawio")),
+    ]
+    results = list(run_batch(jobs, {"layout": "layered"}))
+    assert [r.ok for r in results] == [True, False]
+    assert "FileNotFoundError" in results[1].error
+    assert (tmp_path / "out" / "one.drawio").exists()
+
+def test_main_parallel_batch(tmp_path):
+    docs = _tree(tmp_path)
+    out = tmp_path / "out"
+    assert main([str(docs), "--out-dir", str(out), "--jobs", "2", "--no-cache"]) == 0
+    assert (out / "one.drawio").exists()
+    assert (out / "nested" / "two.drawio").exists()
+
+    assert main([str(docs / "one.mmd"), str(docs / "missing.mmd"), "--out-dir", str(out), "--no-cache"]) == 1
+
+def test_write_errors_keep_their_cause(tmp_path):
+    docs = _tree(tmp_path)
+    # The output path is taken by a directory
+    (tmp_path / "one.drawio").mkdir()
+    [result] = run_batch([Job(str(docs / "one.mmd"), str(tmp_path / "one.drawio"))], {})
+    assert not result.ok and "IsADirectoryError" in result.error
+
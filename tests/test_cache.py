@@ -0,0 +1,79 @@
+import os
+import subprocess
+import sys
+import time
+from mermaid_to_drawio.cache import ConversionCache
+
+OPTIONS = {"theme": {"node": {"fillColor": "#fff"}}, "layout": "layered", "layout_options": {}}
+
+def test_key_covers_source_and_options(tmp_path, monkeypatch):
+    cache = ConversionCache(str(tmp_path))
+    key = cache.key(b"A --> B", OPTIONS)
+
+    assert key == cache.key(b"A --> B", dict(OPTIONS))
+    assert key != cache.key(b"A --> C", OPTIONS)
+    assert key != cache.key(b"A --> B", dict(OPTIONS, layout="grid"))
+    assert key != cache.key(b"A --> B", dict(OPTIONS, layout_options={"x_gap": 300}))
+
+    from mermaid_to_drawio import cache as cache_module
+    monkeypatch.setattr(cache_module, "__version__", "99.0")
+    assert key != cache.key(b"A --> B", OPTIONS)
+    monkeypatch.undo()
+    monkeypatch.setattr(cache_module, "CACHE_FORMAT", cache_module.CACHE_FORMAT + 1)
+    assert key != cache.key(b"A --> B", OPTIONS)
+
+def test_key_covers_resolved_layout_spacing(tmp_path, monkeypatch):
+    from mermaid_to_drawio import layout_defaults
+    from mermaid_to_drawio.layout_manager import LayoutManager
+
+    cache = ConversionCache(str(tmp_path))
+    key = cache.key(b"A --> B", OPTIONS)
+    layout = LayoutManager()
+    spelled_out = {name: getattr(layout, name) for name in layout_defaults.LAYOUT_DEFAULTS}
+    assert key == cache.key(b"A --> B", dict(OPTIONS, layout_options=spelled_out))
+
+    monkeypatch.setitem(layout_defaults.LAYOUT_DEFAULTS, "rank_sep", 90)
+    assert key != cache.key(b"A --> B", OPTIONS)
+
+def test_get_and_put(tmp_path):
+    cache = ConversionCache(str(tmp_path / "cache"))
+    output = tmp_path / "out.drawio"
+    output.write_text("<mxfile/>")
+
+    assert cache.get("ab" * 32, str(tmp_path / "copy.drawio")) is False
+    cache.put("ab" * 32, str(output))
+    assert cache.get("ab" * 32, str(tmp_path / "copy.drawio")) is True
+    assert (tmp_path / "copy.drawio").read_text() == "<mxfile/>"
+
+def test_evict_by_age_and_size(tmp_path):
+    cache = ConversionCache(str(tmp_path / "cache"), max_bytes=250, max_age=3600)
+    output = tmp_path / "out.drawio"
+    output.write_text("x" * 100)
+    keys = [f"{i:02d}" * 32 for i in range(4)]
+    for i, key in enumerate(keys):
+        cache.put(key, str(output))
+        path = cache._path(key)
+        os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+    stale = cache._path(keys[0])
+    os.utime(stale, (time.time() - 7200, time.time() - 7200))
+
+    assert cache.evict() == 2
+    assert [os.path.exists(cache._path(key)) for key in keys] == [False, False, True, True]
+
+def test_cache_hit_skips_conversion_imports(tmp_path):
+    source = tmp_path / "diagram.mmd"
+    source.write_text("graph TD\nA[Start] --> B[End]\n")
+    script = (
+        "import sys\n"
+        "from mermaid_to_drawio.cli import main\n"
+        f"code = main([{str(source)!r}, '--cache-dir', {str(tmp_path / 'cache')!r}])\n"
+        "print(code, 'mermaid_to_drawio.layout_manager' in sys.modules, 'xml.etree.ElementTree' in sys.modules)\n"
+    )
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    run = lambda: subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=env).stdout.split()
+
+    assert run() == ["0", "True", "True"]
+    first = (tmp_path / "diagram.drawio").read_text()
+    (tmp_path / "diagram.drawio").unlink()
+    assert run() == ["0", "False", "False"]
+    assert (tmp_path / "diagram.drawio").read_text() == first
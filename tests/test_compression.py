@@ -0,0 +1,44 @@
+import base64
+import io
+import xml.etree.ElementTree as ET
+import zlib
+from urllib.parse import unquote
+from mermaid_to_drawio.compression import compress, decompress, read_pages
+from mermaid_to_drawio.converter import MermaidToDrawIOConverter
+
+MMD = """graph TD
+subgraph Backend
+    A[Start] -- "Go & see" --> B{Check <it>}
+end
+B --> C((Done))
+"""
+
+def _write(compact=False, compress=False):
+    converter = MermaidToDrawIOConverter(layout="layered")
+    converter.parse_text(MMD)
+    out = io.StringIO()
+    converter.write(out, compact=compact, compress=compress)
+    return out.getvalue()
+
+def test_payload_format():
+    # Same steps as draw.io: encodeURIComponent, deflateRaw, base64
+    text = '<mxGraphModel><root><mxCell id="0" value="ä (x)!"/></root></mxGraphModel>'
+    payload = compress(text)
+    raw = zlib.decompress(base64.b64decode(payload), -zlib.MAX_WBITS).decode("ascii")
+    assert "%C3%A4%20(x)!" in raw
+    assert unquote(raw) == text
+    assert decompress(payload) == text
+
+def test_compressed_output_round_trip():
+    plain = _write(compact=True)
+    compressed = _write(compress=True)
+    assert "<mxCell" not in compressed
+    assert len(compressed) < len(plain)
+
+    diagram = ET.fromstring(compressed).find("diagram")
+    assert decompress(diagram.text) == ET.tostring(ET.fromstring(plain).find("diagram/mxGraphModel"), encoding="unicode")
+
+    (name, model), = read_pages(io.StringIO(compressed))
+    (_, expected), = read_pages(io.StringIO(_write()))
+    assert name == "Mermaid Diagram"
+    assert [c.attrib for c in model.iter("mxCell")] == [c.attrib for c in expected.iter("mxCell")]
@@ -1,7 +1,7 @@
 # test_converter.py
 import pytest
 import os
-from mermaid_to_drawio.converter_1 import MermaidToDrawIOConverter
+from mermaid_to_drawio.converter import MermaidToDrawIOConverter
 from mermaid_to_drawio.layout_manager import LayoutManager
 
 SAMPLE_MMD = """
@@ -24,25 +24,28 @@ def test_group_nesting(tmp_path):
     converter = MermaidToDrawIOConverter(str(file))
     converter.parse_mermaid()
     
+    graph = converter.graph
+
     # Verify groups
-    assert len(converter.groups) == 2
-    outer_name = next(v[0] for v in converter.groups.values() if v[0] == "Outer")
-    inner_name = next(v[0] for v in converter.groups.values() if v[0] == "Inner")
-    assert outer_name and inner_name
-    
+    assert len(graph.groups) == 2
+    outer = next(g for g in graph.groups.values() if g.name == "Outer")
+    inner = next(g for g in graph.groups.values() if g.name == "Inner")
+    assert inner.parent == outer.id and outer.parent is None
+    assert outer.children == [inner.id]
+
     # Verify node-group mapping
-    assert converter.node_to_group["A"] in converter.groups
-    assert converter.node_to_group["B"] in converter.groups
-    
+    assert graph.nodes["A"].group == inner.id
+    assert graph.nodes["B"].group == outer.id
+
     # Verify styles
-    assert "fill=#ff0000" in converter.styles["A"]
-    assert "stroke=#000000" in converter.styles["A"]
-    assert "strokeWidth=2" in converter.styles["A"]
-    assert "fill=#00ff00" in converter.styles["B"]
-    
+    assert "fill=#ff0000" in graph.nodes["A"].style
+    assert "stroke=#000000" in graph.nodes["A"].style
+    assert "strokeWidth=2" in graph.nodes["A"].style
+    assert "fill=#00ff00" in graph.nodes["B"].style
+
     # Verify edge style
-    assert "stroke=#0000ff" in converter.edge_styles[0]
-    assert "strokeWidth=3" in converter.edge_styles[0]
+    assert "stroke=#0000ff" in graph.link_styles[0]
+    assert "strokeWidth=3" in graph.link_styles[0]
 
 def test_build_and_save(tmp_path):
     file = tmp_path / "test.mmd"
@@ -64,9 +67,8 @@ def test_theme_application():
         "node": {"fillColor": "#123456", "strokeColor": "#789abc", "strokeWidth": "3"},
         "edge": {"strokeColor": "#def012", "strokeWidth": "4"}
     })
-    converter.nodes = {"A": "Test Node"}
-    converter.shape_styles = {"A": "shape=rectangle"}
-    converter._create_node("A", "Test Node", None)
+    node = converter.graph.add_node("A", "Test Node", "rectangle")
+    converter._create_node(node)
     
     # Verify theme styles
     root = converter.root
@@ -77,3 +79,261 @@ def test_theme_application():
     assert "strokeColor=#789abc" in style
     assert "strokeWidth=3" in style
 
+
+def test_chained_edges_and_inline_nodes(tmp_path):
+    file = tmp_path / "chain.mmd"
+    file.write_text("graph TD\nsubgraph G\n    A[Start] -- Go --> B{Check} --> C\nend\n")
+
+    converter = MermaidToDrawIOConverter(str(file))
+    converter.parse_mermaid()
+
+    graph = converter.graph
+    assert {n.id: n.label for n in graph.nodes.values()} == {"A": "Start", "B": "Check", "C": "C"}
+    assert graph.nodes["B"].shape == "rhombus"
+    assert [(e.source, e.target, e.label, e.index) for e in graph.edges] == [("A", "B", "Go", 0), ("B", "C", "", 1)]
+    assert {n.group for n in graph.nodes.values()} == set(graph.groups)
+
+def test_parse_text_and_stream():
+    from_text = MermaidToDrawIOConverter()
+    from_text.parse_text(SAMPLE_MMD)
+
+    from_stream = MermaidToDrawIOConverter()
+    from_stream.parse_stream(line for line in SAMPLE_MMD.splitlines())
+
+    for converter in (from_text, from_stream):
+        assert {n.id: n.label for n in converter.graph.nodes.values()} == {"A": "Node A", "B": "Node B"}
+        assert [(e.source, e.target, e.label, e.index) for e in converter.graph.edges] == [("A", "B", "", 0)]
+    assert from_text.output_file is None
+
+def test_main_reads_stdin(monkeypatch, capsys):
+    import io
+    import sys
+    from mermaid_to_drawio.converter import main
+
+    monkeypatch.setattr(sys, "argv", ["mermaid2drawio", "-"])
+    monkeypatch.setattr(sys, "stdin", io.StringIO("A[Start] --> B[End]\n"))
+    main()
+
+    out = capsys.readouterr().out
+    assert out.startswith("<?xml")
+    assert 'value="Start"' in out and 'value="End"' in out
+
+def test_direction_drives_layered_layout():
+    converter = MermaidToDrawIOConverter(layout="layered")
+    converter.parse_text("graph LR\nC --> D\nsubgraph G\n    direction TB\n    A --> B\nend\n")
+
+    assert converter.direction == "LR"
+    (ax, ay), (bx, by), (cx, cy), (dx, dy) = (converter.layout_manager.get_position(n) for n in "ABCD")
+    assert cx < dx and cy == dy
+    assert ax == bx and ay < by
+
+def test_output_is_reproducible():
+    import io
+
+    def convert():
+        converter = MermaidToDrawIOConverter()
+        converter.parse_text(SAMPLE_MMD)
+        out = io.StringIO()
+        converter.write(out)
+        return out.getvalue()
+
+    first = convert()
+    assert first == convert()
+    assert 'id="group-1"' in first and 'id="edge-1"' in first
+
+def _cells(converter):
+    import io
+    import xml.etree.ElementTree as ET
+
+    out = io.StringIO()
+    converter.write(out)
+    cells = set()
+    for cell in ET.fromstring(out.getvalue()).iter("mxCell"):
+        attrib = dict(cell.attrib)
+        if attrib.get("edge"):
+            attrib.pop("id")  # edge ids are allocated in creation order
+        geometry = cell.find("mxGeometry")
+        cells.add((tuple(sorted(attrib.items())), tuple(sorted(geometry.attrib.items())) if geometry is not None else ()))
+    return cells
+
+def test_update_patches_only_changed_cells():
+    converter = MermaidToDrawIOConverter(layout="layered")
+    converter.parse_text(SAMPLE_MMD)
+    converter.build()
+    node_b = converter.root.find(".//mxCell[@id='B']")
+
+    edited = SAMPLE_MMD.replace("A[Node A]", "A[Renamed]")
+    assert converter.update(edited) == {"A"}
+    assert converter.root.find(".//mxCell[@id='B']") is node_b
+
+    reference = MermaidToDrawIOConverter(layout="layered")
+    reference.parse_text(edited)
+    assert _cells(converter) == _cells(reference)
+
+def test_update_matches_full_conversion():
+    edits = [
+        (SAMPLE_MMD, SAMPLE_MMD + "B --> C[New]\n"),
+        (SAMPLE_MMD, SAMPLE_MMD.replace("    B[Node B]\n", "")),
+        (SAMPLE_MMD, SAMPLE_MMD.replace("linkStyle 0 stroke:blue", "linkStyle 0 stroke:red")),
+        (SAMPLE_MMD, SAMPLE_MMD.replace("A --> B", "subgraph Extra\n    D --> A\nend\nA --> B")),
+        (SAMPLE_MMD, "graph LR\n" + SAMPLE_MMD),
+        # Reordered statements
+        ("A --> B\n", "C --> B\nA --> B\n"),
+        ("A --> B\n", "B --> A\n"),
+        ("A --> B\nA --> C\nC --> D\n", "A --> C\nA --> B\nC --> D\n"),
+        ("subgraph X\n    A\nend\nsubgraph Y\n    B\nend\nA --> B\n",
+         "subgraph Y\n    B\nend\nsubgraph X\n    A\nend\nA --> B\n"),
+        ("subgraph G\n    A --> B\n    C\nend\n", "subgraph G\n    C --> B\n    A\nend\n"),
+    ]
+    for layout in ("layered", "grid"):
+        for source, edited in edits:
+            converter = MermaidToDrawIOConverter(layout=layout)
+            converter.parse_text(source)
+            converter.build()
+            converter.update(edited)
+
+            reference = MermaidToDrawIOConverter(layout=layout)
+            reference.parse_text(edited)
+            assert _cells(converter) == _cells(reference), (layout, edited)
+
+def test_identical_styles_are_shared():
+    converter = MermaidToDrawIOConverter()
+    converter.parse_text("A --> B\nC --> D\nstyle A fill:red\nstyle C fill:red\n")
+    converter.build()
+    style = lambda node_id: converter.root.find(f".//mxCell[@id='{node_id}']").get("style")
+    assert style("A") is style("C")
+    assert style("B") is style("D")
+    assert style("A") != style("B")
+
+def test_style_before_node_declaration():
+    converter = MermaidToDrawIOConverter()
+    converter.parse_text("style A fill:red\nA --> B\n")
+    assert converter.graph.nodes["A"].style == "fill=#ff0000"
+    assert converter.graph.nodes["B"].style is None
+
+def test_child_geometry_is_relative_to_parent():
+    converter = MermaidToDrawIOConverter(layout="layered")
+    converter.parse_text(SAMPLE_MMD)
+    converter.build()
+    graph, layout = converter.graph, converter.layout_manager
+    cells = {cell.get("id"): cell for cell in converter.root}
+
+    def geometry(cell_id):
+        return [int(cells[cell_id].find("mxGeometry").get(k)) for k in ("x", "y")]
+
+    outer = next(g for g in graph.groups.values() if g.name == "Outer")
+    inner = next(g for g in graph.groups.values() if g.name == "Inner")
+    outer_box, inner_box = layout.get_group_bbox(outer.id), layout.get_group_bbox(inner.id)
+    assert geometry(outer.id) == outer_box[:2]
+    assert geometry(inner.id) == [inner_box[0] - outer_box[0], inner_box[1] - outer_box[1]]
+    ax, ay = layout.get_position("A")
+    assert geometry("A") == [ax - inner_box[0], ay - inner_box[1]]
+
+    # Containers precede their contents, also after an update adds a parent
+    converter.update("subgraph Wrapper\n" + SAMPLE_MMD + "end\n")
+    order = [cell.get("id") for cell in converter.root]
+    for cell in converter.root:
+        if cell.get("parent") not in (None, "0", "1"):
+            assert order.index(cell.get("parent")) < order.index(cell.get("id"))
+
+def test_nodes_are_sized_to_their_labels():
+    for layout in ("grid", "layered"):
+        converter = MermaidToDrawIOConverter(layout=layout)
+        converter.parse_text("graph TD\nsubgraph G\nA[Go] --> B[Validate every header of the incoming request]\nend\n")
+        converter.build()
+        cells = {cell.get("id"): cell for cell in converter.root}
+        size = lambda cell_id: [int(cells[cell_id].find("mxGeometry").get(k)) for k in ("width", "height")]
+        assert size("A")[0] < 180 and size("B")[0] > size("A")[0] and size("B")[1] > size("A")[1]
+        assert "whiteSpace=wrap" in cells["A"].get("style")
+
+        # The group is laid out around the real boxes
+        group = converter.layout_manager.get_group_bbox(next(iter(converter.graph.groups)))
+        for node_id in "AB":
+            x, y = converter.layout_manager.get_position(node_id)
+            assert group[0] <= x and x + size(node_id)[0] <= group[0] + group[2]
+            assert group[1] <= y and y + size(node_id)[1] <= group[1] + group[3]
+
+    converter.update("graph TD\nsubgraph G\nA[Go] --> B[Short]\nend\n")
+    assert converter.layout_manager.get_size("B") == converter.layout_manager.get_size("A")
+
+    fixed = MermaidToDrawIOConverter(sizing="fixed")
+    fixed.parse_text("A[Go] --> B[Validate every header of the incoming request]\n")
+    fixed.build()
+    assert {cell.find("mxGeometry").get("width") for cell in fixed.root if cell.get("vertex")} == {"180"}
+
+def test_class_definitions():
+    converter = MermaidToDrawIOConverter()
+    converter.parse_text(
+        "class A,B hot\n"
+        "A --> B:::cold --> C:::hot --> D\n"
+        "classDef hot fill:#f96,stroke:#333\n"
+        "classDef cold,frozen fill:#00f\n"
+        "style C fill:#0f0\n"
+        "classDef default stroke:#999\n"
+    )
+    graph = converter.graph
+    assert graph.nodes["B"].classes == ("hot", "cold")
+    assert graph.class_defs == {"hot": "fill=#f96;stroke=#333", "cold": "fill=#00f",
+                                "frozen": "fill=#00f", "default": "stroke=#999"}
+    converter.build()
+    style = lambda node_id: converter.root.find(f".//mxCell[@id='{node_id}']").get("style")
+    # Later classes and the node's own style take precedence
+    assert style("A").endswith(";fill=#f96;stroke=#333")
+    assert style("B").endswith(";fill=#f96;stroke=#333;fill=#00f")
+    assert style("C").endswith(";fill=#f96;stroke=#333;fill=#0f0")
+    assert style("D").endswith(";stroke=#999")
+    # Nodes of one class share one style string
+    converter.parse_text("E:::hot\n")
+    assert converter._node_style(graph.nodes["E"]) is style("A")
+
+def test_class_font_size_sizes_the_node():
+    converter = MermaidToDrawIOConverter()
+    converter.parse_text("A[Label] --> B[Label]\nclass B big\nclassDef big font-size:36px\n")
+    size = converter.layout_manager.get_size
+    assert size("B")[0] > size("A")[0] and size("B")[1] > size("A")[1]
+
+def test_link_style_default_and_lists():
+    converter = MermaidToDrawIOConverter()
+    converter.parse_text("A --> B --> C --> D\nlinkStyle default stroke:red\nlinkStyle 0,2 stroke:blue\n")
+    converter.build()
+    styles = [cell.get("style") for cell in converter.root if cell.get("edge")]
+    assert [style.endswith(";stroke=#0000ff") for style in styles] == [True, False, True]
+    assert styles[1].endswith(";stroke=#ff0000")
+
+def test_update_restyles_nodes_of_a_changed_class():
+    source = "A:::hot --> B\nC --> D\nclassDef hot fill:red\nlinkStyle default stroke:red\n"
+    converter = MermaidToDrawIOConverter(layout="layered")
+    converter.parse_text(source)
+    converter.build()
+
+    edited = source.replace("classDef hot fill:red", "classDef hot fill:blue").replace("stroke:red", "stroke:blue")
+    changed = converter.update(edited)
+    assert {"A", "B", "C", "D"} & changed == {"A"}
+    reference = MermaidToDrawIOConverter(layout="layered")
+    reference.parse_text(edited)
+    assert _cells(converter) == _cells(reference)
+
+def test_update_keeps_id_allocator_settings():
+    from mermaid_to_drawio.ids import HashIdAllocator
+
+    converter = MermaidToDrawIOConverter(layout="layered", id_allocator=HashIdAllocator(6))
+    converter.parse_text(SAMPLE_MMD)
+    converter.build()
+    ids = [cell.get("id") for cell in converter.root]
+    assert converter.update(SAMPLE_MMD) == set()
+    assert [cell.get("id") for cell in converter.root] == ids
+    assert {len(cell_id) for cell_id in ids if cell_id.startswith(("group-", "edge-"))} == {len("group-") + 6,
+                                                                                           len("edge-") + 6}
+
+def test_incremental_parse_primes_update(monkeypatch):
+    import mermaid_to_drawio.converter as converter_module
+
+    converter = MermaidToDrawIOConverter(layout="layered")
+    converter.parse_text(SAMPLE_MMD, incremental=True)
+    converter.build()
+    tokenized = []
+    tokenize = converter_module.tokenize
+    monkeypatch.setattr(converter_module, "tokenize", lambda line: tokenized.append(line) or tokenize(line))
+    converter.update(SAMPLE_MMD + "B --> C\n")
+    assert tokenized == ["B --> C"]
+
@@ -0,0 +1,42 @@
+import pytest
+from mermaid_to_drawio.graph import Graph, Node
+
+
+def test_nodes_are_slotted_and_looked_up_by_id():
+    graph = Graph()
+    node = graph.add_node("A", "Start", "rounded")
+    assert graph.add_node("A") is node
+    assert graph.nodes["A"].label == "Start"
+    assert graph.add_node("B").label == "B"
+    with pytest.raises(AttributeError):
+        Node("C").extra = 1
+
+def test_adjacency_follows_edges():
+    graph = Graph()
+    for node_id in "ABC":
+        graph.add_node(node_id)
+    graph.add_edge("A", "B")
+    graph.add_edge("A", "C")
+    graph.add_edge("C", "C")
+    graph.add_edge("C", "missing")
+    assert graph.adjacency() == (["A", "B", "C"], [[1, 2], [], []])
+    assert graph.adjacency() is graph.adjacency()
+
+    graph.remove_edge("A", "B")
+    assert graph.adjacency() == (["A", "B", "C"], [[2], [], []])
+
+def test_group_tree():
+    graph = Graph()
+    graph.add_group("outer", "Outer")
+    graph.add_group("inner", "Inner", "outer")
+    graph.add_group("other")
+    assert graph.top_groups == ["outer", "other"]
+    assert graph.child_groups("outer") == ["inner"]
+
+    graph.add_group("inner", parent_id="other")
+    assert graph.child_groups("outer") == []
+    assert graph.groups["inner"].parent == "other"
+
+    graph.remove_group("other")
+    assert graph.top_groups == ["outer", "inner"]
+    assert graph.groups["inner"].parent is None
@@ -0,0 +1,17 @@
+from mermaid_to_drawio.ids import CounterIdAllocator, HashIdAllocator, UuidIdAllocator
+
+def test_counter_ids_per_kind():
+    ids = CounterIdAllocator()
+    assert [ids.allocate("group"), ids.allocate("edge"), ids.allocate("group")] == ["group-1", "edge-1", "group-2"]
+
+def test_hash_ids_are_stable_and_unique():
+    first, second = HashIdAllocator(), HashIdAllocator()
+    a = first.allocate("group", ("Outer", "Inner"))
+    assert a == second.allocate("group", ("Outer", "Inner"))
+    assert a != first.allocate("group", ("Other", "Inner"))
+    # Same path twice (e.g. two subgraphs with the same title) still gets distinct ids
+    assert first.allocate("group", ("Outer", "Inner")) == a + "-2"
+
+def test_generated_ids_cannot_be_node_ids():
+    for allocator in (CounterIdAllocator(), HashIdAllocator(), UuidIdAllocator()):
+        assert "-" in allocator.allocate("edge", ("A", "B", "0"))
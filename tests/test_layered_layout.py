@@ -0,0 +1,43 @@
+from mermaid_to_drawio.layered_layout import layered_layout
+
+DIAMOND = [("A", "B"), ("A", "C"), ("B", "D"), ("C", "D")]
+
+def _overlaps(positions, size=(180, 60)):
+    boxes = list(positions.values())
+    for i, (x1, y1) in enumerate(boxes):
+        for x2, y2 in boxes[i + 1:]:
+            if abs(x1 - x2) < size[0] and abs(y1 - y2) < size[1]:
+                return True
+    return False
+
+def test_layers_follow_edges_top_down():
+    positions, (width, height) = layered_layout(list("ABCD"), DIAMOND)
+    ys = {n: positions[n][1] for n in "ABCD"}
+    assert ys["A"] < ys["B"] == ys["C"] < ys["D"]
+    assert not _overlaps(positions)
+    assert height == ys["D"] + 60
+
+def test_directions():
+    lr, _ = layered_layout(list("ABCD"), DIAMOND, direction="LR")
+    assert lr["A"][0] < lr["B"][0] < lr["D"][0]
+    assert lr["B"][1] != lr["C"][1]
+
+    bt, _ = layered_layout(list("ABCD"), DIAMOND, direction="BT")
+    assert bt["A"][1] > bt["B"][1] > bt["D"][1]
+
+    rl, _ = layered_layout(list("ABCD"), DIAMOND, direction="RL")
+    assert rl["A"][0] > rl["B"][0] > rl["D"][0]
+
+def test_cycles_and_self_loops():
+    positions, _ = layered_layout(list("ABC"), [("A", "B"), ("B", "C"), ("C", "A"), ("B", "B")])
+    assert len({y for _, y in positions.values()}) == 3
+    assert not _overlaps(positions)
+
+def test_barycenter_removes_crossing():
+    # Without reordering, B->D and C->E would cross
+    edges = [("A", "B"), ("A", "C"), ("B", "E"), ("C", "D")]
+    positions, _ = layered_layout(list("ABCDE"), edges)
+    assert (positions["B"][0] < positions["C"][0]) == (positions["E"][0] < positions["D"][0])
+
+def test_empty_graph():
+    assert layered_layout([], []) == ({}, (0, 0))
@@ -1,5 +1,5 @@
 import pytest
-from mermaid_to_drawio.layout_manager import LayoutManager
+from mermaid_to_drawio.layout_manager import GROUP_HEADER, GROUP_PADDING, NODE_HEIGHT, NODE_WIDTH, LayoutManager
 
 def test_node_positioning():
     layout = LayoutManager()
@@ -17,16 +17,156 @@ def test_node_positioning():
 
 def test_group_bbox():
     layout = LayoutManager()
-    layout.add_node_to_group("G1", "A", 100, 100, 180, 60)
-    layout.add_node_to_group("G1", "B", 200, 200, 180, 60)
-    layout.add_node_to_group("G1", "C", 150, 300, 180, 60)
-    
+    layout.add_group("G1")
+    for node in "ABC":
+        layout.assign_node(node, "G1")
+        layout.add_node(node)
+
     bbox = layout.get_group_bbox("G1")
-    assert bbox == [80, 80, 220, 260]  # With padding
+    assert bbox == list(layout.graph.groups["G1"].bbox)
+    positions = [layout.get_position(node) for node in "ABC"]
+    # The members plus padding, and room for the swimlane title
+    assert bbox[:2] == [min(x for x, _ in positions) - GROUP_PADDING,
+                        min(y for _, y in positions) - GROUP_PADDING - GROUP_HEADER]
+    assert bbox[0] + bbox[2] == max(x for x, _ in positions) + NODE_WIDTH + GROUP_PADDING
+    assert bbox[1] + bbox[3] == max(y for _, y in positions) + NODE_HEIGHT + GROUP_PADDING
+    assert layout.get_group_bbox("missing") is None
 
 def test_group_with_single_node():
     layout = LayoutManager()
-    layout.add_node_to_group("G1", "A", 100, 100, 180, 60)
-    bbox = layout.get_group_bbox("G1")
-    assert bbox == [80, 80, 140, 100]  # (100-20, 100-20, 180+40, 60+40)
+    layout.add_group("G1")
+    layout.assign_node("A", "G1")
+    layout.add_node("A")
+    x, y = layout.get_position("A")
+    assert layout.get_group_bbox("G1") == [x - GROUP_PADDING, y - GROUP_PADDING - GROUP_HEADER,
+                                           NODE_WIDTH + 2 * GROUP_PADDING,
+                                           NODE_HEIGHT + 2 * GROUP_PADDING + GROUP_HEADER]
+
+def test_layered_engine():
+    layout = LayoutManager(engine="layered", direction="LR")
+    for node in "ABC":
+        layout.add_node(node)
+    layout.add_edge("A", "B")
+    layout.add_edge("B", "C")
+
+    xs = [layout.get_position(node)[0] for node in "ABC"]
+    ys = {layout.get_position(node)[1] for node in "ABC"}
+    assert xs[0] == 60 and xs[0] < xs[1] < xs[2]
+    assert ys == {60}
+
+def _contains(outer, inner):
+    return (outer[0] <= inner[0] and outer[1] <= inner[1]
+            and inner[0] + inner[2] <= outer[0] + outer[2]
+            and inner[1] + inner[3] <= outer[1] + outer[3])
+
+def _disjoint(a, b):
+    return (a[0] + a[2] <= b[0] or b[0] + b[2] <= a[0]
+            or a[1] + a[3] <= b[1] or b[1] + b[3] <= a[1])
+
+def _compound_layout(engine):
+    layout = LayoutManager(engine=engine)
+    layout.add_group("outer")
+    layout.add_group("inner", "outer")
+    layout.add_group("sibling")
+    for node, group in [("A", "inner"), ("B", "outer"), ("C", "sibling"), ("D", None)]:
+        if group:
+            layout.assign_node(node, group)
+        layout.add_node(node)
+    layout.add_edge("A", "B")
+    layout.add_edge("B", "C")
+    layout.add_edge("C", "D")
+    return layout
+
+def test_compound_layout_packs_groups():
+    for engine in ("grid", "layered"):
+        layout = _compound_layout(engine)
+        outer, inner, sibling = (layout.get_group_bbox(g) for g in ("outer", "inner", "sibling"))
+
+        assert _contains(outer, inner)
+        assert _disjoint(outer, sibling)
+        for node, group in [("A", inner), ("B", outer), ("C", sibling)]:
+            x, y = layout.get_position(node)
+            assert _contains(group, [x, y, 180, 60])
+        x, y = layout.get_position("B")
+        assert _disjoint(inner, [x, y, 180, 60])
+
+def test_compound_layout_reuses_clean_blocks(monkeypatch):
+    from mermaid_to_drawio import layout_manager
+
+    layout = _compound_layout("layered")
+    layout.layout()
+
+    calls = []
+    engine = layout_manager.LAYOUT_ENGINES["layered"]
+    monkeypatch.setitem(layout_manager.LAYOUT_ENGINES, "layered",
+                        lambda nodes, *args, **kwargs: calls.append(list(nodes)) or engine(nodes, *args, **kwargs))
+
+    layout.assign_node("E", "sibling")
+    layout.add_node("E")
+    layout.layout()
+
+    # Only the changed group and the top level are laid out again
+    assert len(calls) == 2
+    assert sorted(calls[0]) == ["C", "E"]
+    assert _contains(layout.get_group_bbox("sibling"), list(layout.get_position("E")) + [180, 60])
+
+def test_connected_components():
+    from mermaid_to_drawio.layout_manager import connected_components
+
+    succ = [[3], [], [1], [], [4], [2]]
+    assert connected_components(6, succ) == [[0, 3], [1, 2, 5], [4]]
+    assert connected_components(0, []) == []
+
+def test_pack_boxes_does_not_overlap():
+    from mermaid_to_drawio.layout_manager import pack_boxes
+
+    boxes = [(180, 60), (400, 300), (180, 60), (220, 140), (600, 60)]
+    offsets, (width, height) = pack_boxes(boxes)
+    rects = [[x, y, w, h] for (x, y), (w, h) in zip(offsets, boxes)]
+    for i, a in enumerate(rects):
+        assert _contains([0, 0, width, height], a)
+        assert all(_disjoint(a, b) for b in rects[i + 1:])
+
+def _components_layout(direction, workers=1):
+    layout = LayoutManager(engine="layered", direction=direction, workers=workers)
+    for node in "ABCDEFG":
+        layout.add_node(node)
+    for src, tgt in [("A", "B"), ("B", "C"), ("D", "E"), ("F", "E")]:
+        layout.add_edge(src, tgt)
+    layout.layout()
+    return {node: layout.get_position(node) for node in "ABCDEFG"}
+
+def test_components_are_laid_out_separately_and_packed(monkeypatch):
+    from mermaid_to_drawio import layout_manager
+
+    for direction in ("TD", "LR"):
+        positions = _components_layout(direction)
+        boxes = [list(position) + [180, 60] for position in positions.values()]
+        for i, a in enumerate(boxes):
+            assert all(_disjoint(a, b) for b in boxes[i + 1:])
+        # Each chain keeps its own layering
+        flow = 1 if direction == "TD" else 0
+        assert positions["A"][flow] < positions["B"][flow] < positions["C"][flow]
+        assert positions["D"][flow] == positions["F"][flow] < positions["E"][flow]
+
+        # The process pool gives the same result
+        monkeypatch.setattr(layout_manager, "PARALLEL_THRESHOLD", 0)
+        assert _components_layout(direction, workers=2) == positions
+        monkeypatch.undo()
+
+def test_grid_slots_return_when_sizes_are_reset():
+    layout = LayoutManager()
+    for node in "AB":
+        layout.add_node(node)
+    slots = [layout.get_position(node) for node in "AB"]
+
+    layout.set_size("A", 400, 200)
+    assert layout.get_position("B") != slots[1]
+    layout.set_size("A", None, None)
+    assert [layout.get_position(node) for node in "AB"] == slots
+
+    layout.set_size("B", 400, 200)
+    layout.remove_node("B")
+    layout.add_node("C")
+    assert [layout.get_position(node) for node in "AC"] == slots
 
@@ -0,0 +1,74 @@
+import io
+import xml.etree.ElementTree as ET
+from mermaid_to_drawio.cli import main
+from mermaid_to_drawio.markdown import extract_blocks, write_document
+
+DOC = """# Architecture
+
+Some text.
+
+```mermaid
+graph TD
+A[Client] --> B[Server]
+```
+
+## Storage
+
+~~~mermaid
+graph LR
+B --> C[(Database)]
+~~~
+
+```python
+# Not a heading
+print("graph TD")
+```
+
+````mermaid
+graph TD
+X --> Y
+````
+
+## Storage
+
+```mermaid
+graph TD
+P --> Q
+```
+"""
+
+def test_extract_blocks():
+    blocks = extract_blocks(DOC.splitlines())
+    assert [b.name for b in blocks] == ["Architecture", "Storage", "Storage (2)", "Storage (3)"]
+    assert blocks[0].source == "graph TD\nA[Client] --> B[Server]\n"
+    assert blocks[0].line == 6
+    assert blocks[2].source == "graph TD\nX --> Y\n"
+
+def test_extract_blocks_without_headings():
+    blocks = extract_blocks(["```mermaid", "graph TD", "A --> B", "```", "```Mermaid", "graph TD", "```"])
+    assert [b.name for b in blocks] == ["Diagram 1", "Diagram 2"]
+
+def test_write_document_pages():
+    buffer = io.StringIO()
+    write_document(extract_blocks(DOC.splitlines()), buffer, {"layout": "layered"})
+    root = ET.fromstring(buffer.getvalue().split("\n", 1)[1])
+    pages = root.findall("diagram")
+    assert [page.get("name") for page in pages] == ["Architecture", "Storage", "Storage (2)", "Storage (3)"]
+    assert len(pages[1].findall(".//mxCell[@vertex='1']")) == 2
+
+def test_parallel_pages_match_serial():
+    blocks = extract_blocks(DOC.splitlines())
+    serial, parallel = io.StringIO(), io.StringIO()
+    write_document(blocks, serial, {"layout": "layered", "compact": True})
+    write_document(blocks, parallel, {"layout": "layered", "compact": True}, workers=2)
+    assert parallel.getvalue() == serial.getvalue()
+
+def test_main_markdown(tmp_path):
+    (tmp_path / "design.md").write_text(DOC)
+    (tmp_path / "empty.md").write_text("# Nothing here\n")
+    assert main([str(tmp_path / "design.md"), "--no-cache"]) == 0
+    root = ET.parse(tmp_path / "design.drawio").getroot()
+    assert len(root.findall("diagram")) == 4
+
+    assert main([str(tmp_path), "--markdown", "--out-dir", str(tmp_path / "out"), "--no-cache"]) == 1
+    assert (tmp_path / "out" / "design.drawio").exists()
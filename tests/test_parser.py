@@ -0,0 +1,62 @@
+from mermaid_to_drawio.parser import tokenize, Token, NodeRef, Link, CHAIN, HEADER, SUBGRAPH, END, STYLE, LINK_STYLE, CLASS_DEF, CLASS
+
+def test_keyword_statements():
+    assert tokenize("graph TD") == Token(HEADER, "TD")
+    assert tokenize("  subgraph Sample Group") == Token(SUBGRAPH, "Sample Group")
+    assert tokenize("end") == Token(END, None)
+    assert tokenize("style A fill:red") == Token(STYLE, ("A", "fill:red"))
+    assert tokenize("linkStyle 2 stroke:blue") == Token(LINK_STYLE, ((2,), "stroke:blue"))
+    assert tokenize("%% comment") is None
+    assert tokenize("") is None
+
+def test_node_shapes():
+    cases = [
+        ("A[Box]", "rectangle"),
+        ("A(Box)", "rounded"),
+        ("A((Box))", "ellipse"),
+        ("A>Box]", "parallelogram"),
+        ("A{Box}", "rhombus"),
+        ("A[[Box]]", "cylinder"),
+        ("A(((Box)))", "hexagon"),
+    ]
+    for line, shape in cases:
+        assert tokenize(line) == Token(CHAIN, ([NodeRef("A", "Box", shape)], []))
+
+def test_chained_edges_with_inline_nodes():
+    kind, (nodes, links) = tokenize('A[Foo] -- "Go" --> B{Bar} --> C <--> D;')
+    assert kind == CHAIN
+    assert nodes == [
+        NodeRef("A", "Foo", "rectangle"),
+        NodeRef("B", "Bar", "rhombus"),
+        NodeRef("C", None, None),
+        NodeRef("D", None, None),
+    ]
+    assert links == [Link("Go", False), Link("", False), Link("", True)]
+
+def test_pipe_label():
+    _, (nodes, links) = tokenize("A-->|yes|B")
+    assert [n.id for n in nodes] == ["A", "B"]
+    assert links == [Link("yes", False)]
+
+def test_unrecognized_line():
+    assert tokenize("A --> ") is None
+    assert tokenize("click A callback") is None
+
+def test_entity_codes_in_labels():
+    nodes, links = tokenize("A[Is it #91;ok#93;?] -->|a #124; b| B{#35;1}").value
+    assert nodes[0].label == "Is it [ok]?"
+    assert links[0].label == "a | b"
+    assert nodes[1].label == "#1"
+    assert tokenize("A[Item #1]").value[0][0].label == "Item #1"
+
+def test_classes_and_link_style_lists():
+    assert tokenize("classDef hot,warm fill:#f96,stroke-width:4px") == Token(CLASS_DEF, (["hot", "warm"], "fill:#f96,stroke-width:4px"))
+    assert tokenize("class A, B,C hot;") == Token(CLASS, (["A", "B", "C"], "hot"))
+    assert tokenize("linkStyle 0,3 , 4 stroke:red") == Token(LINK_STYLE, ((0, 3, 4), "stroke:red"))
+    assert tokenize("linkStyle default stroke:red") == Token(LINK_STYLE, (None, "stroke:red"))
+    # A node named "class" is still a node
+    assert tokenize("class --> B").kind == CHAIN
+
+    _, (nodes, links) = tokenize("A:::hot --> B[Box]:::cold --> C")
+    assert nodes == [NodeRef("A", None, None, "hot"), NodeRef("B", "Box", "rectangle", "cold"), NodeRef("C", None, None)]
+    assert len(links) == 2
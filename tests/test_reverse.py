@@ -0,0 +1,108 @@
+import io
+from mermaid_to_drawio.cli import reverse_main
+from mermaid_to_drawio.converter import MermaidToDrawIOConverter
+from mermaid_to_drawio.reverse import DrawioToMermaidConverter
+
+MMD = """graph LR
+subgraph Outer
+    subgraph Inner
+        A[Start here] --> B{Is it #91;ok#93;?}
+    end
+    B -->|yes #124; sure| C((Done))
+end
+B -- no --> D[[Store]]
+D --> E>Flag] --> F(((Hex)))
+G(Alone)
+style A fill:red,stroke:black,stroke-width:2px
+style C font-size:18px
+linkStyle 1 stroke:blue,stroke-width:3px
+"""
+
+NATIVE = """<mxfile><diagram name="Native"><mxGraphModel><root>
+<mxCell id="0"/><mxCell id="1" parent="0"/>
+<mxCell id="lane" value="Lane" style="swimlane;whiteSpace=wrap;" vertex="1" parent="1">
+  <mxGeometry x="0" y="0" width="400" height="300" as="geometry"/></mxCell>
+<UserObject label="First" link="https://example.com" id="node-1">
+  <mxCell style="ellipse;whiteSpace=wrap;html=1;fillColor=#dae8fc;" vertex="1" parent="lane">
+    <mxGeometry x="20" y="40" width="80" height="40" as="geometry"/></mxCell></UserObject>
+<mxCell id="grp" style="group" vertex="1" parent="lane">
+  <mxGeometry x="20" y="140" width="100" height="60" as="geometry"/></mxCell>
+<mxCell id="end" value="Second" style="rounded=1;whiteSpace=wrap;" vertex="1" parent="grp">
+  <mxGeometry x="0" y="0" width="80" height="40" as="geometry"/></mxCell>
+<mxCell id="e1" style="edgeStyle=orthogonalEdgeStyle;dashed=1;" edge="1" parent="1" source="node-1" target="end">
+  <mxGeometry relative="1" as="geometry"/></mxCell>
+<mxCell id="e1-label" value="next" style="edgeLabel;html=1;" vertex="1" connectable="0" parent="e1">
+  <mxGeometry x="-0.2" relative="1" as="geometry"/></mxCell>
+<mxCell id="e2" edge="1" parent="1" source="node-1">
+  <mxGeometry relative="1" as="geometry"/></mxCell>
+</root></mxGraphModel></diagram></mxfile>"""
+
+def _convert(text, compress=False):
+    converter = MermaidToDrawIOConverter(layout="layered")
+    converter.parse_text(text)
+    out = io.StringIO()
+    converter.write(out, compress=compress)
+    return converter, out.getvalue()
+
+def _summary(converter):
+    graph = converter.graph
+
+    def path(group_id):
+        names = []
+        while group_id is not None:
+            names.append(graph.groups[group_id].name)
+            group_id = graph.groups[group_id].parent
+        return tuple(reversed(names))
+
+    nodes = {node.id: (node.label, node.shape or "rectangle", node.style, path(node.group))
+             for node in graph.nodes.values()}
+    edges = [(edge.source, edge.target, edge.label, graph.link_styles.get(edge.index)) for edge in graph.edges]
+    return nodes, edges, converter.direction
+
+def test_round_trip():
+    for compress in (False, True):
+        original, drawio = _convert(MMD, compress)
+        reverse = DrawioToMermaidConverter()
+        reverse.parse_text(drawio)
+        mermaid = reverse.to_mermaid()
+        again, _ = _convert(mermaid)
+
+        nodes, edges, direction = _summary(again)
+        expected_nodes, expected_edges, expected_direction = _summary(original)
+        assert nodes == expected_nodes
+        assert edges == expected_edges
+        assert direction == expected_direction == "LR"
+        assert "Is it #91;ok#93;?" in mermaid
+
+def test_native_drawio_file():
+    reverse = DrawioToMermaidConverter()
+    reverse.parse_text(NATIVE)
+    name, graph, direction = reverse.pages[0]
+    assert name == "Native" and direction == "TD"
+    assert list(graph.groups) == ["lane"] and graph.groups["lane"].name == "Lane"
+
+    # Ids the parser cannot read (with "-", or keywords) are renamed
+    first, second = graph.nodes["n1"], graph.nodes["n2"]
+    assert (first.label, first.shape, first.style, first.group) == ("First", "ellipse", "fill:#dae8fc", "lane")
+    # The plain draw.io group is looked through
+    assert (second.label, second.shape, second.group) == ("Second", "rounded", "lane")
+    # The dangling edge is dropped; the edge label comes from its child cell
+    [edge] = graph.edges
+    assert (edge.source, edge.target, edge.label) == ("n1", "n2", "next")
+    assert graph.link_styles == {0: "stroke-dasharray:5 5"}
+
+def test_reverse_main_pages(tmp_path):
+    source = tmp_path / "doc.md"
+    source.write_text("## One\n\n```mermaid\ngraph TD\nA --> B\n```\n\n## Two\n\n```mermaid\nX[Hi] --> Y\n```\n")
+    drawio = tmp_path / "doc.drawio"
+    from mermaid_to_drawio.cli import main
+    assert main([str(source), "-o", str(drawio), "--no-cache"]) == 0
+
+    # Several pages need a page number or a Markdown output
+    assert reverse_main([str(drawio)]) == 1
+    assert reverse_main([str(drawio), "--page", "1"]) == 0
+    assert (tmp_path / "doc.mmd").read_text() == "graph TD\n    X[Hi]\n    Y\n    X --> Y\n"
+    out = tmp_path / "pages.md"
+    assert reverse_main([str(drawio), "-o", str(out)]) == 0
+    text = out.read_text()
+    assert text.startswith("## One\n\n```mermaid\ngraph TD\n") and "## Two" in text
@@ -0,0 +1,91 @@
+from mermaid_to_drawio.converter import MermaidToDrawIOConverter
+from mermaid_to_drawio.layout_manager import LayoutManager
+from mermaid_to_drawio.routing import Router, SpatialGrid, route_edges
+
+
+def _path(rects, source, target, points):
+    (sx, sy, sw, sh), (tx, ty, tw, th) = rects[source], rects[target]
+    return [(sx + sw // 2, sy + sh // 2), *points, (tx + tw // 2, ty + th // 2)]
+
+def _clears(rects, path, ignore):
+    grid = SpatialGrid(rects)
+    return not any(grid.query(x1, y1, x2, y2, ignore) for (x1, y1), (x2, y2) in zip(path, path[1:]))
+
+def test_spatial_grid_query():
+    grid = SpatialGrid([(0, 0, 100, 100), (500, 0, 100, 100)])
+    assert grid.query(50, -50, 50, 150) == [0]
+    assert grid.query(-50, 50, 700, 50) == [0, 1]
+    # Running along a border is not a crossing
+    assert grid.query(100, -50, 100, 150) == []
+    assert grid.query(-50, 50, 700, 50, ignore=(0,)) == [1]
+
+def test_router_detours_around_blocking_box():
+    rects = [(0, 0, 180, 60), (0, 400, 180, 60), (0, 200, 180, 60)]
+    points = Router(rects).route(0, 1, ignore=(0, 1))
+    path = _path(rects, 0, 1, points)
+
+    assert points
+    assert all(x1 == x2 or y1 == y2 for (x1, y1), (x2, y2) in zip(path, path[1:]))
+    assert _clears(rects, path, ignore=(0, 1))
+
+def test_router_keeps_straight_line_when_clear():
+    rects = [(0, 0, 180, 60), (0, 400, 180, 60)]
+    assert Router(rects).route(0, 1, ignore=(0, 1)) == []
+
+def test_route_edges_ignores_own_groups():
+    layout = LayoutManager(engine="layered")
+    layout.add_group("G")
+    for node_id, group in [("A", "G"), ("B", "G"), ("C", None)]:
+        if group:
+            layout.assign_node(node_id, group)
+        layout.add_node(node_id)
+    layout.add_edge("A", "B")
+    layout.add_edge("A", "C")
+    layout.add_edge("C", "C")
+    route_edges(layout)
+
+    edges = layout.graph.edges
+    assert edges[0].points == []
+    assert edges[2].points is None
+    node_a, node_c = layout.graph.nodes["A"], layout.graph.nodes["C"]
+    path = [(node_a.x + 90, node_a.y + 30), *edges[1].points, (node_c.x + 90, node_c.y + 30)]
+    assert all(x1 == x2 or y1 == y2 for (x1, y1), (x2, y2) in zip(path, path[1:]))
+
+def test_routed_edges_are_written_as_points():
+    converter = MermaidToDrawIOConverter(layout="layered", routing=True)
+    converter.parse_text("graph LR\nA --> B\nA --> C\nB --> D\nC --> D\n")
+    converter.build()
+
+    geometries = [cell.find("mxGeometry") for cell in converter.root if cell.get("edge") == "1"]
+    points = [[(p.get("x"), p.get("y")) for p in g.iter("mxPoint")] for g in geometries]
+    assert any(points)
+    for geometry in geometries:
+        array = geometry.find("Array")
+        assert array is None or array.get("as") == "points"
+
+def test_update_reroutes_moved_edges():
+    source = "graph TD\nA --> B\nA --> C\n"
+    converter = MermaidToDrawIOConverter(layout="layered", routing=True)
+    converter.parse_text(source)
+    converter.build()
+    converter.update(source + "C --> D\nD --> B\n")
+
+    reference = MermaidToDrawIOConverter(layout="layered", routing=True)
+    reference.parse_text(source + "C --> D\nD --> B\n")
+    reference.build()
+    routes = lambda c: [(e.source, e.target, e.points) for e in c.graph.edges]
+    assert routes(converter) == routes(reference)
+
+def test_parallel_routing_matches_serial(monkeypatch):
+    from mermaid_to_drawio import routing
+
+    source = "graph TD\n" + "".join(f"N{i} --> N{(i * 7 + 3) % 30}\n" for i in range(30))
+    converter = MermaidToDrawIOConverter(layout="layered")
+    converter.parse_text(source)
+    layout = converter.layout_manager
+    route_edges(layout)
+    serial = [edge.points for edge in converter.graph.edges]
+
+    monkeypatch.setattr(routing, "PARALLEL_THRESHOLD", 1)
+    route_edges(layout, workers=2)
+    assert [edge.points for edge in converter.graph.edges] == serial
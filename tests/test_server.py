@@ -0,0 +1,114 @@
+import asyncio
+import json
+import xml.etree.ElementTree as ET
+import pytest
+from mermaid_to_drawio.server import ConversionServer
+
+MMD = "graph TD\nA[Start] --> B{Check}\nB --> C\n"
+OPTIONS = {"layout": "layered"}
+
+async def _request(reader, writer, method, target, body=b""):
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode().strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.lower()] = value.strip()
+    return status, await reader.readexactly(int(headers["content-length"]))
+
+def _run(scenario, **kwargs):
+    async def main():
+        server = ConversionServer(OPTIONS, **kwargs)
+        await server.start()
+        try:
+            return await scenario(server)
+        finally:
+            server.close()
+    return asyncio.run(main())
+
+def test_identical_requests_are_coalesced_and_cached():
+    async def scenario(server):
+        results = await asyncio.gather(*(server.convert(MMD) for _ in range(5)))
+        again = await server.convert(MMD)
+        other = await server.convert(MMD, dict(OPTIONS, compact=True))
+        return results, again, other, server.metrics()
+
+    results, again, other, metrics = _run(scenario)
+    assert len(set(results)) == 1 and again == results[0]
+    assert "\n" not in other
+    assert metrics["conversions"] == 2
+    assert metrics["coalesced"] == 4
+    assert metrics["cache_hits"] == 1
+    assert metrics["max_queue_depth"] == 1 and metrics["queue_depth"] == 0
+
+def test_lru_evicts_oldest():
+    async def scenario(server):
+        for text in ("graph TD\nA-->B\n", "graph TD\nC-->D\n", "graph TD\nA-->B\n"):
+            await server.convert(text)
+        return server.metrics()
+
+    metrics = _run(scenario, cache_size=1)
+    assert metrics["conversions"] == 3 and metrics["cache_entries"] == 1
+
+def test_http_keep_alive():
+    async def scenario(server):
+        listener = await server.listen(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        responses = [
+            await _request(reader, writer, "POST", "/convert?layout=grid", MMD.encode()),
+            await _request(reader, writer, "POST", "/convert?shape=round", MMD.encode()),
+            await _request(reader, writer, "GET", "/convert"),
+            await _request(reader, writer, "GET", "/metrics"),
+            await _request(reader, writer, "GET", "/nowhere"),
+        ]
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+        return responses
+
+    (status, body), bad, wrong_method, metrics, missing = _run(scenario)
+    assert status == 200
+    assert len(ET.fromstring(body).findall(".//mxCell[@vertex='1']")) == 3
+    assert bad[0] == 400 and wrong_method[0] == 405 and missing[0] == 404
+    metrics = json.loads(metrics[1])
+    assert metrics["requests"] == 4 and metrics["conversions"] == 1
+    assert metrics["latency_ms"]["samples"] == 1
+
+def test_negative_content_length_is_rejected():
+    async def scenario(server):
+        listener = await server.listen(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"POST /convert HTTP/1.1\r\nHost: test\r\nContent-Length: -5\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+        return response
+
+    response = _run(scenario)
+    assert response.startswith(b"HTTP/1.1 400 ")
+    assert b"Connection: close" in response and response.endswith(b"malformed request\n")
+
+@pytest.mark.skipif(not hasattr(asyncio, "start_unix_server"), reason="needs Unix sockets")
+def test_unix_socket(tmp_path):
+    path = str(tmp_path / "m2d.sock")
+
+    async def scenario(server):
+        listener = await server.listen(unix_socket=path)
+        reader, writer = await asyncio.open_unix_connection(path)
+        response = await _request(reader, writer, "POST", "/convert?compress=1", MMD.encode())
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+        return response
+
+    status, body = _run(scenario)
+    assert status == 200
+    assert ET.fromstring(body).find("diagram/mxGraphModel") is None
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+# The CLI may take this many times as long to import as the json module, measured
+# on the same machine. It is about 3x with lazy imports; it was about 8x before.
+# Set MERMAID2DRAWIO_SKIP_IMPORT_BUDGET=1 to skip the check on very noisy runners.
+CLI_IMPORT_BUDGET = 6
+
+def _import(module):
+    """Return {module name: cumulative microseconds} for importing module in a fresh interpreter."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+def test_package_import_loads_nothing_else():
+    loaded = _import("mermaid_to_drawio")
+    assert [name for name in loaded if name.startswith("mermaid_to_drawio.")] == []
+
+def test_cli_import_is_lazy():
+    loaded = _import("mermaid_to_drawio.cli")
+    # A cache hit or --help must not pay for conversion, process pools or XML
+    for heavy in ("mermaid_to_drawio.converter", "mermaid_to_drawio.routing", "mermaid_to_drawio.server",
+                  "concurrent.futures.process", "xml.etree.ElementTree", "urllib.request", "uuid", "tempfile"):
+        assert heavy not in loaded
+
+def test_converter_import_is_lazy():
+    loaded = _import("mermaid_to_drawio.converter")
+    for heavy in ("mermaid_to_drawio.routing", "mermaid_to_drawio.compression", "concurrent.futures.process",
+                  "xml.sax.saxutils", "urllib.request", "uuid", "argparse"):
+        assert heavy not in loaded
+
+@pytest.mark.skipif(os.environ.get("MERMAID2DRAWIO_SKIP_IMPORT_BUDGET") == "1", reason="import budget disabled")
+def test_cli_import_budget():
+    # Alternate the runs so a busy machine slows both sides alike
+    cli, baseline = [], []
+    for _ in range(3):
+        cli.append(_import("mermaid_to_drawio.cli")["mermaid_to_drawio.cli"])
+        baseline.append(_import("json")["json"])
+    assert min(cli) < CLI_IMPORT_BUDGET * min(baseline), \
+        f"importing the CLI took {min(cli) / 1000:.1f}ms, importing json {min(baseline) / 1000:.1f}ms"
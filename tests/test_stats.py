@@ -0,0 +1,54 @@
+import io
+import json
+from mermaid_to_drawio.cli import main
+from mermaid_to_drawio.converter import MermaidToDrawIOConverter
+from mermaid_to_drawio.parser import tokenize
+from mermaid_to_drawio.stats import ConversionStats
+
+MMD = """graph TD
+subgraph Group
+    A[Start] --> B{Check} --> C
+end
+not a statement -->
+"""
+
+def test_regex_attempts():
+    counts = {"regex_attempts": 0}
+    tokenize("A --> B --> C", counts)
+    assert counts["regex_attempts"] == 9  # statement, 3 nodes, 3 end checks, 2 links
+    tokenize("A --> ", counts)
+    assert counts["regex_attempts"] == 9 + 5
+    tokenize("  ", counts)
+    assert counts["regex_attempts"] == 14
+
+def test_converter_stages_and_counts():
+    calls = []
+    stats = ConversionStats(memory=True, hooks=[lambda *args: calls.append(args)])
+    converter = MermaidToDrawIOConverter(layout="layered", stats=stats)
+    converter.parse_text(MMD)
+    converter.write(io.StringIO())
+
+    data = stats.as_dict()
+    assert list(data["stages"]) == ["parse", "layout", "build", "save"]
+    assert abs(sum(stage["seconds"] for stage in data["stages"].values()) - data["total_seconds"]) < 1e-9
+    assert all(stage["peak_bytes"] >= 0 for stage in data["stages"].values())
+    assert data["counts"] == {"lines": 5, "nodes": 3, "edges": 2, "groups": 1, "regex_attempts": 16}
+    assert [name for name, _, _ in calls] == ["parse", "layout", "build", "save"]
+    assert "regex attempts: 16" in stats.format_table()
+
+def test_nested_stage_times_are_exclusive():
+    stats = ConversionStats()
+    with stats.stage("outer"):
+        with stats.stage("inner"):
+            sum(range(100000))
+    assert stats.seconds["outer"] < stats.seconds["inner"]
+
+def test_main_stats_json_and_profile(tmp_path, capsys):
+    source = tmp_path / "a.mmd"
+    source.write_text(MMD)
+    profile = tmp_path / "a.prof"
+    assert main([str(source), "--no-cache", "--stats", "json", "--profile", str(profile)]) == 0
+    report = json.loads(capsys.readouterr().err)
+    assert report["total"]["counts"]["nodes"] == 3
+    assert report["files"][0]["ok"] and "save" in report["files"][0]["stages"]
+    assert profile.stat().st_size > 0
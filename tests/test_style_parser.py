@@ -20,4 +20,13 @@ def test_style_parsing():
     result = StyleParser.parse("fill:blue; stroke:orange; stroke-width:3px")
     assert "fill=#0000ff" in result
     assert "stroke=#ffa500" in result
-    assert "strokeWidth=3" in result
\ No newline at end of file
+    assert "strokeWidth=3" in result
+def test_parse_is_memoized():
+    StyleParser.parse.cache_clear()
+    first = StyleParser.parse("fill:red,stroke:rgb(0, 0, 255)")
+    assert first == "fill=#ff0000;stroke=#0000ff"
+    assert StyleParser.parse("fill:red,stroke:rgb(0, 0, 255)") is first
+    assert StyleParser.parse.cache_info().hits == 1
+
+def test_font_size():
+    assert StyleParser.parse("color:red,font-size:18px") == "color=#ff0000;fontSize=18"
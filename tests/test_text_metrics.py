@@ -0,0 +1,35 @@
+from mermaid_to_drawio.text_metrics import FONT_SIZE, MIN_SIZE, font_size, label_size, node_size, text_width
+
+def test_text_width_uses_glyph_table():
+    assert text_width("il") < text_width("MW")
+    assert text_width("ab") == text_width("a") + text_width("b")
+    # Wide East Asian characters are a full em; unknown glyphs get an average width
+    assert text_width("数据") == 2000
+    assert 0 < text_width("é") < 1000
+
+def test_label_wraps_long_text():
+    width, height, lines = label_size("Start")
+    assert lines == 1 and height == FONT_SIZE * 1.2
+    width, height, lines = label_size("Parse the incoming request and validate all of the headers")
+    assert lines == 2 and width <= 200
+    assert label_size("one<br>two<br/>three")[2] == 3
+
+def test_label_sizes_are_memoized():
+    label_size.cache_clear()
+    label_size("Repeated label")
+    label_size("Repeated label")
+    assert label_size.cache_info().hits == 1
+
+def test_node_size():
+    assert node_size("A") == MIN_SIZE
+    short, long = node_size("Start"), node_size("Validate every header of the incoming request")
+    assert long[0] > short[0] and long[1] > short[1]
+    # Diamonds and ellipses need room around the text
+    assert node_size("Decide now", "rhombus")[0] > node_size("Decide now")[0]
+    assert node_size("Decide now", "ellipse")[0] > node_size("Decide now")[0]
+    assert all(value % 10 == 0 for value in long)
+
+def test_font_size_from_style():
+    assert font_size(None) == FONT_SIZE
+    assert font_size("fill=#fff;fontSize=24") == 24
+    assert node_size("Some text here", style="fontSize=24")[0] > node_size("Some text here")[0]
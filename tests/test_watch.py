@@ -0,0 +1,27 @@
+import threading
+import time
+from mermaid_to_drawio.batch import Job
+from mermaid_to_drawio.watch import watch
+
+def test_watch_rewrites_output_on_change(tmp_path):
+    source = tmp_path / "diagram.mmd"
+    output = tmp_path / "diagram.drawio"
+    source.write_text("graph TD\nA[First] --> B\n")
+
+    stop = threading.Event()
+    thread = threading.Thread(target=watch, args=(Job(str(source), str(output)), {}), kwargs={"interval": 0.01, "stop": stop})
+    thread.start()
+    try:
+        for _ in range(200):
+            if output.exists() and 'value="First"' in output.read_text():
+                break
+            time.sleep(0.01)
+        source.write_text("graph TD\nA[Second] --> B\n")
+        for _ in range(200):
+            if 'value="Second"' in output.read_text():
+                break
+            time.sleep(0.01)
+    finally:
+        stop.set()
+        thread.join()
+    assert 'value="Second"' in output.read_text()
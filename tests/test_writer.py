@@ -0,0 +1,53 @@
+import io
+import xml.etree.ElementTree as ET
+from mermaid_to_drawio.converter import MermaidToDrawIOConverter
+from mermaid_to_drawio.writer import DrawioWriter
+
+MMD = """
+subgraph Group
+    A[Start] -- Go --> B{Check}
+end
+B --> C
+"""
+
+def _write(converter, compact=False):
+    out = io.StringIO()
+    converter.write(out, compact=compact)
+    return out.getvalue()
+
+def test_streamed_output_matches_built_tree():
+    streamed = MermaidToDrawIOConverter()
+    streamed.parse_text(MMD)
+
+    built = MermaidToDrawIOConverter()
+    built.parse_text(MMD)
+    built.build()
+
+    # Group ids are random, so compare everything but them
+    def cells(xml_text):
+        root = ET.fromstring(xml_text)
+        return [(c.get("value"), c.get("source"), c.get("target"), c.find("mxGeometry").attrib if c.find("mxGeometry") is not None else None)
+                for c in root.iter("mxCell")]
+
+    assert cells(_write(streamed)) == cells(_write(built))
+
+def test_compact_and_pretty_modes():
+    converter = MermaidToDrawIOConverter()
+    converter.parse_text(MMD)
+    converter.build()
+
+    pretty = _write(converter)
+    compact = _write(converter, compact=True)
+
+    assert "\n    <mxGraphModel>" in pretty
+    assert "\n" not in compact
+    assert len(compact) < len(pretty)
+    assert len(ET.fromstring(compact).findall(".//mxCell")) == 8
+
+def test_attribute_escaping():
+    out = io.StringIO()
+    with DrawioWriter(out, compact=True) as writer:
+        writer.begin_diagram({"name": 'A "quoted" <page> & more'})
+        writer.end_diagram()
+    diagram = ET.fromstring(out.getvalue()).find("diagram")
+    assert diagram.get("name") == 'A "quoted" <page> & more'